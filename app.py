@@ -1,22 +1,116 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, g
 from src.trading_bot import TradingBot
+from src.backtest import BacktestEngine
+from src.costs import CostModel
+from src.results_store import ResultsStore, data_fingerprint, downsample_equity, json_safe
+from src.market_calendar import INTRADAY_PERIOD_LIMITS, default_calendar as market_calendar
+from src.resampler import MARKET_TIMEZONE
+from src.data_handler import DataHandler
+from src.shared_cache import SharedCache
+from src.validation import DataValidator
+from src.downsample import DOWNSAMPLE_METHODS, DOWNSAMPLE_MIN_POINTS, downsample_series
+from src.metrics import default_registry as metrics_registry, published_histograms
+from src.strategy import STRATEGY_REGISTRY, ScalpStrategy, get_strategy
+from src.scanner import ScannerService, UniverseScanner
+from src.ingestion import FakeBarProvider, YFinanceBarProvider
 from datetime import datetime, timedelta
 import pandas as pd
 import json
+import os
+import time
 import sys
+import argparse
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+from flask import Response
 from waitress import serve
 import yfinance as yf
 import numpy as np
 
 app = Flask(__name__)
+results_store = ResultsStore()
+# Bars, rendered responses and live bots' metrics, in a file other processes on the host can open
+shared_cache = SharedCache(os.environ.get('SCALP_CACHE_PATH', 'data/cache.db'))
+# Downloads are validated before they enter the cache, so cached bars are already clean
+data_validator = DataValidator()
 
-def run_backtest(data, strategy='scalping'):
+# Backtests are CPU-bound, so with workers > 0 they run in a process pool instead of
+# holding the GIL in the request threads; everything else is served by this one process
+backtest_workers = int(os.environ.get('BACKTEST_WORKERS', 0))
+_backtest_pool = None
+
+# Universe scanner, started with --scan; /api/scanner serves its in-memory state
+scanner_service = None
+
+LIVE_DATA_TTL = 30  # seconds; bars for a session still in progress
+HISTORICAL_DATA_TTL = 3600
+
+def get_backtest_pool():
+    """Lazily start the backtest process pool, if enabled."""
+    global _backtest_pool
+    if backtest_workers > 0 and _backtest_pool is None:
+        _backtest_pool = ProcessPoolExecutor(max_workers=backtest_workers)
+    return _backtest_pool
+
+def start_scanner(symbols, provider='yfinance', poll_interval=60.0):
+    """Track ScalpStrategy's indicators for a universe on a background thread."""
+    global scanner_service
+    bar_provider = FakeBarProvider() if provider == 'fake' else YFinanceBarProvider()
+    scanner = UniverseScanner.from_strategy(symbols, ScalpStrategy())
+    scanner_service = ScannerService(scanner, bar_provider, poll_interval, validator=data_validator)
+    scanner_service.start()
+    return scanner_service
+
+def fetch_bar_records(ticker, timeframe, start_date, end_date):
+    """Bars for a window as records, through the shared cache.
+    
+    Intraday windows inside the 1-minute history are sliced and resampled from
+    one cached download of that whole history, so every interval and period
+    shares a single fetch. Daily bars and longer windows are downloaded at
+    their own interval.
+    """
+    now = datetime.now().replace(second=0, microsecond=0)
+    base_start, base_end, _ = market_calendar.session_window(now, '1m', INTRADAY_PERIOD_LIMITS['1m'])
+    if timeframe == '1d' or start_date < base_start:
+        key = f"bars:{ticker}:{timeframe}:{start_date.isoformat()}:{end_date.isoformat()}"
+        ttl = LIVE_DATA_TTL if end_date >= now else HISTORICAL_DATA_TTL
+        
+        def download():
+            data = yf.download(ticker, start=start_date, end=end_date, interval=timeframe)
+            return bars_to_records(data, timeframe) if not data.empty else None
+        
+        return shared_cache.get_or_set(key, download, ttl)
+    
+    key = f"bars:{ticker}:{timeframe}:{start_date.isoformat()}:{min(end_date, base_end).isoformat()}"
+    ttl = LIVE_DATA_TTL if base_end >= now else HISTORICAL_DATA_TTL
+    
+    def download_base():
+        data = yf.download(ticker, start=base_start, end=base_end, interval='1m')
+        return clean_bars(data, '1m') if not data.empty else None
+    
+    def resample():
+        base = shared_cache.get_or_set(f"bars:{ticker}:1m-base:{base_start.isoformat()}:{base_end.isoformat()}", download_base, ttl)
+        if base is None:
+            return None
+        local = base.index.tz_convert(MARKET_TIMEZONE).tz_localize(None) if base.index.tz is not None else base.index
+        base = base[(local >= start_date) & (local < end_date)]
+        frames = DataHandler(ticker, validator=data_validator).get_multi_timeframe_data(start_date, end_date, [timeframe], base=base)
+        return frame_to_records(frames[timeframe]) or None
+    
+    return shared_cache.get_or_set(key, resample, ttl)
+
+def run_backtest(data, strategy='scalping', strategy_params=None, cost_params=None, store=None):
     """
     Run a backtest on the provided SPY data using the specified strategy.
     
     Args:
         data (list): List of dictionaries containing OHLCV data for SPY
-        strategy (str): Strategy to use for backtesting
+        strategy (str): Name of a registered strategy (see STRATEGY_REGISTRY)
+        strategy_params (dict): Optional keyword arguments for the strategy
+        cost_params (dict): Optional CostModel keyword arguments; enables spread,
+            impact, fee and latency modelling when given
+        store (ResultsStore): Optional store; identical config and data
+            return the recorded run instead of re-running it
         
     Returns:
         dict: Backtest results including trades and performance metrics
@@ -40,112 +134,46 @@ def run_backtest(data, strategy='scalping'):
     df['date'] = pd.to_datetime(df['date'])
     df.set_index('date', inplace=True)
     
-    # Initialize variables for tracking trades
-    trades = []
-    position = None
-    entry_price = None
-    entry_time = None
+    # Run the registered strategy through the shared backtest engine
+    cost_model = CostModel(**cost_params) if cost_params is not None else None
+    engine = BacktestEngine(get_strategy(strategy, **(strategy_params or {})), cost_model=cost_model)
     
-    # SPY scalping strategy parameters
-    stop_loss_pct = 0.05  # 0.05% stop loss
-    take_profit_pct = 0.10  # 0.10% take profit - higher than stop loss for better risk/reward
+    if store is not None:
+        config = engine.get_config()
+        fingerprint = data_fingerprint(df)
+        cached = store.get(store.run_id(config, fingerprint))
+        if cached is not None:
+            return {
+                'trades': cached['trades'],
+                'performance': cached['metrics'],
+                'equity_curve': cached['equity_curve'],
+                'run_id': cached['run_id'],
+                'cached': True
+            }
     
-    # Simple scalping strategy optimized for SPY
-    if strategy == 'scalping':
-        for i in range(1, len(df)):
-            current = df.iloc[i]
-            prev = df.iloc[i-1]
-            
-            # Entry conditions
-            if position is None:
-                # Long entry: Price breaks above previous high with volume confirmation
-                if current['high'] > prev['high'] and current['volume'] > prev['volume']:
-                    position = 'long'
-                    entry_price = current['open']
-                    entry_time = current.name
-                    stop_loss = entry_price * (1 - stop_loss_pct)
-                    take_profit = entry_price * (1 + take_profit_pct)
-                    
-                # Short entry: Price breaks below previous low with volume confirmation
-                elif current['low'] < prev['low'] and current['volume'] > prev['volume']:
-                    position = 'short'
-                    entry_price = current['open']
-                    entry_time = current.name
-                    stop_loss = entry_price * (1 + stop_loss_pct)
-                    take_profit = entry_price * (1 - take_profit_pct)
-            
-            # Exit conditions
-            elif position == 'long':
-                if current['low'] <= stop_loss:
-                    # Stop loss hit
-                    exit_price = stop_loss
-                    exit_time = current.name
-                    pnl = (exit_price - entry_price) / entry_price * 100
-                    trades.append({
-                        'entry_time': entry_time.isoformat(),
-                        'exit_time': exit_time.isoformat(),
-                        'direction': 'long',
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'pnl': pnl,
-                        'stop_loss': stop_loss,
-                        'take_profit': take_profit,
-                        'exit_reason': 'stop_loss'
-                    })
-                    position = None
-                elif current['high'] >= take_profit:
-                    # Take profit hit
-                    exit_price = take_profit
-                    exit_time = current.name
-                    pnl = (exit_price - entry_price) / entry_price * 100
-                    trades.append({
-                        'entry_time': entry_time.isoformat(),
-                        'exit_time': exit_time.isoformat(),
-                        'direction': 'long',
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'pnl': pnl,
-                        'stop_loss': stop_loss,
-                        'take_profit': take_profit,
-                        'exit_reason': 'take_profit'
-                    })
-                    position = None
-            
-            elif position == 'short':
-                if current['high'] >= stop_loss:
-                    # Stop loss hit
-                    exit_price = stop_loss
-                    exit_time = current.name
-                    pnl = (entry_price - exit_price) / entry_price * 100
-                    trades.append({
-                        'entry_time': entry_time.isoformat(),
-                        'exit_time': exit_time.isoformat(),
-                        'direction': 'short',
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'pnl': pnl,
-                        'stop_loss': stop_loss,
-                        'take_profit': take_profit,
-                        'exit_reason': 'stop_loss'
-                    })
-                    position = None
-                elif current['low'] <= take_profit:
-                    # Take profit hit
-                    exit_price = take_profit
-                    exit_time = current.name
-                    pnl = (entry_price - exit_price) / entry_price * 100
-                    trades.append({
-                        'entry_time': entry_time.isoformat(),
-                        'exit_time': exit_time.isoformat(),
-                        'direction': 'short',
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'pnl': pnl,
-                        'stop_loss': stop_loss,
-                        'take_profit': take_profit,
-                        'exit_reason': 'take_profit'
-                    })
-                    position = None
+    engine.run(df)
+    
+    trades = []
+    for trade in engine.trades:
+        entry_price = trade['entry_price']
+        exit_price = trade['exit_price']
+        if trade['direction'] == 'LONG':
+            pnl = (exit_price - entry_price) / entry_price * 100
+        else:
+            pnl = (entry_price - exit_price) / entry_price * 100
+        # Fees are charged in dollars, so express them against the entry value
+        pnl -= trade.get('fees', 0.0) / (entry_price * trade['size']) * 100
+        trades.append({
+            'entry_time': trade['entry_time'].isoformat(),
+            'exit_time': trade['exit_time'].isoformat(),
+            'direction': trade['direction'].lower(),
+            'entry_price': float(entry_price),
+            'exit_price': float(exit_price),
+            'pnl': float(pnl),
+            'stop_loss': float(trade['stop_loss']),
+            'take_profit': float(trade['take_profit']),
+            'exit_reason': trade['exit_reason']
+        })
     
     # Calculate performance metrics
     if trades:
@@ -164,20 +192,89 @@ def run_backtest(data, strategy='scalping'):
         total_trades = winning_trades = losing_trades = 0
         win_rate = total_pnl = avg_pnl = profit_factor = avg_win = avg_loss = 0
     
-    return {
+    performance = {
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'win_rate': win_rate,
+        'total_pnl': total_pnl,
+        'avg_pnl': avg_pnl,
+        'profit_factor': profit_factor,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss
+    }
+    
+    equity_curve = [
+        {'timestamp': ts.isoformat(), 'equity': float(eq)}
+        for ts, eq in downsample_equity(engine.equity_curve).itertuples(index=False)
+    ]
+    
+    # Same serialisation as the stored copy, so fresh and cached responses match
+    results = {
         'trades': trades,
-        'performance': {
-            'total_trades': total_trades,
-            'winning_trades': winning_trades,
-            'losing_trades': losing_trades,
-            'win_rate': win_rate,
-            'total_pnl': total_pnl,
-            'avg_pnl': avg_pnl,
-            'profit_factor': profit_factor,
-            'avg_win': avg_win,
-            'avg_loss': avg_loss
-        }
+        'performance': json_safe(performance),
+        'equity_curve': equity_curve,
+        'cached': False
     }
+    
+    if store is not None:
+        results['run_id'] = store.save(config, fingerprint, performance, trades, engine.equity_curve, df)
+    
+    return results
+
+def bars_to_records(data, timeframe):
+    """Convert a yfinance download to validated OHLCV records, keeping only bars inside trading sessions."""
+    return frame_to_records(clean_bars(data, timeframe))
+
+def clean_bars(data, timeframe):
+    """Validated OHLCV bars from a yfinance download, keeping only bars inside trading sessions."""
+    # Recent yfinance versions return (field, ticker) column pairs
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.droplevel(1, axis=1)
+    
+    mask = market_calendar.session_mask(data.index, intraday=timeframe != '1d')
+    data = data.loc[mask].rename(columns=str.lower)
+    data, _ = data_validator.validate(data.dropna(), timeframe)
+    return data
+
+def frame_to_records(data):
+    """OHLCV bars as JSON-ready records."""
+    return [
+        {
+            'date': index.isoformat(),
+            'open': float(o),
+            'high': float(h),
+            'low': float(l),
+            'close': float(c),
+            'volume': int(v)
+        }
+        for index, o, h, l, c, v in zip(
+            data.index,
+            data['open'].to_numpy(),
+            data['high'].to_numpy(),
+            data['low'].to_numpy(),
+            data['close'].to_numpy(),
+            data['volume'].to_numpy()
+        )
+    ]
+
+@app.before_request
+def start_request_timer():
+    g.request_start_ns = time.perf_counter_ns()
+
+@app.after_request
+def record_request_latency(response):
+    if request.endpoint and 'request_start_ns' in g:
+        metrics_registry.histogram(
+            'http_request_seconds', 'Dashboard API request latency', {'endpoint': request.endpoint}
+        ).record_ns(time.perf_counter_ns() - g.request_start_ns)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Latency histograms in Prometheus text format, including those published by a live bot."""
+    live = published_histograms(shared_cache)
+    return Response(metrics_registry.render(extra=live), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def dashboard():
@@ -191,65 +288,37 @@ def backtest():
         timeframe = data.get('timeframe', '1m')
         period = int(data.get('period', 1))
         strategy = data.get('strategy', 'scalping')
+        strategy_params = data.get('strategy_params', {})
+        cost_params = data.get('cost_model')
         
-        # Get current time
-        now = datetime.now()
+        if strategy not in STRATEGY_REGISTRY:
+            return jsonify({
+                'error': f"Unknown strategy: {strategy}",
+                'available_strategies': sorted(STRATEGY_REGISTRY)
+            }), 400
         
-        # Find the most recent business day
-        end_date = now
-        while end_date.weekday() > 4:  # 5 is Saturday, 6 is Sunday
-            end_date = end_date - timedelta(days=1)
-            
-        # For minute-level data, handle market hours
-        if timeframe in ['1m', '5m']:
-            # Set to previous market close if current time is outside market hours
-            market_open = end_date.replace(hour=9, minute=30, second=0, microsecond=0)
-            market_close = end_date.replace(hour=16, minute=0, second=0, microsecond=0)
-            
-            if now < market_open or now > market_close:
-                # If before market open or after market close, use previous business day
-                end_date = end_date - timedelta(days=1)
-                while end_date.weekday() > 4:  # Skip weekends
-                    end_date = end_date - timedelta(days=1)
-                end_date = end_date.replace(hour=16, minute=0, second=0, microsecond=0)
-            else:
-                # During market hours, use current time
-                end_date = now.replace(second=0, microsecond=0)
-            
-            # Calculate start date
-            if timeframe == '1m':
-                period = min(period, 7)  # Limit to 7 days for 1-minute data
-            else:  # 5m
-                period = min(period, 60)  # Limit to 60 days for 5-minute data
-            
-            # Find start date by counting back the required number of business days
-            start_date = end_date
-            business_days = 0
-            while business_days < period:
-                start_date = start_date - timedelta(days=1)
-                if start_date.weekday() < 5:  # Only count business days
-                    business_days += 1
-            
-            # Set start date to market open
-            start_date = start_date.replace(hour=9, minute=30, second=0, microsecond=0)
-        else:
-            # For daily data, count back business days
-            end_date = end_date.replace(hour=16, minute=0, second=0, microsecond=0)
-            start_date = end_date
-            business_days = 0
-            while business_days < period:
-                start_date = start_date - timedelta(days=1)
-                if start_date.weekday() < 5:  # Only count business days
-                    business_days += 1
-            start_date = start_date.replace(hour=9, minute=30, second=0, microsecond=0)
+        if cost_params is not None:
+            cost_model_params = sorted(inspect.signature(CostModel).parameters)
+            if not isinstance(cost_params, dict) or set(cost_params) - set(cost_model_params):
+                return jsonify({
+                    'error': f"Invalid cost_model: {cost_params}",
+                    'available_cost_params': cost_model_params
+                }), 400
+            try:
+                CostModel(**cost_params)
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': f"Invalid cost_model: {e}"}), 400
+        
+        # Resolve the date range from the shared trading-session calendar
+        start_date, end_date, period = market_calendar.session_window(datetime.now(), timeframe, period)
         
         # Log the date range
         print(f"Backtesting {ticker} from {start_date} to {end_date} (timeframe: {timeframe}, period: {period} business days)")
         
         # Fetch data from yfinance
-        data = yf.download(ticker, start=start_date, end=end_date, interval=timeframe)
+        data_list = fetch_bar_records(ticker, timeframe, start_date, end_date)
         
-        if data.empty:
+        if not data_list:
             error_msg = f"No data available for {ticker} from {start_date} to {end_date} (timeframe: {timeframe}, period: {period} business days)"
             print(error_msg)
             return jsonify({
@@ -260,22 +329,12 @@ def backtest():
                 'end_date': end_date.isoformat()
             }), 404
             
-        # Convert data to list of dictionaries
-        data_list = []
-        for index, row in data.iterrows():
-            # Only include data from business days
-            if index.weekday() < 5:  # Monday to Friday
-                data_list.append({
-                    'date': index.isoformat(),
-                    'open': float(row['Open']),
-                    'high': float(row['High']),
-                    'low': float(row['Low']),
-                    'close': float(row['Close']),
-                    'volume': int(row['Volume'])
-                })
-            
         # Run backtest
-        results = run_backtest(data_list, strategy)
+        pool = get_backtest_pool()
+        if pool is not None:
+            results = pool.submit(run_backtest, data_list, strategy, strategy_params, cost_params, results_store).result()
+        else:
+            results = run_backtest(data_list, strategy, strategy_params, cost_params, store=results_store)
         
         return jsonify({
             'results': results,
@@ -288,71 +347,75 @@ def backtest():
         print(f"Error running backtest: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/backtests')
+def list_backtests():
+    try:
+        runs = results_store.list_runs(
+            strategy=request.args.get('strategy'),
+            order_by=request.args.get('order_by'),
+            descending=request.args.get('ascending', 'false').lower() != 'true',
+            limit=int(request.args.get('limit', 50))
+        )
+        return jsonify({'runs': runs})
+        
+    except Exception as e:
+        print(f"Error listing backtests: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/backtests/compare')
+def compare_backtests():
+    try:
+        run_ids = [r for r in request.args.get('run_ids', '').split(',') if r]
+        metrics = [m for m in request.args.get('metrics', '').split(',') if m] or None
+        if not run_ids:
+            return jsonify({'error': 'run_ids is required'}), 400
+            
+        comparison = results_store.compare(run_ids, metrics)
+        comparison = comparison.astype(object).where(pd.notna(comparison), None)
+        return jsonify({'runs': comparison.to_dict(orient='records')})
+        
+    except Exception as e:
+        print(f"Error comparing backtests: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/backtests/<run_id>')
+def get_backtest(run_id):
+    run = results_store.get(run_id)
+    if run is None:
+        return jsonify({'error': f"Unknown run: {run_id}"}), 404
+    return jsonify(run)
+
 @app.route('/api/market-data')
 def get_market_data():
     try:
         ticker = request.args.get('ticker', 'SPY')
         timeframe = request.args.get('timeframe', '1m')
         period = int(request.args.get('period', 1))
+        # Optional shape-preserving downsample, with markers for a stored backtest's trades
+        max_points = request.args.get('max_points', type=int)
+        method = request.args.get('method', 'lttb')
+        run_id = request.args.get('run_id')
         
-        # Get current time
-        now = datetime.now()
+        if method not in DOWNSAMPLE_METHODS:
+            return jsonify({'error': f"Unknown method: {method}", 'available_methods': DOWNSAMPLE_METHODS}), 400
+        if max_points is not None and max_points < DOWNSAMPLE_MIN_POINTS[method]:
+            return jsonify({'error': f"max_points must be at least {DOWNSAMPLE_MIN_POINTS[method]} for {method}"}), 400
+        
+        # Resolve the date range from the shared trading-session calendar
+        start_date, end_date, period = market_calendar.session_window(datetime.now(), timeframe, period)
+        
+        response_key = f"market-data:{ticker}:{timeframe}:{start_date.isoformat()}:{end_date.isoformat()}:{max_points}:{method}:{run_id}"
+        cached_body = shared_cache.get(response_key)
+        if cached_body is not None:
+            return Response(cached_body, mimetype='application/json')
         
-        # Find the most recent business day
-        end_date = now
-        while end_date.weekday() > 4:  # 5 is Saturday, 6 is Sunday
-            end_date = end_date - timedelta(days=1)
-            
-        # For minute-level data, handle market hours
-        if timeframe in ['1m', '5m']:
-            # Set to previous market close if current time is outside market hours
-            market_open = end_date.replace(hour=9, minute=30, second=0, microsecond=0)
-            market_close = end_date.replace(hour=16, minute=0, second=0, microsecond=0)
-            
-            if now < market_open or now > market_close:
-                # If before market open or after market close, use previous business day
-                end_date = end_date - timedelta(days=1)
-                while end_date.weekday() > 4:  # Skip weekends
-                    end_date = end_date - timedelta(days=1)
-                end_date = end_date.replace(hour=16, minute=0, second=0, microsecond=0)
-            else:
-                # During market hours, use current time
-                end_date = now.replace(second=0, microsecond=0)
-            
-            # Calculate start date
-            if timeframe == '1m':
-                period = min(period, 7)  # Limit to 7 days for 1-minute data
-            else:  # 5m
-                period = min(period, 60)  # Limit to 60 days for 5-minute data
-            
-            # Find start date by counting back the required number of business days
-            start_date = end_date
-            business_days = 0
-            while business_days < period:
-                start_date = start_date - timedelta(days=1)
-                if start_date.weekday() < 5:  # Only count business days
-                    business_days += 1
-            
-            # Set start date to market open
-            start_date = start_date.replace(hour=9, minute=30, second=0, microsecond=0)
-        else:
-            # For daily data, count back business days
-            end_date = end_date.replace(hour=16, minute=0, second=0, microsecond=0)
-            start_date = end_date
-            business_days = 0
-            while business_days < period:
-                start_date = start_date - timedelta(days=1)
-                if start_date.weekday() < 5:  # Only count business days
-                    business_days += 1
-            start_date = start_date.replace(hour=9, minute=30, second=0, microsecond=0)
-            
         # Log the date range
         print(f"Fetching data for {ticker} from {start_date} to {end_date} (timeframe: {timeframe}, period: {period} business days)")
         
         # Fetch data from yfinance
-        data = yf.download(ticker, start=start_date, end=end_date, interval=timeframe)
+        data_list = fetch_bar_records(ticker, timeframe, start_date, end_date)
         
-        if data.empty:
+        if not data_list:
             error_msg = f"No data available for {ticker} from {start_date} to {end_date} (timeframe: {timeframe}, period: {period} business days)"
             print(error_msg)
             return jsonify({
@@ -363,35 +426,76 @@ def get_market_data():
                 'end_date': end_date.isoformat()
             }), 404
             
-        # Convert data to list of dictionaries
-        data_list = []
-        for index, row in data.iterrows():
-            # Only include data from business days
-            if index.weekday() < 5:  # Monday to Friday
-                data_list.append({
-                    'date': index.isoformat(),
-                    'open': float(row['Open']),
-                    'high': float(row['High']),
-                    'low': float(row['Low']),
-                    'close': float(row['Close']),
-                    'volume': int(row['Volume'])
-                })
-            
-        return jsonify({
+        payload = {
             'data': data_list,
             'timeframe': timeframe,
             'period': period,
-            'period_info': f"Showing {period} business days of {timeframe} data"
-        })
+            'period_info': f"Showing {period} business days of {timeframe} data",
+            'total_points': len(data_list)
+        }
+        if max_points or run_id:
+            run = results_store.get(run_id) if run_id else None
+            trades = run['trades'] if run is not None else []
+            payload['data'], payload['markers'] = downsample_series(
+                data_list, max_points or len(data_list), method, trades
+            )
+        body = json.dumps(payload)
+        ttl = LIVE_DATA_TTL if end_date >= datetime.now().replace(second=0, microsecond=0) else HISTORICAL_DATA_TTL
+        shared_cache.set(response_key, body, ttl)
+        
+        return Response(body, mimetype='application/json')
         
     except Exception as e:
         print(f"Error fetching market data: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/scanner')
+def get_scanner_candidates():
+    """Ranked squeeze candidates across the scanned universe, from the scanner's current state."""
+    if scanner_service is None:
+        return jsonify({'error': 'Scanner not running; start the server with --scan'}), 503
+    
+    top = request.args.get('top', 20, type=int)
+    direction = request.args.get('direction')
+    squeeze_only = request.args.get('squeeze_only', 'true').lower() != 'false'
+    if direction is not None:
+        direction = direction.upper()
+        if direction not in ('LONG', 'SHORT'):
+            return jsonify({'error': f"Unknown direction: {direction}", 'available_directions': ['LONG', 'SHORT']}), 400
+    
+    scanner = scanner_service.scanner
+    as_of = scanner.as_of
+    return jsonify({
+        'as_of': as_of.isoformat() if as_of is not None else None,
+        'symbols': len(scanner.symbols),
+        'candidates': scanner.rank(top, direction, squeeze_only)
+    })
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Scalp-Trade dashboard server')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--threads', type=int, default=8, help='request handler threads')
+    parser.add_argument('--workers', type=int, default=backtest_workers,
+                        help='backtest pool processes (0 runs backtests in the request thread); the server itself is one process')
+    parser.add_argument('--scan', help='comma-separated symbols, or a file with one per line, for /api/scanner')
+    parser.add_argument('--scan-provider', choices=['yfinance', 'fake'], default='yfinance')
+    parser.add_argument('--scan-interval', type=float, default=60.0, help='seconds between scanner polls')
+    args = parser.parse_args()
+    backtest_workers = args.workers
+    
+    if args.scan:
+        if os.path.isfile(args.scan):
+            with open(args.scan) as f:
+                scan_symbols = [line.strip() for line in f if line.strip()]
+        else:
+            scan_symbols = [s.strip() for s in args.scan.split(',') if s.strip()]
+        start_scanner(scan_symbols, args.scan_provider, args.scan_interval)
+        print(f"Scanning {len(scan_symbols)} symbols every {args.scan_interval:.0f}s")
+    
     try:
-        print("Starting server on http://localhost:8080")
-        serve(app, host='0.0.0.0', port=8080)
+        print(f"Starting server on http://localhost:{args.port} ({backtest_workers} backtest workers)")
+        serve(app, host=args.host, port=args.port, threads=args.threads)
     except Exception as e:
         print(f"Error starting server: {str(e)}", file=sys.stderr)
         sys.exit(1) 
\ No newline at end of file
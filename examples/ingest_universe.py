@@ -0,0 +1,50 @@
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.bar_store import BarStore
+from src.ingestion import BulkIngestor, FakeBarProvider, YFinanceBarProvider
+from src.market_calendar import default_calendar as market_calendar
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-load a symbol universe into the local bar store')
+    parser.add_argument('--provider', choices=['fake', 'yfinance'], default='fake')
+    parser.add_argument('--symbols', type=int, default=200, help='number of synthetic symbols (fake provider)')
+    parser.add_argument('--tickers', nargs='*', help='explicit tickers (yfinance provider)')
+    parser.add_argument('--sessions', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--store', default=None, help='bar store path (default: temporary file)')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    if args.provider == 'fake':
+        # Simulated network latency and occasional failures exercise batching and retries
+        provider = FakeBarProvider(latency=0.2, failure_rate=0.1)
+        symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+    else:
+        provider = YFinanceBarProvider()
+        symbols = args.tickers or ['SPY', 'QQQ', 'IWM', 'DIA']
+    
+    end = market_calendar.session_close(datetime.now())
+    start = market_calendar.session_open(market_calendar.sessions_back(end, args.sessions - 1))
+    
+    store_path = args.store or os.path.join(tempfile.mkdtemp(), 'bars.db')
+    ingestor = BulkIngestor(provider, BarStore(store_path), max_workers=args.workers, backoff=0.1)
+    report = ingestor.run(symbols, start, end, '1m')
+    
+    print(f"\nSymbols: {report.symbols} in {report.requests} batched requests ({report.retries} retries)")
+    print(f"Rows: {report.rows:,} in {report.seconds:.2f}s -> {report.rows_per_sec:,.0f} rows/sec")
+    found = {check: count for check, count in report.issues.items() if count}
+    print(f"Data quality issues: {found or 'none'}")
+    if report.failed_symbols:
+        print(f"Failed: {', '.join(report.failed_symbols)}")
+    print(f"Store: {store_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.market_calendar import default_calendar as market_calendar
+from src.shared_cache import SharedCache
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app.py')
+TICKER = 'SPY'
+TIMEFRAME = '15m'  # window end is the session close, so the cache key is stable while the test runs
+PERIOD = 200
+
+def synthetic_records(start_date, end_date):
+    """Random-walk 15m bars covering every session in the window."""
+    sessions = pd.bdate_range(start_date.date(), end_date.date())
+    index = pd.DatetimeIndex([
+        ts for day in sessions
+        for ts in pd.date_range(f"{day.date()} 09:30", f"{day.date()} 15:45", freq='15min')
+    ])
+    rng = np.random.default_rng(0)
+    close = 450 + np.cumsum(rng.normal(0, 0.3, len(index)))
+    spread = np.abs(rng.normal(0, 0.2, len(index)))
+    return [
+        {
+            'date': ts.isoformat(),
+            'open': float(c),
+            'high': float(c + s),
+            'low': float(c - s),
+            'close': float(c),
+            'volume': int(v)
+        }
+        for ts, c, s, v in zip(index, close, spread, rng.integers(1000, 100000, len(index)))
+    ]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def run_load(workers: int, n_requests: int, concurrency: int, workdir: str) -> float:
+    """Start the server with a backtest pool of `workers` processes and return /api/backtest requests/sec."""
+    port = free_port()
+    env = dict(os.environ, SCALP_CACHE_PATH=os.path.join(workdir, 'cache.db'))
+    server = subprocess.Popen(
+        [sys.executable, APP_PATH, '--port', str(port), '--workers', str(workers), '--threads', str(concurrency)],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"{base_url}/api/backtests", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+
+        session = requests.Session()
+
+        def request_backtest(i):
+            # Distinct parameters per request so no response comes from the results store
+            response = session.post(f"{base_url}/api/backtest", json={
+                'ticker': TICKER,
+                'timeframe': TIMEFRAME,
+                'period': PERIOD,
+                'strategy': 'bb_squeeze',
+                'strategy_params': {'bb_std': 1.5 + i * 1e-6, 'rsi_period': 7 + workers}
+            }, timeout=120)
+            response.raise_for_status()
+
+        # Warm up the pool so process start-up isn't counted
+        request_backtest(-1 - workers)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(request_backtest, range(n_requests)))
+        return n_requests / (time.perf_counter() - start)
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description='/api/backtest throughput versus backtest pool size')
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Pre-populate the shared bar cache so the server never calls the data provider
+        start_date, end_date, period = market_calendar.session_window(datetime.now(), TIMEFRAME, PERIOD)
+        cache = SharedCache(os.path.join(workdir, 'cache.db'))
+        key = f"bars:{TICKER}:{TIMEFRAME}:{start_date.isoformat()}:{end_date.isoformat()}"
+        records = synthetic_records(start_date, end_date)
+        cache.set(key, records, ttl=3600)
+        print(f"Cached {len(records)} synthetic {TIMEFRAME} bars; "
+              f"{args.requests} /api/backtest requests at concurrency {args.concurrency}")
+        print("Only the backtests run in the pool; the server is one process, so this measures the backtest endpoint alone")
+
+        for workers in args.workers:
+            rps = run_load(workers, args.requests, args.concurrency, workdir)
+            label = 'in-thread' if workers == 0 else f"pool of {workers}"
+            print(f"{label:>12}: {rps:6.2f} /api/backtest requests/sec")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import numpy as np
+from datetime import datetime
+from src.mock_broker import MockBroker
+from src.orders import BrokerClient, OrderManager
+
+def main():
+    # Start a local broker stand-in and submit bracket orders through the pooled session
+    broker = MockBroker(fill_price=450.0)
+    base_url = broker.start()
+    manager = OrderManager(BrokerClient(base_url), max_workers=4)
+    
+    n_orders = 500
+    futures = [
+        manager.submit_bracket(
+            symbol='SPY',
+            direction='LONG' if i % 2 == 0 else 'SHORT',
+            qty=10,
+            stop_loss=447.75 if i % 2 == 0 else 452.25,
+            take_profit=454.5 if i % 2 == 0 else 445.5,
+            timestamp=f"{datetime.now().isoformat()}-{i}"
+        )
+        for i in range(n_orders)
+    ]
+    orders = [f.result() for f in futures]
+    
+    latencies = np.array(manager.ack_latencies_ms())
+    print(f"\nSubmitted {len(orders)} orders, {sum(o.status == 'filled' for o in orders)} filled")
+    print(f"Submit -> ack latency: p50 {np.percentile(latencies, 50):.2f} ms, "
+          f"p99 {np.percentile(latencies, 99):.2f} ms, max {latencies.max():.2f} ms")
+    
+    # Resubmitting an existing client order id returns the original order
+    duplicate = manager.submit(orders[0]).result()
+    print(f"Duplicate submission returned same order: {duplicate is orders[0]}")
+    
+    manager.shutdown()
+    broker.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ingestion import FakeBarProvider
+from src.optimizer import TPEOptimizer
+
+def main():
+    parser = argparse.ArgumentParser(description='Search ScalpStrategy parameters with TPE and successive halving')
+    parser.add_argument('--provider', choices=['fake', 'yfinance'], default='fake')
+    parser.add_argument('--ticker', default='SPY')
+    parser.add_argument('--timeframe', default='5m')
+    parser.add_argument('--days', type=int, default=55)
+    parser.add_argument('--objective', default='total_pnl', help='BacktestEngine metric to maximize')
+    parser.add_argument('--budget', type=float, default=60.0, help='wall-clock budget in seconds')
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    # Per-backtest indicator logging would drown out the search progress
+    logging.getLogger('src.strategy').setLevel(logging.WARNING)
+    
+    end = datetime.now()
+    start = end - timedelta(days=args.days)
+    if args.provider == 'fake':
+        data = FakeBarProvider().fetch([args.ticker], start, end, args.timeframe)[args.ticker]
+    else:
+        from src.data_handler import DataHandler
+        data = DataHandler(args.ticker).get_historical_data(start, end, args.timeframe)
+    
+    optimizer = TPEOptimizer(objective=args.objective, max_workers=args.workers)
+    result = optimizer.optimize(data, time_budget=args.budget, max_rounds=args.rounds)
+    
+    print(f"\n{result.evaluations} evaluations in {result.elapsed:.1f}s"
+          f"{' (time budget reached)' if result.stopped_by_budget else ''}; out-of-sample from {result.split_time}")
+    columns = [c for c in result.best.columns if not c.startswith('oos_')] + [
+        'oos_total_trades', 'oos_win_rate', 'oos_total_pnl', 'oos_sharpe_ratio'
+    ]
+    print(result.best[[c for c in columns if c in result.best.columns]].to_string(index=False))
+
+if __name__ == "__main__":
+    main()
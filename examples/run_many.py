@@ -0,0 +1,45 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ingestion import FakeBarProvider
+from src.live_runner import LiveRunner
+from src.strategy import ScalpStrategy
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-bar cost of the live runner as strategies are added')
+    parser.add_argument('--symbols', type=int, default=10)
+    parser.add_argument('--strategies', type=int, default=50, help='largest number of strategies per symbol')
+    parser.add_argument('--minutes', type=int, default=60, help='simulated minutes to step through')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    start = datetime(2024, 6, 3, 11, 0)
+    print(f"{'strategies':>10} {'indicators':>10} {'ms/bar':>8}")
+    for n in sorted({1, max(args.strategies // 10, 1), args.strategies}):
+        runner = LiveRunner(FakeBarProvider())
+        for symbol in symbols:
+            for k in range(n):
+                # Threshold variants share indicators; the two BB periods don't
+                runner.add(symbol, ScalpStrategy(
+                    bb_period=10 + 5 * (k % 2),
+                    rsi_oversold=30 + k % 10,
+                    rsi_overbought=70 - k % 10
+                ))
+        runner.warm_start(start)
+        
+        started = time.perf_counter()
+        bars = sum(runner.step(start + timedelta(minutes=m)) for m in range(1, args.minutes + 1))
+        elapsed = time.perf_counter() - started
+        indicators = sum(len(feed.bank.indicators) for feed in runner.feeds.values())
+        print(f"{n * len(symbols):>10} {indicators:>10} {elapsed / max(bars, 1) * 1000:>8.3f}")
+
+if __name__ == "__main__":
+    main()
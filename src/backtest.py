@@ -1,79 +1,180 @@
 import pandas as pd
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
-from .strategy import ScalpStrategy, TradeSignal
+from .strategy import Strategy
+from .costs import CostModel
+from .risk import RiskManager
+from .results_store import init_params
+
+# Part of every run's config, so stored results are not reused across simulation changes.
+# Bump whenever the engine would produce different trades or PnL for the same inputs.
+ENGINE_VERSION = 3
 
 class BacktestEngine:
     def __init__(
         self,
-        strategy: ScalpStrategy,
+        strategy: Strategy,
         initial_capital: float = 100000.0,
         commission: float = 0.0,
-        slippage: float = 0.0
+        slippage: float = 0.0,
+        cost_model: Optional[CostModel] = None,
+        risk_manager: Optional[RiskManager] = None
     ):
         self.strategy = strategy
         self.initial_capital = initial_capital
         self.commission = commission
         self.slippage = slippage
+        self.cost_model = cost_model
+        self.risk_manager = risk_manager or RiskManager()
         self.positions: List[Dict] = []
         self.trades: List[Dict] = []
-        self.equity_curve: List[Dict] = []
+        self.equity_curve = pd.DataFrame(columns=['timestamp', 'equity'])
         
     def run(self, data: pd.DataFrame) -> Dict:
         """Run backtest on historical data."""
+        self.positions = []
+        self.trades = []
+        
         current_capital = self.initial_capital
+        current_equity = self.initial_capital
         current_position = None
+        self.risk_manager.reset()
+        
+        # Signals for every bar are computed once up front
+        signals = self.strategy.precompute(data)
+        bars = {
+            'open': data['open'].to_numpy(dtype=float),
+            'close': data['close'].to_numpy(dtype=float),
+            'high': data['high'].to_numpy(dtype=float),
+            'low': data['low'].to_numpy(dtype=float),
+            'volume': data['volume'].to_numpy(dtype=float),
+            'time': pd.DatetimeIndex(data.index).values.astype('datetime64[ns]').astype(np.int64)
+        }
+        direction = signals['direction']
+        
+        # Sizing and session boundaries are evaluated for all bars at once
+        volatility = signals.get('volatility')
+        if volatility is None:
+            volatility = self.risk_manager.estimate_volatility(bars['close'])
+        fractions = self.risk_manager.position_fractions(volatility)
+        session_days = self.risk_manager.session_days(data.index)
+        # Spreads for every bar up front, so each trade is costed as it closes
+        spread = self.cost_model.estimate_spread(bars['high'], bars['low']) if self.cost_model is not None else None
         
         for i in range(len(data)):
             current_time = data.index[i]
-            current_data = data.iloc[:i+1]
+            self.risk_manager.start_bar(session_days[i], current_equity)
             
             # Check for exit conditions if in position
+            exited_intrabar = False
             if current_position:
-                exit_signal = self._check_exit_conditions(current_position, current_data)
-                if exit_signal:
-                    current_capital = self._close_position(current_position, current_data, current_capital)
+                exit_fill = self._check_exit_conditions(current_position, bars, i)
+                if exit_fill:
+                    current_capital = self._close_position(current_position, exit_fill, i, current_time, current_capital, bars, spread)
+                    current_equity += self.trades[-1]['pnl']
+                    self.risk_manager.record_close(self.trades[-1]['pnl'])
                     current_position = None
+                    exited_intrabar = self.strategy.intrabar_exits
             
-            # Generate new signals if not in position
-            if not current_position:
-                signal = self.strategy.generate_signals(current_data)
-                if signal:
-                    current_position = self._open_position(signal, current_data, current_capital)
-                    if current_position:
-                        current_capital -= current_position['entry_price'] * current_position['size']
-            
-            # Update equity curve
-            self.equity_curve.append({
-                'timestamp': current_time,
-                'equity': current_capital
-            })
+            # Open a new position on the precomputed signal if flat; an intrabar
+            # exit already used this bar, so its entry signal can't be acted on
+            if not current_position and not exited_intrabar and direction[i] != 0 and self.risk_manager.can_open():
+                current_position = self._open_position(signals, i, current_time, bars['time'][i], current_equity, current_capital, fractions[i])
+                if current_position:
+                    current_capital -= current_position['margin']
+                    self.risk_manager.record_open()
+        
+        self.equity_curve = self._build_equity_curve(data.index)
         
         return self._generate_performance_metrics()
     
-    def _open_position(self, signal: TradeSignal, data: pd.DataFrame, capital: float) -> Dict:
-        """Open a new position based on signal."""
-        position_size = int(capital * 0.1 / signal.price)  # 10% of capital
+    def get_config(self) -> Dict:
+        """Settings that determine a run's results, used to key stored runs."""
+        return {
+            'engine_version': ENGINE_VERSION,
+            'strategy': self.strategy.name,
+            'strategy_params': init_params(self.strategy),
+            'initial_capital': self.initial_capital,
+            'commission': self.commission,
+            'slippage': self.slippage,
+            'cost_model': init_params(self.cost_model) if self.cost_model is not None else None,
+            'risk': init_params(self.risk_manager)
+        }
+    
+    def _apply_costs(self, trades: List[Dict], bars: Dict[str, np.ndarray], spread: np.ndarray):
+        """Re-price closed trades through the cost model, net of fees, spread and impact."""
+        arrays = {
+            'entry_index': np.array([t['entry_index'] for t in trades]),
+            'exit_index': np.array([t['exit_index'] for t in trades]),
+            'entry_price': np.array([t['entry_price'] for t in trades], dtype=float),
+            'exit_price': np.array([t['exit_price'] for t in trades], dtype=float),
+            'size': np.array([t['size'] for t in trades], dtype=float),
+            'direction': np.array([1 if t['direction'] == 'LONG' else -1 for t in trades])
+        }
+        adjusted = self.cost_model.apply(arrays, bars, spread)
+        if self.cost_model.latency_bars > 0 and self.slippage:
+            # Delayed fills are re-priced from the later open, so apply the engine's slippage to them again
+            adjusted['entry_price'] = adjusted['entry_price'] * (1 + self.slippage)
+            adjusted['exit_price'] = adjusted['exit_price'] * (1 - arrays['direction'] * self.slippage)
+        
+        pnl = arrays['direction'] * (adjusted['exit_price'] - adjusted['entry_price']) * arrays['size']
+        pnl -= adjusted['fees'] + self.commission * 2
+        
+        for j, trade in enumerate(trades):
+            trade['entry_price'] = adjusted['entry_price'][j]
+            trade['exit_price'] = adjusted['exit_price'][j]
+            trade['fees'] = adjusted['fees'][j]
+            trade['pnl'] = pnl[j]
+    
+    def _build_equity_curve(self, index: pd.Index) -> pd.DataFrame:
+        """Equity after realised PnL at every bar."""
+        realized = np.zeros(len(index))
+        if self.trades:
+            exit_index = np.array([t['exit_index'] for t in self.trades])
+            np.add.at(realized, exit_index, [t['pnl'] for t in self.trades])
+        
+        return pd.DataFrame({
+            'timestamp': index,
+            'equity': self.initial_capital + np.cumsum(realized)
+        })
+    
+    def _open_position(self, signals: Dict[str, np.ndarray], i: int, timestamp: pd.Timestamp, time_ns: int, equity: float, cash: float, fraction: float) -> Optional[Dict]:
+        """Open a new position from the signal arrays at bar i."""
+        price = signals['price'][i] * (1 + self.slippage)
+        direction = 'LONG' if signals['direction'][i] > 0 else 'SHORT'
+        position_size = self.risk_manager.size_position(equity, cash, price, fraction, direction)
         if position_size < 1:
             return None
             
         position = {
-            'entry_time': signal.timestamp,
-            'direction': signal.direction,
-            'entry_price': signal.price * (1 + self.slippage),
-            'stop_loss': signal.stop_loss,
-            'take_profit': signal.take_profit,
-            'size': position_size
+            'entry_time': timestamp,
+            'entry_time_ns': time_ns,
+            'entry_index': i,
+            'direction': direction,
+            'entry_price': price,
+            'stop_loss': signals['stop_loss'][i],
+            'take_profit': signals['take_profit'][i],
+            'size': position_size,
+            'margin': self.risk_manager.margin_required(direction, price * position_size)
         }
         
         self.positions.append(position)
         return position
     
-    def _close_position(self, position: Dict, data: pd.DataFrame, capital: float) -> float:
-        """Close an existing position."""
-        current_price = data['close'].iloc[-1]
-        exit_price = current_price * (1 - self.slippage if position['direction'] == 'LONG' else 1 + self.slippage)
+    def _close_position(
+        self,
+        position: Dict,
+        exit_fill: Tuple[float, str],
+        i: int,
+        timestamp: pd.Timestamp,
+        capital: float,
+        bars: Optional[Dict[str, np.ndarray]] = None,
+        spread: Optional[np.ndarray] = None
+    ) -> float:
+        """Close an existing position; with a cost model its PnL is net of costs."""
+        fill_price, exit_reason = exit_fill
+        exit_price = fill_price * (1 - self.slippage if position['direction'] == 'LONG' else 1 + self.slippage)
         
         pnl = (exit_price - position['entry_price']) * position['size']
         if position['direction'] == 'SHORT':
@@ -83,39 +184,67 @@ class BacktestEngine:
         
         trade = {
             'entry_time': position['entry_time'],
-            'exit_time': data.index[-1],
+            'exit_time': timestamp,
             'direction': position['direction'],
             'entry_price': position['entry_price'],
             'exit_price': exit_price,
             'size': position['size'],
+            'stop_loss': position['stop_loss'],
+            'take_profit': position['take_profit'],
+            'exit_reason': exit_reason,
+            'entry_index': position['entry_index'],
+            'exit_index': i,
             'pnl': pnl
         }
         
+        if self.cost_model is not None:
+            self._apply_costs([trade], bars, spread)
+        
         self.trades.append(trade)
-        return capital + pnl
+        # Release the capital committed at entry along with the realised PnL
+        return capital + position['margin'] + trade['pnl']
     
-    def _check_exit_conditions(self, position: Dict, data: pd.DataFrame) -> bool:
-        """Check if position should be closed."""
-        current_price = data['close'].iloc[-1]
-        
-        # Check stop loss
-        if position['direction'] == 'LONG' and current_price <= position['stop_loss']:
-            return True
-        elif position['direction'] == 'SHORT' and current_price >= position['stop_loss']:
-            return True
+    def _check_exit_conditions(self, position: Dict, bars: Dict[str, np.ndarray], i: int) -> Optional[Tuple[float, str]]:
+        """Return the (fill price, reason) if the position should be closed at bar i."""
+        is_long = position['direction'] == 'LONG'
+        stop_loss = position['stop_loss']
+        take_profit = position['take_profit']
+        
+        if self.strategy.intrabar_exits:
+            # Filled at the stop/target level as soon as the bar's range reaches it
+            if is_long:
+                if bars['low'][i] <= stop_loss:
+                    return stop_loss, 'stop_loss'
+                if bars['high'][i] >= take_profit:
+                    return take_profit, 'take_profit'
+            else:
+                if bars['high'][i] >= stop_loss:
+                    return stop_loss, 'stop_loss'
+                if bars['low'][i] <= take_profit:
+                    return take_profit, 'take_profit'
+        else:
+            current_price = bars['close'][i]
             
-        # Check take profit
-        if position['direction'] == 'LONG' and current_price >= position['take_profit']:
-            return True
-        elif position['direction'] == 'SHORT' and current_price <= position['take_profit']:
-            return True
+            # Check stop loss
+            if is_long and current_price <= stop_loss:
+                return current_price, 'stop_loss'
+            elif not is_long and current_price >= stop_loss:
+                return current_price, 'stop_loss'
+                
+            # Check take profit
+            if is_long and current_price >= take_profit:
+                return current_price, 'take_profit'
+            elif not is_long and current_price <= take_profit:
+                return current_price, 'take_profit'
             
         # Check max holding time
-        holding_time = data.index[-1] - position['entry_time']
-        if holding_time >= timedelta(minutes=self.strategy.max_holding_time):
-            return True
+        max_holding_time = self.strategy.max_holding_time
+        if max_holding_time is not None:
+            holding_ns = bars['time'][i] - position['entry_time_ns']
+            if holding_ns >= max_holding_time * 60 * 1_000_000_000:
+                return bars['close'][i], 'max_holding_time'
             
-        return False
+        return None
     
     def _generate_performance_metrics(self) -> Dict:
         """Calculate performance metrics from backtest results."""
@@ -144,6 +273,7 @@ class BacktestEngine:
             'average_win': avg_win,
             'average_loss': avg_loss,
             'total_pnl': total_pnl,
+            'total_fees': trades_df['fees'].sum() if 'fees' in trades_df else 0.0,
             'max_drawdown': max_drawdown,
             'sharpe_ratio': self._calculate_sharpe_ratio(equity_df)
         }
@@ -0,0 +1,136 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import logging
+from .resampler import MARKET_TIMEZONE, OHLCV_COLUMNS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (symbol, timeframe, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS validation (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    checked_at INTEGER NOT NULL,
+    report TEXT NOT NULL,
+    PRIMARY KEY (symbol, timeframe)
+);
+"""
+
+
+class BarStore:
+    """Local SQLite store of OHLCV bars keyed by symbol, timeframe and UTC timestamp."""
+    def __init__(self, path: str = 'data/bars.db'):
+        self.path = path
+        # SQLite allows one writer at a time; concurrent ingestion threads queue here
+        self._write_lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """Insert or replace bars; returns the number of rows written."""
+        if df.empty:
+            return 0
+
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is None:
+            index = index.tz_localize(MARKET_TIMEZONE)
+        ts = index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[ns]').astype(np.int64)
+
+        values = df[OHLCV_COLUMNS].to_numpy(dtype=float)
+        rows = [
+            (symbol, timeframe, int(t), o, h, l, c, v)
+            for t, (o, h, l, c, v) in zip(ts, values.tolist())
+        ]
+        with self._write_lock, closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def read(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """Bars for a symbol in [start, end], indexed in exchange local time."""
+        query = "SELECT ts, open, high, low, close, volume FROM bars WHERE symbol = ? AND timeframe = ?"
+        params: list = [symbol, timeframe]
+        if start is not None:
+            query += " AND ts >= ?"
+            params.append(self._to_ns(start))
+        if end is not None:
+            query += " AND ts <= ?"
+            params.append(self._to_ns(end))
+        query += " ORDER BY ts"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        if not rows:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        data = np.array(rows, dtype=float)
+        index = pd.to_datetime(data[:, 0].astype(np.int64), utc=True).tz_convert(MARKET_TIMEZONE)
+        return pd.DataFrame(data[:, 1:], index=index, columns=OHLCV_COLUMNS)
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT MAX(ts) FROM bars WHERE symbol = ? AND timeframe = ?", (symbol, timeframe)
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return pd.Timestamp(row[0], unit='ns', tz='UTC').tz_convert(MARKET_TIMEZONE)
+
+    def save_report(self, symbol: str, timeframe: str, report: Dict):
+        """Keep the validation report from the last ingestion of a symbol."""
+        with self._write_lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO validation VALUES (?, ?, ?, ?)",
+                (symbol, timeframe, pd.Timestamp.now(tz='UTC').value, json.dumps(report))
+            )
+
+    def get_report(self, symbol: str, timeframe: str) -> Optional[Dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT report FROM validation WHERE symbol = ? AND timeframe = ?", (symbol, timeframe)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def symbols(self, timeframe: Optional[str] = None) -> List[str]:
+        query = "SELECT DISTINCT symbol FROM bars"
+        params: list = []
+        if timeframe:
+            query += " WHERE timeframe = ?"
+            params.append(timeframe)
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute(query + " ORDER BY symbol", params)]
+
+    def _to_ns(self, timestamp) -> int:
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tz is None:
+            timestamp = timestamp.tz_localize(MARKET_TIMEZONE)
+        return int(timestamp.tz_convert('UTC').value)
@@ -0,0 +1,66 @@
+import os
+import pickle
+import tempfile
+import time
+import zlib
+from typing import Any, Dict, Optional
+import logging
+
+# Bump when the layout of the saved state changes; older checkpoints are then ignored
+CHECKPOINT_VERSION = 2
+
+
+class CheckpointStore:
+    """Compact, atomically replaced snapshot of live bot state on local disk.
+
+    State is pickled and zlib-compressed, written to a temporary file in the
+    same directory, fsynced and renamed over the previous checkpoint, so a
+    crash mid-write leaves the last complete checkpoint in place.
+    """
+    def __init__(self, path: str = 'data/checkpoints/bot.ckpt'):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def save(self, state: Dict[str, Any]) -> int:
+        """Write a checkpoint; returns its size in bytes."""
+        payload = zlib.compress(pickle.dumps(
+            {'version': CHECKPOINT_VERSION, 'saved_at': time.time(), 'state': state},
+            protocol=pickle.HIGHEST_PROTOCOL
+        ))
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return len(payload)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """The last saved state, or None if there is no usable checkpoint."""
+        try:
+            with open(self.path, 'rb') as f:
+                checkpoint = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable checkpoint {self.path}: {str(e)}")
+            return None
+
+        if checkpoint.get('version') != CHECKPOINT_VERSION:
+            self.logger.warning(f"Ignoring checkpoint {self.path} with version {checkpoint.get('version')}")
+            return None
+        self.logger.info(f"Loaded checkpoint saved {time.time() - checkpoint['saved_at']:.0f}s ago")
+        return checkpoint['state']
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,119 @@
+import numpy as np
+from typing import Dict, Optional
+import logging
+
+
+class CostModel:
+    """Transaction cost and latency model applied to backtest fills.
+
+    Every adjustment is computed over whole arrays of trades at once:
+    bar spreads estimated from high/low, square-root volume-participation
+    impact, per-share/per-order fees and a fill delay of `latency_bars`.
+
+    Latency only moves the fill: a delayed order fills at the open
+    `latency_bars` after its decision bar, but the backtest still decides
+    exits on the original bars and stop/target levels.
+    """
+    def __init__(
+        self,
+        min_spread_bps: float = 0.5,  # floor for the estimated bid/ask spread
+        spread_window: int = 20,  # bars averaged by the high/low spread estimator
+        impact_coefficient: float = 0.1,  # scales sqrt(size / bar volume) impact
+        per_share_fee: float = 0.0,
+        per_order_fee: float = 0.0,
+        min_order_fee: float = 0.0,
+        max_fee_pct: Optional[float] = None,  # cap on fees as a fraction of order value
+        latency_bars: int = 0  # bars between the decision and the fill
+    ):
+        if latency_bars < 0:
+            raise ValueError("latency_bars must be non-negative")
+        self.min_spread_bps = min_spread_bps
+        self.spread_window = spread_window
+        self.impact_coefficient = impact_coefficient
+        self.per_share_fee = per_share_fee
+        self.per_order_fee = per_order_fee
+        self.min_order_fee = min_order_fee
+        self.max_fee_pct = max_fee_pct
+        self.latency_bars = latency_bars
+        self.logger = logging.getLogger(__name__)
+
+    def estimate_spread(self, high: np.ndarray, low: np.ndarray) -> np.ndarray:
+        """Estimate the relative bid/ask spread per bar (Corwin-Schultz high/low estimator)."""
+        log_range = np.log(high / low)
+        prev_log_range = np.concatenate(([log_range[0]], log_range[:-1]))
+        prev_high = np.concatenate(([high[0]], high[:-1]))
+        prev_low = np.concatenate(([low[0]], low[:-1]))
+
+        beta = log_range ** 2 + prev_log_range ** 2
+        gamma = np.log(np.maximum(high, prev_high) / np.minimum(low, prev_low)) ** 2
+        denom = 3 - 2 * np.sqrt(2)
+        alpha = (np.sqrt(2 * beta) - np.sqrt(beta)) / denom - np.sqrt(gamma / denom)
+        spread = 2 * (np.exp(alpha) - 1) / (1 + np.exp(alpha))
+
+        # Single two-bar estimates are noisy and often negative, so clip and smooth
+        spread = np.nan_to_num(np.clip(spread, 0.0, None))
+        window = max(1, self.spread_window)
+        cumsum = np.cumsum(np.concatenate(([0.0], spread)))
+        counts = np.minimum(np.arange(1, len(spread) + 1), window)
+        starts = np.arange(1, len(spread) + 1) - counts
+        smoothed = (cumsum[1:] - cumsum[starts]) / counts
+
+        return np.maximum(smoothed, self.min_spread_bps / 10000)
+
+    def fees(self, price: np.ndarray, size: np.ndarray) -> np.ndarray:
+        """Fee charged for a single fill of each order."""
+        fee = np.maximum(self.per_order_fee + self.per_share_fee * size, self.min_order_fee)
+        if self.max_fee_pct is not None:
+            fee = np.minimum(fee, self.max_fee_pct * price * size)
+        return fee
+
+    def fill_prices(
+        self,
+        index: np.ndarray,
+        price: np.ndarray,
+        size: np.ndarray,
+        side: np.ndarray,
+        bars: Dict[str, np.ndarray],
+        spread: np.ndarray
+    ) -> np.ndarray:
+        """Adjust decision prices for latency, half the spread and market impact.
+
+        `side` is +1 for buys and -1 for sells, so costs always move the fill
+        against the trader. With latency the delayed open replaces `price`.
+        """
+        fill_index = np.minimum(index + self.latency_bars, len(bars['close']) - 1)
+        if self.latency_bars > 0:
+            price = bars['open'][fill_index]
+
+        volume = np.maximum(bars['volume'][fill_index], 1.0)
+        bar_volatility = np.log(bars['high'][fill_index] / bars['low'][fill_index])
+        impact = self.impact_coefficient * bar_volatility * np.sqrt(size / volume)
+
+        return price * (1 + side * (spread[fill_index] / 2 + impact))
+
+    def apply(
+        self,
+        trades: Dict[str, np.ndarray],
+        bars: Dict[str, np.ndarray],
+        spread: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """Return cost-adjusted entry/exit prices and total fees for arrays of trades.
+
+        `trades` holds 'entry_index', 'exit_index', 'entry_price', 'exit_price',
+        'size' and 'direction' (1 long, -1 short). Pass `spread` from
+        `estimate_spread` when pricing trades one at a time over the same bars.
+        """
+        if spread is None:
+            spread = self.estimate_spread(bars['high'], bars['low'])
+        direction = trades['direction']
+        size = trades['size']
+
+        entry_price = self.fill_prices(trades['entry_index'], trades['entry_price'], size, direction, bars, spread)
+        exit_price = self.fill_prices(trades['exit_index'], trades['exit_price'], size, -direction, bars, spread)
+        fees = self.fees(entry_price, size) + self.fees(exit_price, size)
+
+        return {
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'fees': fees
+        }
@@ -1,12 +1,16 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
 import yfinance as yf
 from alpaca.data.historical import StockHistoricalDataClient
 from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
 import logging
+from .resampler import resample_bars
+from .market_calendar import default_calendar as market_calendar
+from .validation import DataValidator, drop_zero_volume
+from .ingestion import YFINANCE_HISTORY_DAYS
 
 class DataHandler:
     def __init__(
@@ -14,12 +18,16 @@ class DataHandler:
         symbol: str = 'SPY',
         data_source: str = 'yfinance',  # 'yfinance' or 'alpaca'
         api_key: Optional[str] = None,
-        api_secret: Optional[str] = None
+        api_secret: Optional[str] = None,
+        validator: Optional[DataValidator] = None
     ):
         self.symbol = symbol
         self.data_source = data_source
         self.api_key = api_key
         self.api_secret = api_secret
+        # Downloads are validated once here, so strategies and backtests get clean bars
+        self.validator = validator or DataValidator()
+        self.validation_report = None
         self.logger = logging.getLogger(__name__)
         
         if data_source == 'alpaca' and (not api_key or not api_secret):
@@ -40,6 +48,12 @@ class DataHandler:
         else:
             return self._get_alpaca_data(start_date, end_date, timeframe)
     
+    def history_limit(self, timeframe: str) -> Optional[timedelta]:
+        """How far back the data source serves bars of a timeframe, or None if unlimited."""
+        if self.data_source == 'yfinance' and timeframe in YFINANCE_HISTORY_DAYS:
+            return timedelta(days=YFINANCE_HISTORY_DAYS[timeframe])
+        return None
+    
     def _get_yfinance_data(
         self,
         start_date: datetime,
@@ -61,12 +75,10 @@ class DataHandler:
         interval = interval_map.get(timeframe, '1m')
         
         # Check if the date range is too large for the interval
-        if interval == '1m' and (end_date - start_date).days > 7:
-            self.logger.warning("Date range too large for 1-minute data. Limiting to last 7 days.")
-            start_date = end_date - timedelta(days=7)
-        elif interval == '5m' and (end_date - start_date).days > 60:
-            self.logger.warning("Date range too large for 5-minute data. Limiting to last 60 days.")
-            start_date = end_date - timedelta(days=60)
+        limit = self.history_limit(interval)
+        if limit is not None and (end_date - start_date).days > limit.days:
+            self.logger.warning(f"Date range too large for {interval} data. Limiting to last {limit.days} days.")
+            start_date = end_date - limit
             
         try:
             df = ticker.history(
@@ -85,7 +97,7 @@ class DataHandler:
             self.logger.info(f"Columns: {df.columns.tolist()}")
             self.logger.info(f"Sample data:\n{df.head()}")
             
-            return self._process_dataframe(df)
+            return self._process_dataframe(df, timeframe)
             
         except Exception as e:
             self.logger.error(f"Error fetching data from Yahoo Finance: {str(e)}")
@@ -98,18 +110,15 @@ class DataHandler:
         timeframe: str
     ) -> pd.DataFrame:
         """Fetch data from Alpaca."""
-        # Convert timeframe to Alpaca format
-        timeframe_map = {
-            '1m': TimeFrame.Minute,
-            '5m': TimeFrame.Minute,
-            '15m': TimeFrame.Minute,
-            '1h': TimeFrame.Hour,
-            '1d': TimeFrame.Day
-        }
+        # Intraday timeframes are built from 1-minute bars so they share session boundaries
+        if timeframe == '1d':
+            alpaca_timeframe = TimeFrame.Day
+        else:
+            alpaca_timeframe = TimeFrame.Minute
         
         request_params = StockBarsRequest(
             symbol_or_symbols=self.symbol,
-            timeframe=timeframe_map[timeframe],
+            timeframe=alpaca_timeframe,
             start=start_date,
             end=end_date
         )
@@ -117,10 +126,41 @@ class DataHandler:
         bars = self.client.get_stock_bars(request_params)
         df = bars.df
         
-        return self._process_dataframe(df)
+        # Multi-symbol responses are indexed by (symbol, timestamp)
+        if isinstance(df.index, pd.MultiIndex):
+            df = df.xs(self.symbol, level='symbol')
+        
+        df = self._process_dataframe(df, '1d' if timeframe == '1d' else '1m')
+        if timeframe in ('5m', '15m', '1h'):
+            df = self._process_dataframe(resample_bars(df, timeframe))
+        
+        return df
+    
+    def get_multi_timeframe_data(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        timeframes: List[str],
+        base: Optional[pd.DataFrame] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """Fetch 1-minute bars once and resample them into every requested timeframe.
+        
+        Pass `base` to resample 1-minute bars already fetched (e.g. from a cache).
+        """
+        if base is None:
+            base = self.get_historical_data(start_date, end_date, '1m')
+        
+        result = {}
+        for timeframe in timeframes:
+            if timeframe == '1m' or base.empty:
+                result[timeframe] = base
+            else:
+                result[timeframe] = self._process_dataframe(resample_bars(base, timeframe))
+        
+        return result
     
-    def _process_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Process and clean the dataframe."""
+    def _process_dataframe(self, df: pd.DataFrame, timeframe: Optional[str] = None) -> pd.DataFrame:
+        """Process and clean the dataframe, validating raw downloads of the given timeframe."""
         # Convert column names to lowercase if they exist in uppercase
         column_map = {
             'Open': 'open',
@@ -139,7 +179,11 @@ class DataHandler:
         
         # Clean data
         df = df.dropna()
-        df = df[df['volume'] > 0]  # Remove zero-volume bars
+        
+        # Bars resampled from already-validated data are passed without a timeframe
+        if timeframe is not None:
+            df, self.validation_report = self.validator.validate(df, timeframe)
+        df = drop_zero_volume(df, self.validator)
         
         # Calculate additional features
         df['returns'] = df['close'].pct_change()
@@ -156,7 +200,15 @@ class DataHandler:
     
     def get_intraday_data(self, date: datetime) -> pd.DataFrame:
         """Get intraday data for a specific date."""
-        start_date = date.replace(hour=9, minute=30, second=0)
-        end_date = date.replace(hour=16, minute=0, second=0)
+        if not market_calendar.is_session(date):
+            self.logger.warning(f"{date.date()} is not a trading session")
+            return pd.DataFrame()
+            
+        # Session bounds come from the calendar, so early closes are respected
+        start_date = market_calendar.session_open(date)
+        end_date = market_calendar.session_close(date)
         
-        return self.get_historical_data(start_date, end_date, '1m') 
\ No newline at end of file
+        df = self.get_historical_data(start_date, end_date, '1m')
+        if df.empty:
+            return df
+        return df[market_calendar.session_mask(df.index)] 
\ No newline at end of file
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+DOWNSAMPLE_METHODS = ['lttb', 'minmax']
+# Fewest output points each method can reduce to (LTTB: both ends and a bucket; min-max: both ends and one bucket's min and max)
+DOWNSAMPLE_MIN_POINTS = {'lttb': 3, 'minmax': 4}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of n_out points preserving the visual shape.
+
+    The first and last points are always kept. Bucket bounds and the averages
+    of every bucket are computed up front with reduceat; the remaining loop is
+    one vectorized argmax per output point.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # The point after the last bucket is the final point itself
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        xs = x[start:end]
+        ys = y[start:end]
+        # Twice the triangle area between the previous pick, each candidate and the next bucket's mean
+        area = np.abs((x[a] - next_x[i]) * (ys - y[a]) - (x[a] - xs) * (next_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of (n_out - 2) / 2 equal buckets, plus both ends."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = (n_out - 2) // 2
+    bucket = np.arange(n) * n_buckets // n
+    # Sorted by bucket then value, the first row of each bucket is its min and the last its max
+    order = np.lexsort((np.asarray(y, dtype=float), bucket))
+    boundaries = np.flatnonzero(np.diff(bucket[order])) + 1
+    firsts = order[np.concatenate(([0], boundaries))]
+    lasts = order[np.concatenate((boundaries - 1, [n - 1]))]
+    return np.unique(np.concatenate(([0, n - 1], firsts, lasts)))
+
+
+def downsample_indices(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_points: int,
+    method: str = 'lttb',
+    keep: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Sorted indices of at most max_points points, including as much of `keep` as fits.
+
+    The method always gets at least its minimum number of points; when `keep`
+    is larger than the rest of the budget it is thinned evenly.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsample method: {method}")
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    min_points = DOWNSAMPLE_MIN_POINTS[method]
+    if max_points < min_points:
+        raise ValueError(f"max_points must be at least {min_points} for {method}")
+
+    keep = np.unique(np.asarray(keep if keep is not None else [], dtype=np.int64))
+    room = max_points - min_points
+    if len(keep) > room:
+        keep = keep[np.unique(np.linspace(0, len(keep) - 1, room).round().astype(np.int64))]
+    n_out = max_points - len(keep)
+    if method == 'lttb':
+        indices = lttb_indices(x, y, n_out)
+    else:
+        indices = minmax_indices(y, n_out)
+    return np.union1d(indices, keep)
+
+
+def downsample_series(
+    records: List[Dict],
+    max_points: int,
+    method: str = 'lttb',
+    trades: Optional[List[Dict]] = None
+) -> Tuple[List[Dict], List[Dict]]:
+    """Downsample OHLCV records on their closes and place trade markers on the result.
+
+    The bars containing each trade's entry and exit are kept while they fit in
+    max_points, and each marker gives the position of its bar in the returned
+    records. A marker's `price` is the fill price, not the bar's close, so it
+    need not lie on the plotted line. When there are more trade bars than
+    max_points allows, they are thinned evenly and markers whose bar was
+    dropped are left out.
+    """
+    if not records:
+        return records, []
+
+    times = pd.to_datetime([r['date'] for r in records], utc=True).values.astype('datetime64[ns]').astype(np.int64)
+    closes = np.array([r['close'] for r in records], dtype=float)
+
+    events = []
+    for trade in trades or []:
+        for kind in ('entry', 'exit'):
+            if trade.get(f"{kind}_time"):
+                events.append((kind, trade))
+    event_times = pd.to_datetime([t[f"{kind}_time"] for kind, t in events], utc=True)
+    # The bar containing each fill: the last bar starting at or before it
+    event_bars = np.clip(
+        np.searchsorted(times, event_times.values.astype('datetime64[ns]').astype(np.int64), side='right') - 1,
+        0,
+        len(records) - 1
+    )
+
+    indices = downsample_indices(times, closes, max_points, method, keep=event_bars)
+    sampled = [records[i] for i in indices]
+
+    positions = np.searchsorted(indices, event_bars)
+    plotted = np.isin(event_bars, indices)
+    markers = [
+        {
+            'index': int(position),
+            'date': sampled[position]['date'],
+            'type': kind,
+            'direction': trade.get('direction'),
+            'price': trade.get(f"{kind}_price"),
+            'pnl': trade.get('pnl') if kind == 'exit' else None
+        }
+        for (kind, trade), position, shown in zip(events, positions, plotted)
+        if shown
+    ]
+    return sampled, markers
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Dict
+
+# Squeeze when the current band width is below 98% of its rolling average
+SQUEEZE_THRESHOLD = 0.98
+
+
+def squeeze_features(df: pd.DataFrame, period: int, threshold: float = SQUEEZE_THRESHOLD) -> pd.DataFrame:
+    """Vectorized Bollinger squeeze columns computed from existing bb_upper/bb_middle/bb_lower.
+
+    Adds 'bb_width', 'bb_width_ma', 'squeeze', 'squeeze_duration' (consecutive
+    bars in the current squeeze) and 'squeeze_intensity' (how far the width is
+    below its average, as a fraction).
+    """
+    band_width = df['bb_upper'] - df['bb_lower']
+    df['bb_width'] = band_width / df['bb_middle']
+    df['bb_width_ma'] = band_width.rolling(window=period).mean() / df['bb_middle'].rolling(window=period).mean()
+    df['squeeze'] = df['bb_width'] < df['bb_width_ma'] * threshold
+
+    # Running count that restarts at every bar outside a squeeze
+    squeeze = df['squeeze'].astype(int)
+    df['squeeze_duration'] = squeeze.groupby((~df['squeeze']).cumsum()).cumsum()
+    df['squeeze_intensity'] = 1 - df['bb_width'] / df['bb_width_ma']
+    return df
+
+
+class RollingWindow:
+    """Fixed-length window with O(1) running mean and variance.
+
+    Uses Welford's update, replacing the oldest value once the window is
+    full, and recomputes both from the buffer every `size` replacements so
+    rounding can't accumulate over a long live session.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self._mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self._replaced = 0
+
+    def push(self, value: float):
+        n = len(self.values)
+        if n < self.size:
+            delta = value - self._mean
+            self._mean += delta / (n + 1)
+            self._m2 += delta * (value - self._mean)
+            self.values.append(value)
+            return
+
+        old = self.values[0]
+        self.values.append(value)
+        self._replaced += 1
+        if self._replaced >= self.size:
+            self._replaced = 0
+            values = np.fromiter(self.values, dtype=float, count=n)
+            self._mean = float(values.mean())
+            self._m2 = float(((values - self._mean) ** 2).sum())
+            return
+        old_mean = self._mean
+        self._mean += (value - old) / n
+        self._m2 = max(self._m2 + (value - old) * (value - self._mean + old - old_mean), 0.0)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def mean(self) -> float:
+        return self._mean if self.values else np.nan
+
+    def std(self, ddof: int = 0) -> float:
+        n = len(self.values)
+        if n <= ddof:
+            return np.nan
+        return float(np.sqrt(max(self._m2, 0.0) / (n - ddof)))
+
+
+class SqueezeTracker:
+    """O(1) per-bar Bollinger squeeze update matching `squeeze_features`."""
+    def __init__(self, period: int, num_std: float, threshold: float = SQUEEZE_THRESHOLD):
+        self.period = period
+        self.num_std = num_std
+        self.threshold = threshold
+        self.closes = RollingWindow(period)
+        self.band_widths = RollingWindow(period)
+        self.middles = RollingWindow(period)
+        self.duration = 0
+
+    def update(self, close: float) -> Dict[str, float]:
+        self.closes.push(close)
+        result = {
+            'bb_width': np.nan,
+            'bb_width_ma': np.nan,
+            'squeeze': False,
+            'squeeze_duration': 0,
+            'squeeze_intensity': np.nan
+        }
+        if not self.closes.full:
+            return result
+
+        middle = self.closes.mean()
+        band_width = 2 * self.num_std * self.closes.std()
+        self.band_widths.push(band_width)
+        self.middles.push(middle)
+        result['bb_width'] = band_width / middle
+        if not self.band_widths.full:
+            return result
+
+        result['bb_width_ma'] = self.band_widths.mean() / self.middles.mean()
+        result['squeeze'] = result['bb_width'] < result['bb_width_ma'] * self.threshold
+        self.duration = self.duration + 1 if result['squeeze'] else 0
+        result['squeeze_duration'] = self.duration
+        result['squeeze_intensity'] = 1 - result['bb_width'] / result['bb_width_ma']
+        return result
+
+
+class WilderRSI:
+    """O(1) per-bar RSI with the same seeding and smoothing as TA-Lib's RSI."""
+    def __init__(self, period: int):
+        self.period = period
+        self.prev_close = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, close: float) -> float:
+        if self.prev_close is None:
+            self.prev_close = close
+            return np.nan
+
+        change = close - self.prev_close
+        self.prev_close = close
+        gain = max(change, 0.0)
+        loss = max(-change, 0.0)
+        self.count += 1
+
+        if self.count <= self.period:
+            # Seed with the simple average of the first `period` changes
+            self.avg_gain += gain / self.period
+            self.avg_loss += loss / self.period
+            if self.count < self.period:
+                return np.nan
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        total = self.avg_gain + self.avg_loss
+        return 100 * self.avg_gain / total if total > 0 else 0.0
+
+
+class ReturnVolatility:
+    """O(1) rolling sample standard deviation of simple returns."""
+    def __init__(self, period: int):
+        self.returns = RollingWindow(period)
+        self.prev_close = None
+
+    def update(self, close: float) -> float:
+        if self.prev_close is not None:
+            self.returns.push(close / self.prev_close - 1)
+        self.prev_close = close
+        return self.returns.std(ddof=1) if self.returns.full else np.nan
@@ -0,0 +1,498 @@
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import logging
+from .strategy import Strategy, TradeSignal
+from .risk import RiskManager
+from .orders import OrderManager
+from .ingestion import BarProvider
+from .validation import DataValidator, drop_zero_volume
+from .metrics import MetricsRegistry, StageTimer, default_registry
+from .shared_cache import SharedCache
+from .checkpoint import CheckpointStore
+from .results_store import init_params
+from .market_calendar import default_calendar as market_calendar
+from .resampler import MARKET_TIMEZONE, TIMEFRAME_MINUTES
+from .trading_bot import DECISION_SPANS, exit_reason
+
+
+def market_now() -> datetime:
+    """Current wall-clock time in the market timezone, as a naive datetime like the calendar's."""
+    return pd.Timestamp.now(tz=MARKET_TIMEZONE).tz_localize(None).to_pydatetime()
+
+
+def _market_time(timestamp: pd.Timestamp) -> datetime:
+    if timestamp.tz is not None:
+        timestamp = timestamp.tz_convert(MARKET_TIMEZONE).tz_localize(None)
+    return timestamp.to_pydatetime()
+
+
+class IndicatorBank:
+    """Streaming indicators for one symbol, one instance per class and parameter set.
+
+    Strategies declaring the same indicator with the same parameters share
+    its instance, so each bar updates it once however many strategies read it.
+    """
+    def __init__(self):
+        self.indicators: Dict[Tuple, Any] = {}
+        self.values: Dict[Tuple, Any] = {}
+
+    def register(self, strategy: Strategy) -> Dict[str, Tuple]:
+        """Map the strategy's indicator names onto shared instances, creating missing ones."""
+        keys = {}
+        for name, (cls, args) in strategy.indicator_specs().items():
+            key = (cls.__name__,) + tuple(args)
+            if key not in self.indicators:
+                self.indicators[key] = cls(*args)
+            keys[name] = key
+        return keys
+
+    def update(self, close: float) -> Dict[Tuple, Any]:
+        for key, indicator in self.indicators.items():
+            self.values[key] = indicator.update(close)
+        return self.values
+
+
+@dataclass
+class StrategySlot:
+    """One strategy instance trading one symbol, with its own position."""
+    name: str
+    symbol: str
+    strategy: Strategy
+    indicators: Dict[str, Tuple] = field(default_factory=dict)  # indicator name -> IndicatorBank key
+    position: Optional[Dict] = None
+    last_signal_time: Optional[datetime] = None
+
+    def on_bar(self, bar: pd.Series, values: Dict[Tuple, Any]) -> Optional[TradeSignal]:
+        """Evaluate on the shared indicator values, or stream the bar through the strategy's own state."""
+        if not self.indicators:
+            return self.strategy.on_bar(bar)
+        return self.strategy.evaluate(bar, {name: values[key] for name, key in self.indicators.items()})
+
+    @property
+    def signed_size(self) -> int:
+        if self.position is None:
+            return 0
+        return self.position['size'] if self.position['direction'] == 'LONG' else -self.position['size']
+
+
+class SymbolFeed:
+    """The recent bars of one symbol and the slots trading it."""
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.slots: List[StrategySlot] = []
+        self.bank = IndicatorBank()
+        self.bars = pd.DataFrame()
+        self.last_bar_time: Optional[pd.Timestamp] = None
+        self.warmup_bars = 0
+        self.net_position = 0  # shares filled at the broker, summed over the slots
+        self.pending_order: Optional[Future] = None  # the net order not yet settled at the broker
+
+    def append(self, new_bars: pd.DataFrame):
+        """Keep the longest warmup window any slot needs, for exit prices and sizing."""
+        if new_bars.empty:
+            return
+        bars = new_bars if self.bars.empty else pd.concat([self.bars, new_bars])
+        self.bars = bars.iloc[-self.warmup_bars:]
+        self.last_bar_time = new_bars.index[-1]
+
+
+class LiveRunner:
+    """Runs many strategies on many symbols from one shared live data feed.
+
+    Each poll makes batched provider requests covering every symbol.
+    Each new bar is built once and fanned out to every slot trading its
+    symbol. Indicators that several strategies declare with the same
+    parameters are updated once per bar in the symbol's IndicatorBank, so
+    adding a strategy that only varies its thresholds adds almost no work.
+
+    Cash, gross exposure and the daily risk limits are shared by all slots.
+    Each slot keeps its own position and exits. Orders are netted per
+    symbol: after every bar, only the change in the summed slot positions is
+    sent, so slots on opposite sides of a symbol don't trade against each
+    other at the broker.
+    """
+    def __init__(
+        self,
+        provider: BarProvider,
+        paper_trading: bool = True,
+        initial_capital: float = 100000.0,
+        risk_manager: Optional[RiskManager] = None,
+        order_manager: Optional[OrderManager] = None,
+        validator: Optional[DataValidator] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        metrics_cache: Optional[SharedCache] = None,
+        checkpoint: Optional[CheckpointStore] = None,
+        checkpoint_interval: float = 60.0,
+        poll_interval: float = 60.0,
+        reentry_minutes: int = 5
+    ):
+        self.provider = provider
+        self.paper_trading = paper_trading
+        self.risk_manager = risk_manager or RiskManager()
+        self.order_manager = order_manager
+        self.validator = validator
+        self.equity = initial_capital
+        self.cash = initial_capital
+        self.feeds: Dict[str, SymbolFeed] = {}
+        self.slots: Dict[str, StrategySlot] = {}
+        self.poll_interval = poll_interval
+        self.reentry_minutes = reentry_minutes
+
+        self.metrics = metrics or default_registry
+        self.metrics_cache = metrics_cache
+        self.stage_timer = StageTimer(self.metrics, DECISION_SPANS, prefix='runner')
+
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self._last_checkpoint = 0.0
+        self.logger = logging.getLogger(__name__)
+
+    def add(self, symbol: str, strategy: Strategy, name: Optional[str] = None) -> StrategySlot:
+        """Trade a strategy instance on a symbol; call before `warm_start`."""
+        feed = self.feeds.get(symbol)
+        if feed is None:
+            feed = self.feeds[symbol] = SymbolFeed(symbol)
+        name = name or f"{symbol}:{strategy.name}:{len(feed.slots)}"
+        if name in self.slots:
+            raise ValueError(f"Duplicate strategy slot: {name}")
+
+        strategy.symbol = symbol
+        strategy.reset()
+        slot = StrategySlot(name, symbol, strategy, feed.bank.register(strategy))
+        feed.slots.append(slot)
+        feed.warmup_bars = max(feed.warmup_bars, strategy.warmup_bars)
+        self.slots[name] = slot
+        return slot
+
+    def run(self):
+        """Poll, fan out and trade until interrupted."""
+        self.logger.info(f"Starting live runner: {len(self.slots)} strategies on {len(self.feeds)} symbols")
+        if self.checkpoint is None:
+            self.checkpoint = CheckpointStore('data/checkpoints/live_runner.ckpt')
+        self.warm_start()
+
+        try:
+            while True:
+                try:
+                    self.step()
+                    time.sleep(self.poll_interval)
+                except Exception as e:
+                    self.logger.error(f"Error in live runner: {str(e)}")
+                    time.sleep(300)
+        finally:
+            self.save_checkpoint()
+
+    def step(self, now: Optional[datetime] = None) -> int:
+        """One poll: fetch every symbol's new bars, update all slots and route orders. Returns bars processed."""
+        now = now or market_now()
+        self.stage_timer.begin()
+        new_bars = self._fetch_new_bars(now)
+        self.stage_timer.mark('bar')
+
+        if new_bars:
+            # Every bar updates the indicators; only each symbol's newest one can trigger a trade
+            signals = {symbol: self._replay(self.feeds[symbol], bars) for symbol, bars in new_bars.items()}
+            self.stage_timer.mark('signal')
+
+            self.risk_manager.start_bar(now.date(), self.equity)
+            changed = False
+            for symbol, slot_signals in signals.items():
+                changed |= self._trade(self.feeds[symbol], slot_signals, now)
+            self.stage_timer.mark('done')
+            self.stage_timer.end()
+
+            # Position changes are checkpointed at once, everything else periodically
+            if changed or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                self.save_checkpoint()
+
+        if self.metrics_cache is not None:
+            self.metrics.publish(self.metrics_cache)
+        return sum(len(bars) for bars in new_bars.values())
+
+    def warm_start(self, now: Optional[datetime] = None) -> int:
+        """Restore the last checkpoint and replay the bars missed since; signals on replayed bars aren't traded."""
+        started = time.perf_counter()
+        state = self.checkpoint.load() if self.checkpoint is not None else None
+        restored = state is not None and self._restore_state(state)
+        if not restored:
+            self._reset_streams()
+
+        new_bars = self._fetch_new_bars(now or market_now())
+        for symbol, bars in new_bars.items():
+            self._replay(self.feeds[symbol], bars)
+
+        self.logger.info(
+            f"Ready in {time.perf_counter() - started:.2f}s: "
+            f"{'restored checkpoint, ' if restored else 'cold start, '}"
+            f"replayed {sum(len(bars) for bars in new_bars.values())} bars for {len(new_bars)} symbols"
+        )
+        return sum(len(bars) for bars in new_bars.values())
+
+    def save_checkpoint(self):
+        """Atomically write indicator state, slot positions and account state."""
+        if self.checkpoint is None:
+            return
+        size = self.checkpoint.save({
+            'slots': self._slot_config(),
+            'indicators': {symbol: feed.bank.indicators for symbol, feed in self.feeds.items()},
+            'strategy_states': {
+                name: slot.strategy.get_state() for name, slot in self.slots.items() if not slot.indicators
+            },
+            'positions': {name: (slot.position, slot.last_signal_time) for name, slot in self.slots.items()},
+            'feeds': {
+                symbol: (feed.last_bar_time, feed.bars, feed.net_position) for symbol, feed in self.feeds.items()
+            },
+            'risk_state': self.risk_manager.get_state(),
+            'equity': self.equity,
+            'cash': self.cash
+        })
+        self._last_checkpoint = time.monotonic()
+        self.logger.debug(f"Checkpoint written ({size} bytes)")
+
+    def gross_exposure(self) -> float:
+        return sum(slot.position['entry_price'] * slot.position['size'] for slot in self.slots.values() if slot.position)
+
+    def _slot_config(self) -> List[Tuple]:
+        return [
+            (name, slot.symbol, slot.strategy.name, init_params(slot.strategy))
+            for name, slot in self.slots.items()
+        ]
+
+    def _reset_streams(self):
+        for feed in self.feeds.values():
+            self._reset_feed(feed)
+
+    def _reset_feed(self, feed: SymbolFeed):
+        feed.bank = IndicatorBank()
+        for slot in feed.slots:
+            slot.indicators = feed.bank.register(slot.strategy)
+            slot.strategy.reset()
+        feed.bars = pd.DataFrame()
+        feed.last_bar_time = None
+
+    def _cold_start(self, feed: SymbolFeed, reason: str):
+        """Rebuild one symbol's indicators from its warm-up window; positions and account state are kept."""
+        self.logger.warning(f"{feed.symbol}: {reason}; rebuilding indicators from a cold start")
+        self._reset_feed(feed)
+
+    def _restore_state(self, state: Dict) -> bool:
+        """Apply a checkpoint; returns False if its indicator state can't be reused."""
+        # Account state and the positions of surviving slots are restored even when the configuration changed
+        self.equity = state['equity']
+        self.cash = state['cash']
+        self.risk_manager.set_state(state['risk_state'])
+        for name, (position, last_signal_time) in state['positions'].items():
+            if name in self.slots:
+                self.slots[name].position = position
+                self.slots[name].last_signal_time = last_signal_time
+            elif position is not None:
+                self.logger.warning(f"Checkpoint has an open position for removed slot {name}")
+        for symbol, (_, _, net_position) in state['feeds'].items():
+            if symbol in self.feeds:
+                self.feeds[symbol].net_position = net_position
+
+        if state['slots'] != self._slot_config():
+            self.logger.warning("Strategy configuration changed since the checkpoint; rebuilding indicators")
+            return False
+        for symbol, feed in self.feeds.items():
+            feed.bank.indicators = state['indicators'][symbol]
+            feed.bank.values = {}
+            feed.last_bar_time, feed.bars, _ = state['feeds'][symbol]
+        for name, strategy_state in state['strategy_states'].items():
+            self.slots[name].strategy.set_state(strategy_state)
+        return True
+
+    def _fetch_new_bars(self, now: datetime) -> Dict[str, pd.DataFrame]:
+        """Completed 1-minute bars after each symbol's last processed one, in batched requests.
+
+        Feeds without history are requested apart from the rest, from the
+        warm-up window; the others go in order of their last bar, so each
+        request starts from the oldest bar among its own symbols. A feed whose
+        bars since its last one can't all be fetched is cold-started, and
+        re-fetched once, rather than resuming its indicators across the gap.
+        """
+        history = self.provider.history_limit('1m')
+        for feed in self.feeds.values():
+            if feed.last_bar_time is not None and history is not None and now - _market_time(feed.last_bar_time) > history:
+                self._cold_start(feed, f"last bar {feed.last_bar_time} is older than the {history.days}-day 1-minute history")
+
+        result = {}
+        feeds = list(self.feeds.values())
+        for _ in range(2):
+            feeds = self._fetch_feeds(feeds, now, result)
+            if not feeds:
+                break
+        return result
+
+    def _fetch_feeds(self, feeds: List[SymbolFeed], now: datetime, result: Dict[str, pd.DataFrame]) -> List[SymbolFeed]:
+        """Add the feeds' new bars to `result`; returns the feeds cold-started for a gap."""
+        cold = [feed for feed in feeds if feed.last_bar_time is None]
+        warm = sorted((feed for feed in feeds if feed.last_bar_time is not None), key=lambda feed: feed.last_bar_time)
+        chunk_size = self.provider.max_symbols_per_request
+        chunks = [group[i:i + chunk_size] for group in (cold, warm) for i in range(0, len(group), chunk_size)]
+
+        # The current minute's bar is still forming
+        current = pd.Timestamp(now).floor('min')
+        gapped = []
+        for chunk in chunks:
+            if chunk[0].last_bar_time is None:
+                sessions = max(feed.warmup_bars for feed in chunk) // TIMEFRAME_MINUTES['1d'] + 1
+                start = market_calendar.session_open(market_calendar.sessions_back(now, sessions))
+            else:
+                start = _market_time(chunk[0].last_bar_time)
+            symbols = [feed.symbol for feed in chunk]
+            try:
+                fetched = self.provider.fetch(symbols, start, now, '1m')
+            except Exception as e:
+                self.logger.error(f"Fetch failed for {len(symbols)} symbols ({symbols[0]}...): {str(e)}")
+                continue
+
+            for feed in chunk:
+                df = fetched.get(feed.symbol)
+                if df is None or df.empty:
+                    continue
+                if self.validator is not None:
+                    try:
+                        df, _ = self.validator.validate(df, '1m')
+                    except ValueError as e:
+                        self.logger.error(f"Rejected bars for {feed.symbol}: {str(e)}")
+                        continue
+                df = drop_zero_volume(df, self.validator)
+                if df.empty:
+                    continue
+                if feed.last_bar_time is not None:
+                    # The request starts at or before the last processed bar, so a later first bar means bars are missing
+                    if df.index[0] > feed.last_bar_time:
+                        self._cold_start(
+                            feed, f"bars after {feed.last_bar_time} are missing from the provider (first is {df.index[0]})"
+                        )
+                        gapped.append(feed)
+                        continue
+                    df = df[df.index > feed.last_bar_time]
+                cutoff = current.tz_localize(MARKET_TIMEZONE).tz_convert(df.index.tz) if df.index.tz is not None else current
+                df = df[df.index < cutoff]
+                if not df.empty:
+                    result[feed.symbol] = df
+        return gapped
+
+    def _replay(self, feed: SymbolFeed, bars: pd.DataFrame) -> List[Optional[TradeSignal]]:
+        """Fan bars out to the symbol's slots; returns each slot's signal on the last bar."""
+        closes = bars['close'].to_numpy(dtype=float)
+        signals: List[Optional[TradeSignal]] = [None] * len(feed.slots)
+        for i, (_, bar) in enumerate(bars.iterrows()):
+            values = feed.bank.update(closes[i])
+            for j, slot in enumerate(feed.slots):
+                signals[j] = slot.on_bar(bar, values)
+        feed.append(bars)
+        return signals
+
+    def _trade(self, feed: SymbolFeed, signals: List[Optional[TradeSignal]], now: datetime) -> bool:
+        """Exit and enter per slot, then route the symbol's net change; returns whether any position changed."""
+        price = float(feed.bars['close'].iloc[-1])
+        before = [slot.position for slot in feed.slots]
+
+        for slot in feed.slots:
+            if slot.position is not None:
+                reason = exit_reason(slot.position, price, now, slot.strategy.max_holding_time)
+                if reason is not None:
+                    self.logger.info(f"{slot.name}: {reason} for {slot.position['direction'].lower()} position")
+                    self._close_position(slot, price)
+
+        for slot, signal in zip(feed.slots, signals):
+            if slot.position is None and signal is not None and self._is_valid_signal(slot, now):
+                self._open_position(feed, slot, signal, now)
+
+        self._route(feed)
+        return any(slot.position is not position for slot, position in zip(feed.slots, before))
+
+    def _is_valid_signal(self, slot: StrategySlot, now: datetime) -> bool:
+        # Prevent rapid re-entry
+        if slot.last_signal_time and now - slot.last_signal_time < timedelta(minutes=self.reentry_minutes):
+            return False
+        # Daily trade count and loss limits, shared by every slot
+        if not self.risk_manager.can_open():
+            self.logger.info("Risk limits reached for today")
+            return False
+        return True
+
+    def _open_position(self, feed: SymbolFeed, slot: StrategySlot, signal: TradeSignal, now: datetime):
+        # Size with the same volatility-targeted rules as the backtest, against the shared account
+        if 'volatility' in slot.indicators:
+            volatility = feed.bank.values[slot.indicators['volatility']]
+        else:
+            volatility = self.risk_manager.estimate_volatility(feed.bars['close'].to_numpy())[-1]
+        fraction = self.risk_manager.position_fractions(np.array([volatility]))[0]
+        size = self.risk_manager.size_position(
+            self.equity, self.cash, signal.price, fraction, signal.direction, self.gross_exposure()
+        )
+        if size < 1:
+            self.logger.info(f"{slot.name}: position size below one share, skipping signal")
+            return
+
+        self.logger.info(f"{slot.name}: opening {signal.direction} {size} {slot.symbol} at {signal.price}")
+        slot.position = {
+            'entry_time': now,
+            'direction': signal.direction,
+            'entry_price': signal.price,
+            'stop_loss': signal.stop_loss,
+            'take_profit': signal.take_profit,
+            'size': size,
+            'margin': self.risk_manager.margin_required(signal.direction, signal.price * size)
+        }
+        slot.last_signal_time = now
+        self.cash -= slot.position['margin']
+        self.risk_manager.record_open()
+
+    def _close_position(self, slot: StrategySlot, price: float):
+        position = slot.position
+        pnl = (price - position['entry_price']) * position['size']
+        if position['direction'] == 'SHORT':
+            pnl = -pnl
+
+        self.logger.info(f"{slot.name}: closing {position['direction']} {slot.symbol} at {price}, PnL: {pnl}")
+        self.cash += position['margin'] + pnl
+        self.equity += pnl
+        self.risk_manager.record_close(pnl)
+        slot.position = None
+
+    def _route(self, feed: SymbolFeed):
+        """Send one market order for the change in the symbol's net position."""
+        if feed.pending_order is not None and not self._settle(feed):
+            # One net order per symbol at a time; the next bar routes whatever it left
+            return
+        target = sum(slot.signed_size for slot in feed.slots)
+        delta = target - feed.net_position
+        if delta == 0:
+            return
+
+        if self.paper_trading:
+            self.logger.info(f"Paper trading: {feed.symbol} net position {feed.net_position} -> {target}")
+            feed.net_position = target
+        elif self.order_manager is None:
+            self.logger.warning(f"No order manager configured; {feed.symbol} order for {delta} not sent")
+        else:
+            # Non-blocking: the broker ack is handled on the order manager's workers
+            feed.pending_order = self.order_manager.submit_net(feed.symbol, delta, feed.last_bar_time)
+        self.stage_timer.mark('order')
+
+    def _settle(self, feed: SymbolFeed) -> bool:
+        """Fold a finished net order's filled quantity into the feed's position; False while it's still working."""
+        if not feed.pending_order.done():
+            return False
+        order = feed.pending_order.result()
+        if not order.is_terminal:
+            # Acknowledged before it filled; poll the broker for the fill
+            order = self.order_manager.refresh(order.client_order_id)
+            if not order.is_terminal:
+                return False
+        filled = order.filled_qty if order.side == 'buy' else -order.filled_qty
+        if order.filled_qty < order.qty:
+            self.logger.warning(f"{feed.symbol} net order {order.status} with {order.filled_qty} of {order.qty} filled")
+        feed.net_position += filled
+        feed.pending_order = None
+        return True
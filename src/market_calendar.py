@@ -0,0 +1,196 @@
+import pandas as pd
+import numpy as np
+from datetime import date, datetime, timedelta
+from typing import List, Tuple
+import logging
+from .resampler import TIMEFRAME_MINUTES, to_market_time
+
+REGULAR_OPEN = 9 * 60 + 30  # minutes after midnight, exchange local time
+REGULAR_CLOSE = 16 * 60
+EARLY_CLOSE = 13 * 60
+
+# Unscheduled full-day closures (weather, national days of mourning, 9/11)
+SPECIAL_CLOSURES = [
+    date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),
+    date(2004, 6, 11), date(2007, 1, 2), date(2012, 10, 29), date(2012, 10, 30),
+    date(2018, 12, 5), date(2025, 1, 9)
+]
+
+# Maximum lookback (in sessions) the data providers serve for each intraday interval
+INTRADAY_PERIOD_LIMITS = {
+    '1m': 7,
+    '5m': 60
+}
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year: int) -> List[date]:
+    """Full-day NYSE holidays for a year."""
+    holidays = [
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25))
+    ]
+    # New Year's Day on a Saturday is not observed on the prior Friday
+    new_year = date(year, 1, 1)
+    if new_year.weekday() == 6:
+        holidays.append(new_year + timedelta(days=1))
+    elif new_year.weekday() < 5:
+        holidays.append(new_year)
+    if year >= 2022:
+        holidays.append(_observed(date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+def nyse_early_closes(year: int) -> List[date]:
+    """Sessions that close at 13:00."""
+    return [
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),  # day after Thanksgiving
+        date(year, 12, 24)
+    ]
+
+
+class MarketCalendar:
+    """Precomputed trading sessions held in sorted arrays.
+
+    Lookups such as "N sessions back" are binary searches over the session
+    array, and bar filtering is a vectorized mask over a whole index.
+    """
+    def __init__(self, start_year: int = 2000, end_year: int = 2035):
+        closed = set(SPECIAL_CLOSURES)
+        early = set()
+        for year in range(start_year, end_year + 1):
+            closed.update(nyse_holidays(year))
+            early.update(nyse_early_closes(year))
+
+        days = pd.bdate_range(date(start_year, 1, 1), date(end_year, 12, 31)).values.astype('datetime64[D]')
+        closed_days = np.array(sorted(closed), dtype='datetime64[D]')
+        self.sessions = days[~np.isin(days, closed_days)]
+
+        early_days = np.array(sorted(early), dtype='datetime64[D]')
+        self.open_minutes = np.full(len(self.sessions), REGULAR_OPEN, dtype=np.int16)
+        self.close_minutes = np.where(np.isin(self.sessions, early_days), EARLY_CLOSE, REGULAR_CLOSE).astype(np.int16)
+        self.logger = logging.getLogger(__name__)
+
+    def _session_index(self, day) -> int:
+        """Position of the last session on or before the given day."""
+        return int(np.searchsorted(self.sessions, np.datetime64(pd.Timestamp(day).date(), 'D'), side='right')) - 1
+
+    def is_session(self, day) -> bool:
+        i = self._session_index(day)
+        return i >= 0 and self.sessions[i] == np.datetime64(pd.Timestamp(day).date(), 'D')
+
+    def sessions_back(self, day, n: int) -> date:
+        """The session n sessions before the last session on or before `day`."""
+        i = self._session_index(day) - n
+        if i < 0:
+            raise ValueError(f"Date out of calendar range: {day}")
+        return pd.Timestamp(self.sessions[i]).date()
+
+    def session_open(self, day) -> datetime:
+        i = self._session_index(day)
+        return datetime.combine(pd.Timestamp(self.sessions[i]).date(), datetime.min.time()) + timedelta(minutes=int(self.open_minutes[i]))
+
+    def session_close(self, day) -> datetime:
+        i = self._session_index(day)
+        return datetime.combine(pd.Timestamp(self.sessions[i]).date(), datetime.min.time()) + timedelta(minutes=int(self.close_minutes[i]))
+
+    def session_window(self, now: datetime, timeframe: str, period: int) -> Tuple[datetime, datetime, int]:
+        """Start/end of the last `period` sessions of data as of `now`.
+
+        Returns (start_date, end_date, period), with the period capped to what
+        the provider serves for 1m/5m bars.
+        """
+        if timeframe in INTRADAY_PERIOD_LIMITS:
+            period = min(period, INTRADAY_PERIOD_LIMITS[timeframe])
+            if self.is_session(now) and self.session_open(now) <= now <= self.session_close(now):
+                # During market hours, use current time
+                end_date = now.replace(second=0, microsecond=0)
+            elif self.is_session(now) and now > self.session_close(now):
+                end_date = self.session_close(now)
+            else:
+                # Before the open or on a non-trading day, use the previous session's close
+                previous = now - timedelta(days=1) if self.is_session(now) else now
+                end_date = self.session_close(previous)
+        else:
+            end_date = self.session_close(now)
+
+        start_date = self.session_open(self.sessions_back(end_date, period))
+        return start_date, end_date, period
+
+    def session_mask(self, index: pd.DatetimeIndex, intraday: bool = True) -> np.ndarray:
+        """Boolean mask of bars on trading sessions, and inside session hours if intraday."""
+        local = to_market_time(pd.DatetimeIndex(index))
+        days = local.normalize()
+        if days.tz is not None:
+            days = days.tz_localize(None)
+        day_values = days.values.astype('datetime64[D]')
+
+        pos = np.clip(np.searchsorted(self.sessions, day_values), 0, len(self.sessions) - 1)
+        on_session = self.sessions[pos] == day_values
+        if not intraday:
+            return on_session
+
+        minutes = np.asarray(local.hour * 60 + local.minute)
+        return on_session & (minutes >= self.open_minutes[pos]) & (minutes < self.close_minutes[pos])
+
+    def bar_starts(self, start, end, timeframe: str) -> pd.DatetimeIndex:
+        """Every session-aligned bar start expected between two dates, in exchange local time.
+
+        Daily bars are the session dates; intraday bars run from each session's
+        open up to its (possibly early) close.
+        """
+        lo = np.searchsorted(self.sessions, np.datetime64(pd.Timestamp(start).date(), 'D'))
+        hi = np.searchsorted(self.sessions, np.datetime64(pd.Timestamp(end).date(), 'D'), side='right')
+        days = self.sessions[lo:hi].astype('datetime64[m]')
+        if timeframe == '1d':
+            return pd.DatetimeIndex(days.astype('datetime64[ns]'))
+
+        offsets = np.arange(0, REGULAR_CLOSE - REGULAR_OPEN, TIMEFRAME_MINUTES[timeframe])
+        opens = self.open_minutes[lo:hi].astype(np.int64)[:, None]
+        closes = self.close_minutes[lo:hi].astype(np.int64)[:, None]
+        starts = days[:, None] + (opens + offsets).astype('timedelta64[m]')
+        return pd.DatetimeIndex(starts[opens + offsets < closes].astype('datetime64[ns]'))
+
+
+# Built once at import and shared by every caller
+default_calendar = MarketCalendar()
@@ -0,0 +1,207 @@
+import os
+import socket
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Sub-buckets per power of two; 2**7 keeps every recorded value within 1% of its bucket
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+REPORTED_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+# Prefix of the keys under which live processes publish their metrics to the shared cache for /metrics
+LIVE_METRICS_KEY = 'metrics:live'
+
+
+def _bucket_index(value: int) -> int:
+    """HDR-style log-linear bucket: linear below 2**(bits+1), then SUB_BUCKET_COUNT per doubling."""
+    magnitude = max(value.bit_length() - SUB_BUCKET_BITS - 1, 0)
+    return (magnitude << SUB_BUCKET_BITS) + (value >> magnitude)
+
+
+def _bucket_upper(index: int) -> int:
+    """Largest value that falls into a bucket."""
+    magnitude = max((index >> SUB_BUCKET_BITS) - 1, 0)
+    base = index - (magnitude << SUB_BUCKET_BITS)
+    return ((base + 1) << magnitude) - 1
+
+
+class LatencyHistogram:
+    """Fixed-precision latency histogram over nanosecond integer values.
+
+    Recording is a bit_length and a list increment under a lock, so it is
+    cheap enough for the per-bar decision path. Quantiles are accurate to
+    within 1%; the maximum is tracked exactly.
+    """
+    def __init__(self, name: str, help: str = '', labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help
+        self.labels = dict(labels or {})
+        self.counts: List[int] = []
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        with self._lock:
+            state = dict(self.__dict__, counts=list(self.counts))
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def record_ns(self, value: int):
+        value = max(int(value), 0)
+        index = _bucket_index(value)
+        with self._lock:
+            if index >= len(self.counts):
+                self.counts.extend([0] * (index + 1 - len(self.counts)))
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ns += value
+            if value > self.max_ns:
+                self.max_ns = value
+
+    def record(self, seconds: float):
+        self.record_ns(seconds * 1e9)
+
+    def quantile_ns(self, q: float) -> int:
+        with self._lock:
+            if self.count == 0:
+                return 0
+            target = max(int(q * self.count + 0.5), 1)
+            seen = 0
+            for index, n in enumerate(self.counts):
+                seen += n
+                if seen >= target:
+                    return min(_bucket_upper(index), self.max_ns)
+            return self.max_ns
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, p50/p99 and max in milliseconds."""
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ns / self.count / 1e6 if self.count else 0.0,
+            'p50_ms': self.quantile_ns(0.5) / 1e6,
+            'p99_ms': self.quantile_ns(0.99) / 1e6,
+            'max_ms': self.max_ns / 1e6
+        }
+
+    def with_labels(self, **labels: str) -> 'LatencyHistogram':
+        """A snapshot of this histogram with extra labels."""
+        snapshot = LatencyHistogram.__new__(LatencyHistogram)
+        snapshot.__setstate__(self.__getstate__())
+        snapshot.labels = dict(self.labels, **labels)
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self.counts = []
+            self.count = 0
+            self.total_ns = 0
+            self.max_ns = 0
+
+
+class MetricsRegistry:
+    """Named latency histograms, rendered in Prometheus text format."""
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, Tuple], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help: str = '', labels: Optional[Dict[str, str]] = None) -> LatencyHistogram:
+        """Get or create the histogram for a name and label set."""
+        key = (name, tuple(sorted((labels or {}).items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram(name, help, labels))
+        return histogram
+
+    def publish(self, cache, key: str = LIVE_METRICS_KEY, ttl: float = 300, instance: Optional[str] = None):
+        """Copy the histograms into a SharedCache so another process can serve them.
+
+        Each publisher gets its own entry and an `instance` label (host and pid
+        by default), so several bots, or a bot and the server, never render the
+        same series twice.
+        """
+        instance = instance or f"{socket.gethostname()}:{os.getpid()}"
+        snapshot = [histogram.with_labels(instance=instance) for histogram in list(self.histograms.values())]
+        cache.set(f"{key}:{instance}", {'pid': os.getpid(), 'histograms': snapshot}, ttl=ttl)
+
+    def render(self, extra: Iterable[LatencyHistogram] = ()) -> str:
+        """Prometheus text exposition: one summary per histogram plus a _max gauge."""
+        families: Dict[str, List[LatencyHistogram]] = {}
+        for histogram in list(self.histograms.values()) + list(extra):
+            families.setdefault(histogram.name, []).append(histogram)
+
+        lines = []
+        for name in sorted(families):
+            histograms = families[name]
+            lines.append(f"# HELP {name} {histograms[0].help or name}")
+            lines.append(f"# TYPE {name} summary")
+            for histogram in histograms:
+                for q in REPORTED_QUANTILES:
+                    labels = _format_labels(dict(histogram.labels, quantile=str(q)))
+                    lines.append(f"{name}{labels} {histogram.quantile_ns(q) / 1e9:.9f}")
+                labels = _format_labels(histogram.labels)
+                lines.append(f"{name}_sum{labels} {histogram.total_ns / 1e9:.9f}")
+                lines.append(f"{name}_count{labels} {histogram.count}")
+            lines.append(f"# TYPE {name}_max gauge")
+            for histogram in histograms:
+                lines.append(f"{name}_max{_format_labels(histogram.labels)} {histogram.max_ns / 1e9:.9f}")
+        return '\n'.join(lines) + '\n'
+
+
+def published_histograms(cache, key: str = LIVE_METRICS_KEY) -> List[LatencyHistogram]:
+    """Histograms published by other processes; this process's own are already in its registry."""
+    histograms = []
+    for entry in cache.get_prefix(f"{key}:").values():
+        if entry['pid'] != os.getpid():
+            histograms.extend(entry['histograms'])
+    return histograms
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return '{' + pairs + '}'
+
+
+class StageTimer:
+    """Monotonic timestamps for the stages of one decision cycle.
+
+    Call `begin()` when a cycle starts and `mark(stage)` as it reaches each
+    stage; `end()` records every configured (from, to) span whose stages
+    were both reached into '<prefix>_<from>_to_<to>_seconds'.
+    """
+    def __init__(self, registry: MetricsRegistry, spans: List[Tuple[str, str]], prefix: str = 'decision', labels: Optional[Dict[str, str]] = None):
+        self.spans = [
+            (start, end, registry.histogram(
+                f"{prefix}_{start}_to_{end}_seconds",
+                f"Latency from {start} to {end} in the live decision loop",
+                labels
+            ))
+            for start, end in spans
+        ]
+        self.marks: Dict[str, int] = {}
+
+    def begin(self):
+        self.marks = {'start': time.perf_counter_ns()}
+
+    def mark(self, stage: str):
+        self.marks[stage] = time.perf_counter_ns()
+
+    def end(self):
+        for start, end, histogram in self.spans:
+            if start in self.marks and end in self.marks:
+                histogram.record_ns(self.marks[end] - self.marks[start])
+        self.marks = {}
+
+
+# Shared by everything in the process; served by app.py at /metrics
+default_registry = MetricsRegistry()
@@ -0,0 +1,228 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+import logging
+
+
+class _MockBrokerHandler(BaseHTTPRequestHandler):
+    # Keep-alive so the pooled client session reuses connections, as with the real broker
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; Nagle would hold the body for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+    def _send(self, status: int, body=None):
+        data = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/v2/orders':
+            return self._send(404, {'message': 'not found'})
+
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        broker = self.server.broker
+        if broker.latency > 0:
+            time.sleep(broker.latency)
+
+        order = broker.create_order(request)
+        if order is None:
+            return self._send(422, {'message': 'client_order_id must be unique'})
+        self._send(200, order)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        broker = self.server.broker
+        if url.path == '/v2/orders:by_client_order_id':
+            client_order_id = parse_qs(url.query).get('client_order_id', [''])[0]
+            order = broker.orders_by_client_id.get(client_order_id)
+            order = broker.get_order(order['id']) if order is not None else None
+        elif url.path.startswith('/v2/orders/'):
+            order = broker.get_order(url.path.rsplit('/', 1)[-1])
+        elif url.path.startswith('/v2/positions/'):
+            position = broker.get_position(url.path.rsplit('/', 1)[-1])
+            if position is None:
+                return self._send(404, {'message': 'position does not exist'})
+            return self._send(200, position)
+        else:
+            order = None
+        if order is None:
+            return self._send(404, {'message': 'order not found'})
+        self._send(200, order)
+
+    def do_DELETE(self):
+        url = urlparse(self.path)
+        broker = self.server.broker
+        if url.path == '/v2/orders':
+            broker.cancel_all()
+            return self._send(207, [])
+        if url.path.startswith('/v2/orders/'):
+            if not broker.cancel(url.path.rsplit('/', 1)[-1]):
+                return self._send(422, {'message': 'order is not cancelable'})
+            return self._send(204)
+        self._send(404, {'message': 'not found'})
+
+
+class MockBroker:
+    """Local Alpaca-compatible order endpoint for offline testing and latency measurement.
+
+    Market orders fill immediately at `fill_price`; limit orders rest as 'new'
+    until cancelled. A bracket's take-profit and stop legs are 'held' until
+    its entry has a fill and then work; `fill` fills a resting order or leg, fully or in part, so
+    exits that race a close can be exercised. Positions are tracked per
+    symbol from fills. Duplicate client order ids are rejected with 422 like
+    the real API.
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, fill_price: float = 100.0):
+        self.latency = latency
+        self.fill_price = fill_price
+        self.orders: Dict[str, Dict] = {}
+        self.orders_by_client_id: Dict[str, Dict] = {}
+        self.positions: Dict[str, int] = {}  # signed share count per symbol
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _MockBrokerHandler)
+        self.server.daemon_threads = True
+        self.server.broker = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def create_order(self, request: Dict) -> Optional[Dict]:
+        with self._lock:
+            client_order_id = request.get('client_order_id') or str(uuid.uuid4())
+            if client_order_id in self.orders_by_client_id:
+                return None
+
+            is_market = request.get('type', 'market') == 'market'
+            order = self._new_order(request, client_order_id)
+            self.orders_by_client_id[client_order_id] = order
+
+            if order['order_class'] == 'bracket':
+                # Legs are held until the entry has a fill
+                exit_side = 'sell' if order['side'] == 'buy' else 'buy'
+                take_profit = self._new_order({
+                    'symbol': order['symbol'], 'side': exit_side, 'qty': order['qty'], 'type': 'limit',
+                    'limit_price': request.get('take_profit', {}).get('limit_price')
+                })
+                stop_loss = self._new_order({
+                    'symbol': order['symbol'], 'side': exit_side, 'qty': order['qty'], 'type': 'stop',
+                    'stop_price': request.get('stop_loss', {}).get('stop_price')
+                })
+                take_profit['status'] = stop_loss['status'] = 'held'
+                take_profit['parent_id'] = stop_loss['parent_id'] = order['id']
+                order['legs'] = [take_profit['id'], stop_loss['id']]
+            if is_market:
+                self._apply_fill(order, int(float(order['qty'])), self.fill_price)
+            return self._render(order)
+
+    def get_order(self, order_id: str) -> Optional[Dict]:
+        with self._lock:
+            order = self.orders.get(order_id)
+            return self._render(order) if order is not None else None
+
+    def get_position(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            qty = self.positions.get(symbol, 0)
+            if qty == 0:
+                return None
+            return {'symbol': symbol, 'qty': str(abs(qty)), 'side': 'long' if qty > 0 else 'short'}
+
+    def fill(self, order_id: str, qty: Optional[int] = None, price: Optional[float] = None) -> Dict:
+        """Fill `qty` shares (default: the rest) of a resting order or bracket leg.
+
+        Completing one bracket leg cancels its sibling, as the broker's OCO does.
+        """
+        with self._lock:
+            order = self.orders[order_id]
+            if order['status'] not in ('new', 'partially_filled'):
+                raise ValueError(f"Order {order_id} is {order['status']}")
+            open_qty = int(float(order['qty'])) - int(float(order['filled_qty']))
+            qty = open_qty if qty is None else min(qty, open_qty)
+            self._apply_fill(order, qty, self.fill_price if price is None else price)
+            parent = self.orders.get(order.get('parent_id'))
+            if order['status'] == 'filled' and parent is not None:
+                for leg_id in parent['legs']:
+                    sibling = self.orders[leg_id]
+                    if leg_id != order_id and sibling['status'] in ('new', 'partially_filled'):
+                        sibling['status'] = 'canceled'
+            return self._render(order)
+
+    def _new_order(self, request: Dict, client_order_id: Optional[str] = None) -> Dict:
+        order = {
+            'id': str(uuid.uuid4()),
+            'client_order_id': client_order_id or str(uuid.uuid4()),
+            'symbol': request.get('symbol'),
+            'side': request.get('side'),
+            'qty': request.get('qty'),
+            'type': request.get('type', 'market'),
+            'order_class': request.get('order_class', 'simple'),
+            'limit_price': request.get('limit_price'),
+            'stop_price': request.get('stop_price'),
+            'status': 'new',
+            'filled_qty': '0',
+            'filled_avg_price': None
+        }
+        self.orders[order['id']] = order
+        return order
+
+    def _apply_fill(self, order: Dict, qty: int, price: float):
+        filled = int(float(order['filled_qty']))
+        if qty <= 0:
+            return
+        prior = float(order['filled_avg_price'] or 0.0)
+        order['filled_avg_price'] = str((prior * filled + price * qty) / (filled + qty))
+        order['filled_qty'] = str(filled + qty)
+        order['status'] = 'filled' if filled + qty >= int(float(order['qty'])) else 'partially_filled'
+        signed = qty if order['side'] == 'buy' else -qty
+        self.positions[order['symbol']] = self.positions.get(order['symbol'], 0) + signed
+        for leg_id in order.get('legs', []):
+            if self.orders[leg_id]['status'] == 'held':
+                self.orders[leg_id]['status'] = 'new'
+
+    def _render(self, order: Dict) -> Dict:
+        """A copy of an order as the API returns it, with bracket legs nested."""
+        rendered = dict(order)
+        if 'legs' in order:
+            rendered['legs'] = [dict(self.orders[leg_id]) for leg_id in order['legs']]
+        return rendered
+
+    def cancel(self, order_id: str) -> bool:
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None or order['status'] not in ('new', 'partially_filled', 'held'):
+                return False
+            order['status'] = 'canceled'
+            # An entry cancelled before any fill takes its held legs with it
+            for leg_id in order.get('legs', []):
+                if self.orders[leg_id]['status'] == 'held':
+                    self.orders[leg_id]['status'] = 'canceled'
+            return True
+
+    def cancel_all(self):
+        with self._lock:
+            for order in self.orders.values():
+                if order['status'] in ('new', 'partially_filled', 'held'):
+                    order['status'] = 'canceled'
@@ -0,0 +1,311 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import logging
+from .backtest import BacktestEngine
+from .strategy import get_strategy
+
+
+@dataclass
+class Param:
+    """One dimension of a search space, sampled on the unit interval and mapped to a value."""
+    name: str
+    low: float = 0.0
+    high: float = 1.0
+    kind: str = 'float'  # 'float', 'int', 'log' or 'choice'
+    choices: Sequence[Any] = ()
+
+    def value(self, u: float):
+        if self.kind == 'choice':
+            return self.choices[min(int(u * len(self.choices)), len(self.choices) - 1)]
+        if self.kind == 'log':
+            return float(math.exp(math.log(self.low) + u * (math.log(self.high) - math.log(self.low))))
+        if self.kind == 'int':
+            return int(round(self.low + u * (self.high - self.low)))
+        return float(self.low + u * (self.high - self.low))
+
+    def cast(self, value):
+        """Restore the parameter's Python type after a round trip through a DataFrame."""
+        if self.kind == 'int':
+            return int(value)
+        if self.kind in ('float', 'log'):
+            return float(value)
+        return value
+
+
+# The seven ScalpStrategy parameters; oversold/overbought ranges don't overlap
+SCALP_SEARCH_SPACE = [
+    Param('bb_period', 5, 40, 'int'),
+    Param('bb_std', 1.0, 3.0),
+    Param('rsi_period', 3, 21, 'int'),
+    Param('rsi_oversold', 20.0, 45.0),
+    Param('rsi_overbought', 55.0, 80.0),
+    Param('min_volatility', 1e-5, 1e-3, 'log'),
+    Param('max_holding_time', 5, 120, 'int')
+]
+
+
+# Bars for backtest workers, sent once per process instead of with every task
+_worker_data: Optional[pd.DataFrame] = None
+
+def _init_worker(data: pd.DataFrame):
+    global _worker_data
+    _worker_data = data
+
+def _evaluate(strategy: str, params: Dict, engine_params: Dict, start: int, end: int) -> Dict:
+    """Backtest one candidate on rows [start, end) of the worker's data."""
+    engine = BacktestEngine(get_strategy(strategy, **params), **engine_params)
+    return engine.run(_worker_data.iloc[start:end])
+
+
+@dataclass
+class OptimizationResult:
+    best: pd.DataFrame  # top configurations with in-sample and out-of-sample metrics
+    trials: pd.DataFrame  # every evaluation: params, rung, data fraction and score
+    evaluations: int
+    elapsed: float
+    stopped_by_budget: bool = False
+    split_time: Optional[pd.Timestamp] = None
+    best_params: Dict = field(default_factory=dict)
+
+
+class TPEOptimizer:
+    """Tree-structured Parzen Estimator search with successive halving.
+
+    Each round proposes a batch of candidates. Every candidate is backtested
+    on a short prefix of the training data, and only the best 1/eta move on
+    to a longer prefix, up to the full training set. The candidates in each
+    rung run in parallel on a process pool.
+
+    Proposals come from density ratios. Completed trials are split into a
+    good and a bad group, ranked by the deepest rung reached and then by
+    score. Random candidates drawn around the good trials are kept where a
+    Gaussian KDE of the good group is high relative to one of the bad group.
+    This all runs as array operations in the unit cube.
+
+    The search stops after `max_rounds` rounds or when `time_budget` seconds
+    have passed. The top configurations are then re-run on the held-out
+    test period, and those out-of-sample metrics are reported alongside the
+    in-sample score.
+    """
+    def __init__(
+        self,
+        strategy: str = 'bb_squeeze',
+        space: Optional[List[Param]] = None,
+        objective: str = 'total_pnl',
+        engine_params: Optional[Dict] = None,
+        train_fraction: float = 0.7,
+        batch_size: int = 27,
+        eta: int = 3,
+        rungs: int = 3,
+        min_trades: int = 5,
+        n_startup: int = 27,
+        n_candidates: int = 64,
+        gamma: float = 0.25,
+        max_workers: int = 0,
+        seed: int = 0
+    ):
+        self.strategy = strategy
+        self.space = space or SCALP_SEARCH_SPACE
+        self.objective = objective
+        self.engine_params = engine_params or {}
+        self.train_fraction = train_fraction
+        self.batch_size = batch_size
+        self.eta = eta
+        self.rungs = rungs
+        self.min_trades = min_trades
+        self.n_startup = n_startup
+        self.n_candidates = n_candidates
+        self.gamma = gamma
+        self.max_workers = max_workers
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.logger = logging.getLogger(__name__)
+
+    def optimize(
+        self,
+        data: pd.DataFrame,
+        time_budget: Optional[float] = None,
+        max_rounds: int = 10,
+        top_k: int = 5
+    ) -> OptimizationResult:
+        """Search for the best parameters on the training period and report out-of-sample results."""
+        started = time.perf_counter()
+        deadline = started + time_budget if time_budget is not None else math.inf
+        split = int(len(data) * self.train_fraction)
+
+        pool = ProcessPoolExecutor(self.max_workers, initializer=_init_worker, initargs=(data,)) if self.max_workers > 0 else None
+        if pool is None:
+            _init_worker(data)
+
+        # One row per evaluated candidate: unit-cube position, deepest rung reached and its score
+        points: List[np.ndarray] = []
+        depth: List[int] = []
+        scores: List[float] = []
+        records: List[Dict] = []
+        seen = set()
+        stopped = False
+
+        try:
+            for round_no in range(max_rounds):
+                if time.perf_counter() >= deadline:
+                    stopped = True
+                    break
+
+                batch = self._propose(np.array(points), np.array(depth), np.array(scores), seen)
+                alive = list(range(len(batch)))
+                batch_scores = np.full(len(batch), -np.inf)
+                batch_depth = np.zeros(len(batch), dtype=int)
+
+                for rung in range(self.rungs):
+                    fraction = self.eta ** (rung - self.rungs + 1)
+                    end = max(int(split * fraction), 1)
+                    params = [self._params(batch[i]) for i in alive]
+                    results = self._run_all(pool, params, 0, end)
+
+                    for i, p, metrics in zip(alive, params, results):
+                        score = self._score(metrics)
+                        batch_scores[i] = score
+                        batch_depth[i] = rung
+                        records.append(dict(p, round=round_no, rung=rung, fraction=fraction, score=score,
+                                            total_trades=metrics.get('total_trades', 0)))
+
+                    # Promote the best 1/eta to the next, longer prefix
+                    keep = max(len(alive) // self.eta, 1)
+                    alive = sorted(alive, key=lambda i: batch_scores[i], reverse=True)[:keep]
+                    if time.perf_counter() >= deadline:
+                        stopped = True
+                        break
+
+                points.extend(batch)
+                depth.extend(batch_depth)
+                scores.extend(batch_scores)
+                self.logger.info(
+                    f"Round {round_no}: best score {max(scores):.4f} after {len(records)} evaluations "
+                    f"({time.perf_counter() - started:.1f}s)"
+                )
+                if stopped:
+                    break
+
+            trials = pd.DataFrame(records)
+            best = self._out_of_sample(pool, trials, split, len(data), top_k)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        if stopped:
+            self.logger.info(f"Stopped by the {time_budget}s time budget after {len(records)} evaluations")
+        return OptimizationResult(
+            best=best,
+            trials=trials,
+            evaluations=len(records),
+            elapsed=elapsed,
+            stopped_by_budget=stopped,
+            split_time=data.index[split] if split < len(data) else None,
+            best_params={p.name: p.cast(best.iloc[0][p.name]) for p in self.space} if len(best) else {}
+        )
+
+    def _params(self, u: np.ndarray) -> Dict:
+        return {p.name: p.value(float(x)) for p, x in zip(self.space, u)}
+
+    def _score(self, metrics: Dict) -> float:
+        if not metrics or metrics.get('total_trades', 0) < self.min_trades:
+            return -np.inf
+        value = metrics.get(self.objective)
+        return float(value) if value is not None and np.isfinite(value) else -np.inf
+
+    def _run_all(self, pool: Optional[ProcessPoolExecutor], params: List[Dict], start: int, end: int) -> List[Dict]:
+        if pool is None:
+            return [self._safe_evaluate(p, start, end) for p in params]
+        futures = [pool.submit(_evaluate, self.strategy, p, self.engine_params, start, end) for p in params]
+        results = []
+        for p, future in zip(params, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                self.logger.warning(f"Evaluation failed for {p}: {str(e)}")
+                results.append({})
+        return results
+
+    def _safe_evaluate(self, params: Dict, start: int, end: int) -> Dict:
+        try:
+            return _evaluate(self.strategy, params, self.engine_params, start, end)
+        except Exception as e:
+            self.logger.warning(f"Evaluation failed for {params}: {str(e)}")
+            return {}
+
+    def _propose(self, points: np.ndarray, depth: np.ndarray, scores: np.ndarray, seen: set) -> List[np.ndarray]:
+        """A batch of new unit-cube points: uniform at first, then by TPE density ratio."""
+        d = len(self.space)
+        batch: List[np.ndarray] = []
+        for _ in range(self.batch_size * 10):
+            if len(batch) == self.batch_size:
+                break
+            if len(points) < self.n_startup or not np.isfinite(scores).any():
+                u = self.rng.random(d)
+            else:
+                u = self._tpe_candidate(points, depth, scores)
+            # Integer and choice parameters collapse nearby points; skip configurations already tried
+            key = tuple(sorted(self._params(u).items()))
+            if key not in seen:
+                seen.add(key)
+                batch.append(u)
+        return batch
+
+    def _tpe_candidate(self, points: np.ndarray, depth: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        # Deeper rungs rank first: their scores come from more data
+        order = np.lexsort((-scores, -depth))
+        n_good = max(int(math.ceil(self.gamma * len(points))), 1)
+        good = points[order[:n_good]]
+        bad = points[order[n_good:]] if len(points) > n_good else points
+
+        # Candidates drawn around good points, with some uniform exploration
+        bandwidth = self._bandwidth(good)
+        centers = good[self.rng.integers(len(good), size=self.n_candidates)]
+        candidates = np.clip(centers + self.rng.normal(size=centers.shape) * bandwidth, 0.0, 1.0)
+        explore = self.rng.random(self.n_candidates) < 1.0 / (len(points) + 1)
+        candidates[explore] = self.rng.random((explore.sum(), points.shape[1]))
+
+        ratio = self._log_density(candidates, good) - self._log_density(candidates, bad)
+        return candidates[int(np.argmax(ratio))]
+
+    def _bandwidth(self, group: np.ndarray) -> np.ndarray:
+        # Scott's rule per dimension, floored so a tight cluster keeps exploring
+        n, d = group.shape
+        std = group.std(axis=0) if n > 1 else np.full(d, 0.5)
+        return np.maximum(std * n ** (-1.0 / (d + 4)), 0.05)
+
+    def _log_density(self, x: np.ndarray, group: np.ndarray) -> np.ndarray:
+        """Log of a product-Gaussian KDE over `group`, evaluated at every row of x."""
+        bandwidth = self._bandwidth(group)
+        z = (x[:, None, :] - group[None, :, :]) / bandwidth
+        log_kernel = -0.5 * (z ** 2).sum(axis=2) - np.log(bandwidth).sum()
+        peak = log_kernel.max(axis=1, keepdims=True)
+        return (peak + np.log(np.exp(log_kernel - peak).mean(axis=1, keepdims=True)))[:, 0]
+
+    def _out_of_sample(self, pool: Optional[ProcessPoolExecutor], trials: pd.DataFrame, split: int, n: int, top_k: int) -> pd.DataFrame:
+        """Top full-training-rung configurations, re-run on the held-out period."""
+        if trials.empty:
+            return pd.DataFrame()
+        full = trials[(trials['rung'] == self.rungs - 1) & np.isfinite(trials['score'])]
+        if full.empty:
+            full = trials[np.isfinite(trials['score'])]
+        top = full.sort_values('score', ascending=False).head(top_k)
+
+        params = [
+            {p.name: p.cast(row[p.name]) for p in self.space}
+            for _, row in top.iterrows()
+        ]
+        oos = self._run_all(pool, params, split, n) if split < n else [{} for _ in params]
+
+        rows = []
+        for p, (_, trial), metrics in zip(params, top.iterrows(), oos):
+            row = dict(p, in_sample_score=trial['score'], in_sample_trades=trial['total_trades'])
+            row.update({f"oos_{k}": v for k, v in metrics.items()})
+            rows.append(row)
+        return pd.DataFrame(rows)
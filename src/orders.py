@@ -0,0 +1,418 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from .metrics import MetricsRegistry, default_registry
+
+# Order lifecycle states and the transitions allowed between them
+NEW = 'new'
+PARTIALLY_FILLED = 'partially_filled'
+FILLED = 'filled'
+CANCELLED = 'cancelled'
+REJECTED = 'rejected'
+
+TERMINAL_STATES = {FILLED, CANCELLED, REJECTED}
+
+ALLOWED_TRANSITIONS = {
+    NEW: {NEW, PARTIALLY_FILLED, FILLED, CANCELLED, REJECTED},
+    PARTIALLY_FILLED: {PARTIALLY_FILLED, FILLED, CANCELLED},
+    FILLED: {FILLED},
+    CANCELLED: {CANCELLED},
+    REJECTED: {REJECTED}
+}
+
+# Broker (Alpaca) status strings mapped onto the local state machine
+BROKER_STATUS_MAP = {
+    'new': NEW,
+    'accepted': NEW,
+    'pending_new': NEW,
+    'accepted_for_bidding': NEW,
+    'held': NEW,
+    'partially_filled': PARTIALLY_FILLED,
+    'filled': FILLED,
+    'canceled': CANCELLED,
+    'cancelled': CANCELLED,
+    'expired': CANCELLED,
+    'done_for_day': CANCELLED,
+    'rejected': REJECTED
+}
+
+
+@dataclass
+class Order:
+    client_order_id: str
+    symbol: str
+    side: str  # 'buy' or 'sell'
+    qty: int
+    order_type: str = 'market'
+    limit_price: Optional[float] = None
+    take_profit: Optional[float] = None  # bracket take-profit limit price
+    stop_loss: Optional[float] = None  # bracket stop price
+    time_in_force: str = 'day'
+    status: str = NEW
+    broker_order_id: Optional[str] = None
+    filled_qty: int = 0
+    filled_avg_price: Optional[float] = None
+    submitted_ns: Optional[int] = None  # monotonic clock, for latency measurement
+    acked_ns: Optional[int] = None
+    legs: List[str] = field(default_factory=list)  # broker ids of a bracket's take-profit and stop legs
+    history: List[str] = field(default_factory=list)
+
+    @property
+    def is_bracket(self) -> bool:
+        return self.take_profit is not None and self.stop_loss is not None
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    @property
+    def ack_latency_ms(self) -> Optional[float]:
+        if self.submitted_ns is None or self.acked_ns is None:
+            return None
+        return (self.acked_ns - self.submitted_ns) / 1e6
+
+    def transition(self, status: str):
+        """Move to a new state, rejecting transitions the lifecycle doesn't allow."""
+        if status not in ALLOWED_TRANSITIONS[self.status]:
+            raise ValueError(f"Invalid order transition {self.status} -> {status} for {self.client_order_id}")
+        if status != self.status:
+            self.history.append(status)
+        self.status = status
+
+    def to_payload(self) -> Dict:
+        """Alpaca-compatible order request body."""
+        payload = {
+            'symbol': self.symbol,
+            'qty': str(self.qty),
+            'side': self.side,
+            'type': self.order_type,
+            'time_in_force': self.time_in_force,
+            'client_order_id': self.client_order_id
+        }
+        if self.limit_price is not None:
+            payload['limit_price'] = str(self.limit_price)
+        if self.is_bracket:
+            payload['order_class'] = 'bracket'
+            payload['take_profit'] = {'limit_price': str(round(self.take_profit, 2))}
+            payload['stop_loss'] = {'stop_price': str(round(self.stop_loss, 2))}
+        return payload
+
+
+def make_client_order_id(symbol: str, direction: str, timestamp, tag: str = 'open') -> str:
+    """Deterministic client order id, so a retried submission can't create a second order."""
+    key = f"{symbol}|{direction}|{timestamp}|{tag}"
+    return f"scalp-{hashlib.sha1(key.encode()).hexdigest()[:24]}"
+
+
+class BrokerClient:
+    """Thin REST client over one pooled, keep-alive HTTP session."""
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        pool_size: int = 10,
+        timeout: float = 5.0
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if api_key and api_secret:
+            self.session.headers.update({
+                'APCA-API-KEY-ID': api_key,
+                'APCA-API-SECRET-KEY': api_secret
+            })
+
+    def submit_order(self, payload: Dict) -> Dict:
+        response = self.session.post(f"{self.base_url}/v2/orders", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def get_order_by_client_id(self, client_order_id: str) -> Optional[Dict]:
+        response = self.session.get(
+            f"{self.base_url}/v2/orders:by_client_order_id",
+            params={'client_order_id': client_order_id},
+            timeout=self.timeout
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def get_order(self, broker_order_id: str) -> Optional[Dict]:
+        """An order by broker id, with bracket legs nested."""
+        response = self.session.get(
+            f"{self.base_url}/v2/orders/{broker_order_id}",
+            params={'nested': 'true'},
+            timeout=self.timeout
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def get_position(self, symbol: str) -> Optional[Dict]:
+        """The account's open position in a symbol, or None when flat."""
+        response = self.session.get(f"{self.base_url}/v2/positions/{symbol}", timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def cancel_order(self, broker_order_id: str):
+        response = self.session.delete(f"{self.base_url}/v2/orders/{broker_order_id}", timeout=self.timeout)
+        response.raise_for_status()
+
+    def cancel_all_orders(self):
+        response = self.session.delete(f"{self.base_url}/v2/orders", timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+
+class OrderManager:
+    """Tracks orders through their lifecycle and submits them without blocking the caller."""
+    def __init__(
+        self,
+        broker: BrokerClient,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        metrics: Optional[MetricsRegistry] = None,
+        cancel_timeout: float = 2.0
+    ):
+        self.broker = broker
+        self.max_retries = max_retries
+        self.cancel_timeout = cancel_timeout  # seconds to wait for the broker to confirm a cancel
+        self.ack_histogram = (metrics or default_registry).histogram(
+            'order_ack_seconds', 'Order submission to broker acknowledgement latency'
+        )
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='order-submit')
+        self.orders: Dict[str, Order] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, order: Order) -> Future:
+        """Queue an order for submission; resubmitting the same client id returns the original future."""
+        with self._lock:
+            if order.client_order_id in self._futures:
+                return self._futures[order.client_order_id]
+            self.orders[order.client_order_id] = order
+            future = self.executor.submit(self._submit, order)
+            self._futures[order.client_order_id] = future
+        return future
+
+    def submit_bracket(
+        self,
+        symbol: str,
+        direction: str,
+        qty: int,
+        stop_loss: float,
+        take_profit: float,
+        timestamp
+    ) -> Future:
+        """Entry order with attached stop-loss and take-profit legs."""
+        order = Order(
+            client_order_id=make_client_order_id(symbol, direction, timestamp),
+            symbol=symbol,
+            side='buy' if direction == 'LONG' else 'sell',
+            qty=qty,
+            take_profit=take_profit,
+            stop_loss=stop_loss
+        )
+        return self.submit(order)
+
+    def submit_close(self, symbol: str, direction: str, qty: int, timestamp, bracket_id: Optional[str] = None) -> Future:
+        """Cancel the bracket's working entry and legs and flatten whatever of its position is still open.
+
+        `bracket_id` is the client order id of the entry bracket. An entry that
+        hasn't fully filled is cancelled first, so it can't fill after the
+        close, and its filled quantity is re-read once the cancel is
+        confirmed. Only that bracket's orders are cancelled, so other positions' orders on the account
+        are left alone. The market order covers the bracket's filled quantity
+        less anything its legs already filled, capped at the account position,
+        so a leg that fills first can't turn the close into a reversal.
+        """
+        order = Order(
+            client_order_id=make_client_order_id(symbol, direction, timestamp, tag='close'),
+            symbol=symbol,
+            side='sell' if direction == 'LONG' else 'buy',
+            qty=qty
+        )
+        with self._lock:
+            if order.client_order_id in self._futures:
+                return self._futures[order.client_order_id]
+            self.orders[order.client_order_id] = order
+            future = self.executor.submit(self._close_position, order, direction, bracket_id)
+            self._futures[order.client_order_id] = future
+        return future
+
+    def submit_net(self, symbol: str, delta: int, timestamp, tag: str = 'net') -> Optional[Future]:
+        """Market order moving the symbol's net position by `delta` shares (negative sells)."""
+        if delta == 0:
+            return None
+        order = Order(
+            client_order_id=make_client_order_id(symbol, 'LONG' if delta > 0 else 'SHORT', timestamp, tag=tag),
+            symbol=symbol,
+            side='buy' if delta > 0 else 'sell',
+            qty=abs(delta)
+        )
+        return self.submit(order)
+
+    def cancel(self, client_order_id: str):
+        """Cancel a working order."""
+        order = self.orders[client_order_id]
+        if order.is_terminal or order.broker_order_id is None:
+            return
+        self.broker.cancel_order(order.broker_order_id)
+        self._transition(order, CANCELLED)
+
+    def refresh(self, client_order_id: str) -> Order:
+        """Poll the broker for the order's latest state."""
+        order = self.orders[client_order_id]
+        payload = self.broker.get_order_by_client_id(client_order_id)
+        if payload is not None:
+            self.apply_update(order, payload)
+        return order
+
+    def apply_update(self, order: Order, payload: Dict):
+        """Fold a broker order payload (ack, fill or cancel) into the local order."""
+        order.broker_order_id = payload.get('id', order.broker_order_id)
+        if payload.get('filled_qty') is not None:
+            order.filled_qty = int(float(payload['filled_qty']))
+        if payload.get('filled_avg_price') is not None:
+            order.filled_avg_price = float(payload['filled_avg_price'])
+        if payload.get('legs'):
+            order.legs = [leg['id'] for leg in payload['legs']]
+        status = BROKER_STATUS_MAP.get(payload.get('status'), order.status)
+        self._transition(order, status)
+
+    def ack_latencies_ms(self) -> List[float]:
+        """Submit-to-acknowledgement latency of every acknowledged order."""
+        return [o.ack_latency_ms for o in self.orders.values() if o.ack_latency_ms is not None]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        self.broker.close()
+
+    def _transition(self, order: Order, status: str):
+        try:
+            order.transition(status)
+        except ValueError as e:
+            # Late or out-of-order broker updates must not regress a terminal order
+            self.logger.warning(str(e))
+
+    def _close_position(self, order: Order, direction: str, bracket_id: Optional[str]) -> Order:
+        remaining = order.qty
+        if bracket_id is not None:
+            remaining = min(remaining, self._cancel_legs(bracket_id))
+        else:
+            self.logger.warning(f"Closing {order.symbol} without a bracket id; any working bracket legs are left open")
+
+        position = self.broker.get_position(order.symbol)
+        held = 0
+        if position is not None:
+            side = 'LONG' if position.get('side', 'long') == 'long' else 'SHORT'
+            held = int(abs(float(position['qty']))) if side == direction else 0
+        remaining = min(remaining, held)
+
+        if remaining <= 0:
+            self.logger.info(f"{order.symbol} {direction.lower()} position already closed; no close order sent")
+            self._transition(order, CANCELLED)
+            return order
+        if remaining < order.qty:
+            self.logger.info(f"Closing the remaining {remaining} of {order.qty} {order.symbol}")
+        order.qty = remaining
+        return self._submit(order)
+
+    def _cancel_legs(self, bracket_id: str) -> int:
+        """Cancel a bracket's working entry and legs; returns the quantity they left open."""
+        # The entry must be acknowledged before its legs are known
+        future = self._futures.get(bracket_id)
+        if future is not None:
+            future.result()
+        bracket = self.orders.get(bracket_id)
+        payload = self.broker.get_order_by_client_id(bracket_id)
+        if payload is None:
+            self.logger.warning(f"Bracket {bracket_id} not found at the broker")
+            return 0
+        payload = self.broker.get_order(payload['id']) or payload
+        if BROKER_STATUS_MAP.get(payload.get('status')) not in TERMINAL_STATES:
+            # A working entry could fill after the close and leave a position with no exits
+            payload = self._cancel_confirmed(payload)
+        if bracket is not None:
+            self.apply_update(bracket, payload)
+
+        leg_filled = 0
+        for leg in payload.get('legs') or []:
+            if BROKER_STATUS_MAP.get(leg.get('status')) not in TERMINAL_STATES:
+                leg = self._cancel_confirmed(leg)
+            leg_filled += int(float(leg.get('filled_qty') or 0))
+        return max(int(float(payload.get('filled_qty') or 0)) - leg_filled, 0)
+
+    def _cancel_confirmed(self, payload: Dict) -> Dict:
+        """Cancel a working broker order and wait until it reports a terminal state; returns its last payload."""
+        try:
+            self.broker.cancel_order(payload['id'])
+        except requests.HTTPError as e:
+            # 422: the order filled or was cancelled before the request arrived
+            if e.response is None or e.response.status_code != 422:
+                raise
+        # The broker acknowledges a cancel asynchronously (pending_cancel) and can still fill meanwhile
+        deadline = time.monotonic() + self.cancel_timeout
+        while True:
+            payload = self.broker.get_order(payload['id']) or payload
+            if BROKER_STATUS_MAP.get(payload.get('status')) in TERMINAL_STATES:
+                return payload
+            if time.monotonic() >= deadline:
+                self.logger.warning(
+                    f"Cancel of order {payload['id']} not confirmed after {self.cancel_timeout}s; "
+                    f"using its filled quantity so far"
+                )
+                return payload
+            time.sleep(0.05)
+
+    def _submit(self, order: Order) -> Order:
+        order.submitted_ns = time.perf_counter_ns()
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                payload = self.broker.submit_order(order.to_payload())
+                break
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code == 422:
+                    # Already accepted under this client id by an earlier attempt
+                    payload = self.broker.get_order_by_client_id(order.client_order_id)
+                    if payload is not None:
+                        break
+                self.logger.error(f"Order {order.client_order_id} rejected: {str(e)}")
+                self._transition(order, REJECTED)
+                return order
+            except requests.RequestException as e:
+                self.logger.warning(f"Order {order.client_order_id} attempt {attempt} failed: {str(e)}")
+                # The request may have reached the broker before the connection dropped
+                try:
+                    payload = self.broker.get_order_by_client_id(order.client_order_id)
+                except requests.RequestException:
+                    payload = None
+                if payload is not None:
+                    break
+                time.sleep(0.1 * 2 ** (attempt - 1))
+        else:
+            self._transition(order, REJECTED)
+            return order
+
+        order.acked_ns = time.perf_counter_ns()
+        self.ack_histogram.record_ns(order.acked_ns - order.submitted_ns)
+        self.apply_update(order, payload)
+        self.logger.info(f"Order {order.client_order_id} {order.status} ({order.ack_latency_ms:.2f} ms)")
+        return order
@@ -0,0 +1,70 @@
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+import logging
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack on a timer and aggregates folded stacks.
+
+    The output is the "folded" format read by flamegraph.pl, speedscope and
+    inferno: one line per distinct stack, frames separated by ';', followed
+    by the number of samples. The profiled thread does no extra work; all
+    sampling happens on a background thread.
+    """
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, thread_id: Optional[int] = None):
+        """Start sampling the given thread (default: the calling thread)."""
+        if self.running:
+            return
+        self.thread_id = thread_id or self.thread_id or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Profiling thread {self.thread_id} every {self.interval * 1000:.1f} ms")
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.logger.info(f"Profiler stopped after {sum(self.samples.values())} samples")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def write(self, path: str) -> str:
+        """Write the folded stacks, e.g. for `flamegraph.pl path > flame.svg`."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(self.folded())
+        self.logger.info(f"Wrote {len(self.samples)} folded stacks to {path}")
+        return path
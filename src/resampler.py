@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy as np
+from datetime import time
+from typing import Dict, List, Optional
+import logging
+
+# Bar length of each supported timeframe, in minutes of the regular session
+TIMEFRAME_MINUTES = {
+    '1m': 1,
+    '5m': 5,
+    '15m': 15,
+    '1h': 60,
+    '1d': 390
+}
+
+SESSION_OPEN = time(9, 30)
+SESSION_CLOSE = time(16, 0)
+MARKET_TIMEZONE = 'America/New_York'
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def to_market_time(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """Express a timestamp index in exchange local time."""
+    if index.tz is not None:
+        return index.tz_convert(MARKET_TIMEZONE)
+    return index
+
+
+def session_bucket_starts(index: pd.DatetimeIndex, timeframe: str) -> pd.DatetimeIndex:
+    """Map each timestamp to the start of the session-aligned bar containing it."""
+    if timeframe not in TIMEFRAME_MINUTES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+    local = to_market_time(index)
+    session_date = local.normalize()
+    if timeframe == '1d':
+        return session_date
+
+    # Buckets are counted from the 09:30 open, so 1h bars run 09:30-10:30 etc.
+    session_open = session_date + pd.Timedelta(hours=SESSION_OPEN.hour, minutes=SESSION_OPEN.minute)
+    minutes_since_open = (local - session_open) // pd.Timedelta(minutes=1)
+    bucket = minutes_since_open // TIMEFRAME_MINUTES[timeframe]
+    return session_open + pd.to_timedelta(bucket * TIMEFRAME_MINUTES[timeframe], unit='min')
+
+
+def session_mask(index: pd.DatetimeIndex) -> np.ndarray:
+    """Boolean mask of timestamps falling inside the regular 09:30-16:00 session."""
+    local = to_market_time(index)
+    minutes = local.hour * 60 + local.minute
+    open_minutes = SESSION_OPEN.hour * 60 + SESSION_OPEN.minute
+    close_minutes = SESSION_CLOSE.hour * 60 + SESSION_CLOSE.minute
+    return np.asarray((minutes >= open_minutes) & (minutes < close_minutes))
+
+
+def resample_bars(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Aggregate 1-minute OHLCV bars into session-aligned bars of the given timeframe."""
+    if timeframe == '1m' or df.empty:
+        return df[OHLCV_COLUMNS].copy()
+
+    df = df.loc[session_mask(df.index), OHLCV_COLUMNS]
+    if df.empty:
+        return df.copy()
+
+    buckets = session_bucket_starts(df.index, timeframe)
+    resampled = df.groupby(buckets, sort=True).agg({
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'volume': 'sum'
+    })
+    resampled.index.name = df.index.name
+    return resampled
+
+
+class BarResampler:
+    def __init__(self, timeframes: Optional[List[str]] = None, max_bars: int = 2000):
+        self.timeframes = timeframes or ['5m', '15m', '1h', '1d']
+        # Most recent bars kept per timeframe, so a long-running feed doesn't grow without bound
+        self.max_bars = max_bars
+        for timeframe in self.timeframes:
+            if timeframe not in TIMEFRAME_MINUTES:
+                raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+        self.bars: Dict[str, pd.DataFrame] = {
+            timeframe: pd.DataFrame(columns=OHLCV_COLUMNS) for timeframe in ['1m'] + self.timeframes
+        }
+        self.last_timestamp: Optional[pd.Timestamp] = None
+        self.logger = logging.getLogger(__name__)
+
+    def update(self, new_bars: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Fold newly arrived 1-minute bars into every higher timeframe."""
+        new_bars = new_bars.sort_index()
+        if self.last_timestamp is not None:
+            new_bars = new_bars[new_bars.index > self.last_timestamp]
+        if new_bars.empty:
+            return self.bars
+
+        new_bars = new_bars[OHLCV_COLUMNS]
+        self.bars['1m'] = self._append(self.bars['1m'], new_bars).iloc[-self.max_bars:]
+
+        for timeframe in self.timeframes:
+            aggregated = resample_bars(new_bars, timeframe)
+            self.bars[timeframe] = self._merge(self.bars[timeframe], aggregated).iloc[-self.max_bars:]
+
+        self.last_timestamp = new_bars.index[-1]
+        self.logger.debug(f"Resampled {len(new_bars)} new 1m bars into {self.timeframes}")
+        return self.bars
+
+    def get_bars(self, timeframe: str) -> pd.DataFrame:
+        """Return the current bars for a timeframe, including the in-progress bar."""
+        if timeframe not in self.bars:
+            raise ValueError(f"Timeframe not tracked: {timeframe}")
+        return self.bars[timeframe]
+
+    def _append(self, existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        if existing.empty:
+            return new.copy()
+        return pd.concat([existing, new])
+
+    def _merge(self, existing: pd.DataFrame, aggregated: pd.DataFrame) -> pd.DataFrame:
+        """Combine the still-open last bar with the first freshly aggregated bar."""
+        if aggregated.empty:
+            return existing
+        if existing.empty:
+            return aggregated
+
+        first_key = aggregated.index[0]
+        if existing.index[-1] != first_key:
+            return self._append(existing, aggregated)
+
+        partial = existing.iloc[-1]
+        head = aggregated.iloc[0]
+        aggregated = aggregated.copy()
+        aggregated.iloc[0] = [
+            partial['open'],
+            max(partial['high'], head['high']),
+            min(partial['low'], head['low']),
+            head['close'],
+            partial['volume'] + head['volume']
+        ]
+        return self._append(existing.iloc[:-1], aggregated)
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Sequence
+import logging
+from .strategy import Strategy
+
+logger = logging.getLogger(__name__)
+
+
+def signal_events(strategy: Strategy, df: pd.DataFrame) -> pd.DataFrame:
+    """Every signal the strategy emits over the data, ignoring position state.
+
+    Unlike BacktestEngine, signals are not suppressed while a trade would be
+    open, so each one can be studied independently.
+    """
+    signals = strategy.precompute(df)
+    bar_index = np.flatnonzero(signals['direction'])
+    return pd.DataFrame({
+        'bar_index': bar_index,
+        'direction': signals['direction'][bar_index].astype(np.int8),
+        'price': signals['price'][bar_index],
+        'stop_loss': signals['stop_loss'][bar_index],
+        'take_profit': signals['take_profit'][bar_index]
+    }, index=df.index[bar_index])
+
+
+def _first_true(mask: np.ndarray) -> np.ndarray:
+    """Offset of the first True along axis 1, or the window length if none."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+
+def event_study(
+    df: pd.DataFrame,
+    strategy: Strategy,
+    horizons: Sequence[int] = (5, 15, 30, 60),
+    chunk_size: int = 100_000
+) -> Dict[str, pd.DataFrame]:
+    """Forward returns, MAE/MFE and hit rates for every signal at several horizons.
+
+    Horizons are in bars after the signal bar. Returns and excursions are signed
+    so positive is favourable for the signal's direction. Windows over the
+    high/low/close arrays are strided views, processed in chunks of events to
+    bound memory.
+
+    Returns {'events': one row per signal, 'summary': one row per horizon and direction}.
+    """
+    events = signal_events(strategy, df)
+    horizons = sorted(horizons)
+    max_horizon = horizons[-1]
+
+    close = df['close'].to_numpy(dtype=float)
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    n = len(df)
+
+    # Pad so every event has a full window; padded bars are NaN and never count as hits
+    pad = np.full(max_horizon, np.nan)
+    close_windows = sliding_window_view(np.concatenate((close, pad))[1:], max_horizon)
+    high_windows = sliding_window_view(np.concatenate((high, pad))[1:], max_horizon)
+    low_windows = sliding_window_view(np.concatenate((low, pad))[1:], max_horizon)
+
+    bar_index = events['bar_index'].to_numpy()
+    direction = events['direction'].to_numpy().astype(float)
+    price = events['price'].to_numpy()
+    stop_loss = events['stop_loss'].to_numpy()
+    take_profit = events['take_profit'].to_numpy()
+
+    columns: Dict[str, np.ndarray] = {}
+    for h in horizons:
+        for name in ('return', 'mfe', 'mae', 'target_first'):
+            columns[f"{name}_{h}"] = np.full(len(events), np.nan)
+
+    for start in range(0, len(events), chunk_size):
+        rows = slice(start, start + chunk_size)
+        idx = bar_index[rows]
+        sign = direction[rows][:, None]
+        entry = price[rows][:, None]
+
+        # Excursions as signed returns from the entry price, running extreme per offset
+        favourable = np.where(sign > 0, high_windows[idx], low_windows[idx]) / entry - 1
+        adverse = np.where(sign > 0, low_windows[idx], high_windows[idx]) / entry - 1
+        mfe = np.fmax.accumulate(favourable * sign, axis=1)
+        mae = np.fmin.accumulate(adverse * sign, axis=1)
+        forward = (close_windows[idx] / entry - 1) * sign
+
+        # Bars until the target and the stop are first touched
+        target_hit = np.where(sign > 0, high_windows[idx] >= take_profit[rows][:, None], low_windows[idx] <= take_profit[rows][:, None])
+        stop_hit = np.where(sign > 0, low_windows[idx] <= stop_loss[rows][:, None], high_windows[idx] >= stop_loss[rows][:, None])
+        first_target = _first_true(target_hit)
+        first_stop = _first_true(stop_hit)
+
+        for h in horizons:
+            complete = idx + h < n
+            columns[f"return_{h}"][rows] = np.where(complete, forward[:, h - 1], np.nan)
+            columns[f"mfe_{h}"][rows] = np.where(complete, mfe[:, h - 1], np.nan)
+            columns[f"mae_{h}"][rows] = np.where(complete, mae[:, h - 1], np.nan)
+            # A bar touching both levels counts as a stop, as a conservative fill assumption
+            target_first = (first_target < h) & (first_target < first_stop)
+            columns[f"target_first_{h}"][rows] = np.where(complete, target_first, np.nan)
+
+    events = events.assign(**columns)
+    logger.info(f"Event study over {len(events)} signals at horizons {horizons}")
+    return {'events': events, 'summary': summarize_events(events, horizons)}
+
+
+def summarize_events(events: pd.DataFrame, horizons: Sequence[int]) -> pd.DataFrame:
+    """Mean/median forward return, hit rates and average excursions per horizon and direction."""
+    records = []
+    side = events['direction'].map({1: 'LONG', -1: 'SHORT'})
+    for h in horizons:
+        for label, group in [('ALL', events)] + list(events.groupby(side)):
+            returns = group[f"return_{h}"].dropna()
+            records.append({
+                'horizon': h,
+                'direction': label,
+                'events': len(returns),
+                'mean_return': returns.mean(),
+                'median_return': returns.median(),
+                'hit_rate': (returns > 0).mean() if len(returns) else np.nan,
+                'target_first_rate': group[f"target_first_{h}"].mean(),
+                'mean_mfe': group[f"mfe_{h}"].mean(),
+                'mean_mae': group[f"mae_{h}"].mean()
+            })
+    return pd.DataFrame(records)
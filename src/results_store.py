@@ -0,0 +1,239 @@
+import pandas as pd
+import numpy as np
+import sqlite3
+import hashlib
+import inspect
+import json
+import os
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    strategy TEXT,
+    config TEXT NOT NULL,
+    data_fingerprint TEXT NOT NULL,
+    n_bars INTEGER,
+    data_start TEXT,
+    data_end TEXT,
+    metrics TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trades (
+    run_id TEXT NOT NULL,
+    trade_no INTEGER NOT NULL,
+    trade TEXT NOT NULL,
+    PRIMARY KEY (run_id, trade_no)
+);
+CREATE TABLE IF NOT EXISTS equity (
+    run_id TEXT NOT NULL,
+    point_no INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    equity REAL NOT NULL,
+    PRIMARY KEY (run_id, point_no)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_strategy ON runs (strategy);
+"""
+
+
+def _json_default(value):
+    """Serialise numpy scalars and timestamps stored in results."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    if hasattr(value, '__dict__'):
+        return init_params(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_safe(value):
+    """Replace inf/NaN (e.g. profit factor with no losers) with None so stored and returned JSON stay valid."""
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    return value
+
+
+def _dumps(value) -> str:
+    return json.dumps(json_safe(value), sort_keys=True, default=_json_default)
+
+
+def init_params(obj) -> Dict:
+    """Constructor arguments of an object, read back from its attributes."""
+    params = {}
+    for name in inspect.signature(type(obj).__init__).parameters:
+        if name != 'self' and hasattr(obj, name):
+            params[name] = getattr(obj, name)
+    return params
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of the OHLCV bars and their timestamps."""
+    columns = [c for c in ['open', 'high', 'low', 'close', 'volume'] if c in df.columns]
+    hashed = pd.util.hash_pandas_object(df[columns], index=True).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+def downsample_equity(equity_curve: pd.DataFrame, max_points: int = 500) -> pd.DataFrame:
+    """Evenly thin an equity curve, always keeping the first and last points."""
+    if len(equity_curve) <= max_points:
+        return equity_curve
+    positions = np.unique(np.linspace(0, len(equity_curve) - 1, max_points).round().astype(int))
+    return equity_curve.iloc[positions]
+
+
+class ResultsStore:
+    """SQLite-backed history of backtest runs keyed by config and data fingerprint."""
+    def __init__(self, path: str = 'backtests/results.db', max_equity_points: int = 500):
+        self.path = path
+        self.max_equity_points = max_equity_points
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per operation keeps the store safe to share across server threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def run_id(self, config: Dict, fingerprint: str) -> str:
+        """Deterministic id for a config applied to a specific dataset."""
+        return hashlib.sha1(f"{_dumps(config)}|{fingerprint}".encode()).hexdigest()
+
+    def get(self, run_id: str, include_trades: bool = True) -> Optional[Dict]:
+        """Load a stored run, or None if it has not been recorded."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            result = self._row_to_run(row)
+
+            if include_trades:
+                trades = conn.execute(
+                    "SELECT trade FROM trades WHERE run_id = ? ORDER BY trade_no", (run_id,)
+                ).fetchall()
+                equity = conn.execute(
+                    "SELECT timestamp, equity FROM equity WHERE run_id = ? ORDER BY point_no", (run_id,)
+                ).fetchall()
+                result['trades'] = [json.loads(t['trade']) for t in trades]
+                result['equity_curve'] = [{'timestamp': e['timestamp'], 'equity': e['equity']} for e in equity]
+
+        return result
+
+    def save(
+        self,
+        config: Dict,
+        fingerprint: str,
+        metrics: Dict,
+        trades: List[Dict],
+        equity_curve: Optional[pd.DataFrame] = None,
+        data: Optional[pd.DataFrame] = None
+    ) -> str:
+        """Record a run; re-saving the same config and data replaces the earlier copy."""
+        run_id = self.run_id(config, fingerprint)
+
+        equity_rows = []
+        if equity_curve is not None and len(equity_curve) > 0:
+            thinned = downsample_equity(equity_curve, self.max_equity_points)
+            equity_rows = [
+                (run_id, n, pd.Timestamp(ts).isoformat(), float(eq))
+                for n, (ts, eq) in enumerate(zip(thinned['timestamp'], thinned['equity']))
+            ]
+
+        n_bars = data_start = data_end = None
+        if data is not None and len(data) > 0:
+            n_bars = len(data)
+            data_start = pd.Timestamp(data.index[0]).isoformat()
+            data_end = pd.Timestamp(data.index[-1]).isoformat()
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM trades WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM equity WHERE run_id = ?", (run_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    datetime.now().isoformat(),
+                    config.get('strategy'),
+                    _dumps(config),
+                    fingerprint,
+                    n_bars,
+                    data_start,
+                    data_end,
+                    _dumps(metrics)
+                )
+            )
+            conn.executemany(
+                "INSERT INTO trades VALUES (?, ?, ?)",
+                [(run_id, n, _dumps(trade)) for n, trade in enumerate(trades)]
+            )
+            conn.executemany("INSERT INTO equity VALUES (?, ?, ?, ?)", equity_rows)
+
+        self.logger.info(f"Stored backtest run {run_id} ({len(trades)} trades)")
+        return run_id
+
+    def list_runs(
+        self,
+        strategy: Optional[str] = None,
+        order_by: Optional[str] = None,
+        descending: bool = True,
+        limit: int = 50
+    ) -> List[Dict]:
+        """List stored runs, optionally filtered by strategy and ranked by a metric."""
+        query = "SELECT * FROM runs"
+        params: list = []
+        if strategy:
+            query += " WHERE strategy = ?"
+            params.append(strategy)
+
+        if order_by:
+            # Metrics are stored as JSON, so rank on the extracted value
+            query += f" ORDER BY json_extract(metrics, ?) {'DESC' if descending else 'ASC'}"
+            params.append(f"$.{order_by}")
+        else:
+            query += " ORDER BY created_at DESC"
+        query += " LIMIT ?"
+        params.append(limit)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [self._row_to_run(row) for row in rows]
+
+    def compare(self, run_ids: List[str], metrics: Optional[List[str]] = None) -> pd.DataFrame:
+        """Side-by-side table of config parameters and metrics for the given runs."""
+        records = []
+        for run_id in run_ids:
+            run = self.get(run_id, include_trades=False)
+            if run is None:
+                continue
+            record = {'run_id': run_id, 'strategy': run['strategy']}
+            record.update({f"param.{k}": v for k, v in run['config'].get('strategy_params', {}).items()})
+            selected = run['metrics'] if metrics is None else {m: run['metrics'].get(m) for m in metrics}
+            record.update(selected)
+            records.append(record)
+        return pd.DataFrame(records)
+
+    def _row_to_run(self, row: sqlite3.Row) -> Dict:
+        return {
+            'run_id': row['run_id'],
+            'created_at': row['created_at'],
+            'strategy': row['strategy'],
+            'config': json.loads(row['config']),
+            'data_fingerprint': row['data_fingerprint'],
+            'n_bars': row['n_bars'],
+            'data_start': row['data_start'],
+            'data_end': row['data_end'],
+            'metrics': json.loads(row['metrics'])
+        }
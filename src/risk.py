@@ -0,0 +1,123 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional
+import logging
+from .resampler import session_bucket_starts
+
+
+class RiskManager:
+    """Position sizing and trading limits shared by the backtest engine and the live bot.
+
+    Sizing inputs are computed for whole arrays of bars up front
+    (`position_fractions`, `session_days`); the per-bar checks are O(1) so
+    they can run inside the backtest loop or once per live iteration.
+    """
+    def __init__(
+        self,
+        max_position_pct: float = 0.1,  # cap on a single position as a fraction of equity
+        target_volatility: Optional[float] = None,  # per-bar volatility budget; None sizes at max_position_pct
+        volatility_window: int = 20,
+        max_exposure: float = 1.0,  # gross notional as a multiple of equity
+        daily_loss_limit: Optional[float] = None,  # fraction of start-of-day equity
+        max_trades_per_day: Optional[int] = None,
+        short_margin: float = 0.5  # fraction of short notional held as margin
+    ):
+        self.max_position_pct = max_position_pct
+        self.target_volatility = target_volatility
+        self.volatility_window = volatility_window
+        self.max_exposure = max_exposure
+        self.daily_loss_limit = daily_loss_limit
+        self.max_trades_per_day = max_trades_per_day
+        self.short_margin = short_margin
+        self.logger = logging.getLogger(__name__)
+        self.reset()
+
+    def reset(self):
+        """Clear the daily counters."""
+        self.current_day = None
+        self.day_start_equity = 0.0
+        self.day_pnl = 0.0
+        self.day_trades = 0
+
+    def get_state(self) -> Dict:
+        """Daily counters, for checkpointing a live session."""
+        return {
+            'current_day': self.current_day,
+            'day_start_equity': self.day_start_equity,
+            'day_pnl': self.day_pnl,
+            'day_trades': self.day_trades
+        }
+
+    def set_state(self, state: Dict):
+        self.__dict__.update(state)
+
+    def estimate_volatility(self, close: np.ndarray) -> np.ndarray:
+        """Rolling standard deviation of bar returns, for strategies that don't supply one."""
+        returns = pd.Series(close, dtype=float).pct_change()
+        return returns.rolling(window=self.volatility_window).std().to_numpy()
+
+    def position_fractions(self, volatility: np.ndarray) -> np.ndarray:
+        """Fraction of equity to allocate on each bar."""
+        volatility = np.asarray(volatility, dtype=float)
+        if self.target_volatility is None:
+            return np.full(volatility.shape, self.max_position_pct)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fractions = self.target_volatility / volatility
+        fractions = np.nan_to_num(fractions, nan=0.0, posinf=0.0)
+        return np.clip(fractions, 0.0, self.max_position_pct)
+
+    def session_days(self, index: pd.Index) -> np.ndarray:
+        """Integer session id for each bar, used to reset daily limits."""
+        day_codes, _ = pd.factorize(session_bucket_starts(pd.DatetimeIndex(index), '1d'))
+        return day_codes
+
+    def start_bar(self, day, equity: float):
+        """Roll the daily counters over when a new session starts."""
+        if day != self.current_day:
+            self.current_day = day
+            self.day_start_equity = equity
+            self.day_pnl = 0.0
+            self.day_trades = 0
+
+    def can_open(self) -> bool:
+        """Check the daily trade count and loss limits."""
+        if self.max_trades_per_day is not None and self.day_trades >= self.max_trades_per_day:
+            return False
+        if self.daily_loss_limit is not None and self.day_pnl <= -self.daily_loss_limit * self.day_start_equity:
+            return False
+        return True
+
+    def margin_required(self, direction: str, notional: float) -> float:
+        """Capital committed to hold a position: full cost for longs, margin for shorts."""
+        if direction == 'SHORT':
+            return notional * self.short_margin
+        return notional
+
+    def size_position(
+        self,
+        equity: float,
+        cash: float,
+        price: float,
+        fraction: float,
+        direction: str,
+        gross_exposure: float = 0.0
+    ) -> int:
+        """Number of shares to trade, respecting exposure and buying-power limits."""
+        if price <= 0 or fraction <= 0:
+            return 0
+
+        notional = equity * fraction
+        notional = min(notional, max(equity * self.max_exposure - gross_exposure, 0.0))
+
+        margin_rate = self.short_margin if direction == 'SHORT' else 1.0
+        if margin_rate > 0:
+            notional = min(notional, cash / margin_rate)
+
+        return int(notional / price)
+
+    def record_open(self):
+        self.day_trades += 1
+
+    def record_close(self, pnl: float):
+        self.day_pnl += pnl
@@ -0,0 +1,142 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import logging
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at);
+"""
+
+
+class SharedCache:
+    """Key/value cache shared by every process on the host through one local file.
+
+    Backed by SQLite in WAL mode with the database memory-mapped, so readers in
+    different worker processes don't block each other or the writer. Values
+    are pickled, which lets DataFrames of bars be cached directly.
+
+    Every `purge_interval` writes, expired rows are deleted and, past
+    `max_bytes` of values, the rows closest to expiry are evicted, so the
+    file stops growing on a long-running server (SQLite reuses freed pages).
+    """
+    def __init__(
+        self,
+        path: str = 'data/cache.db',
+        default_ttl: float = 60.0,
+        mmap_size: int = 256 * 1024 * 1024,
+        max_bytes: Optional[int] = 512 * 1024 * 1024,
+        purge_interval: int = 100
+    ):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.mmap_size = mmap_size
+        self.max_bytes = max_bytes
+        self.purge_interval = purge_interval
+        self._writes = 0
+        self._local = threading.local()
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def __getstate__(self):
+        # Connections can't cross process boundaries; workers open their own
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, reopened after a fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires_at)
+        )
+        self._writes += 1
+        if self.purge_interval and self._writes % self.purge_interval == 0:
+            self.purge()
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value, computing and storing it on a miss.
+
+        Empty results (None or empty frames) are not cached, so a failed fetch
+        is retried on the next request.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = factory()
+        if value is not None and not getattr(value, 'empty', False):
+            self.set(key, value, ttl)
+        return value
+
+    def get_prefix(self, prefix: str) -> Dict[str, Any]:
+        """Every unexpired value whose key starts with prefix."""
+        rows = self._connection().execute(
+            "SELECT key, value FROM cache WHERE substr(key, 1, ?) = ? AND expires_at > ?",
+            (len(prefix), prefix, time.time())
+        ).fetchall()
+        return {key: pickle.loads(value) for key, value in rows}
+
+    def delete(self, key: str):
+        self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        cursor = self._connection().execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def evict_to_size(self, max_bytes: int) -> int:
+        """Delete the rows closest to expiry until the values fit in max_bytes."""
+        cursor = self._connection().execute(
+            """
+            DELETE FROM cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(length(value)) OVER (ORDER BY expires_at DESC, key) AS kept FROM cache
+                ) WHERE kept > ?
+            )
+            """,
+            (max_bytes,)
+        )
+        return cursor.rowcount
+
+    def purge(self) -> int:
+        """Drop expired rows, then enforce the size cap; returns the number of rows removed."""
+        removed = self.purge_expired()
+        if self.max_bytes is not None:
+            removed += self.evict_to_size(self.max_bytes)
+        if removed:
+            self.logger.debug(f"Purged {removed} cache rows")
+        return removed
@@ -1,9 +1,11 @@
 import numpy as np
 import pandas as pd
 import talib
-from typing import Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Type
 from dataclasses import dataclass
+from collections import deque
 import logging
+from .indicators import ReturnVolatility, SqueezeTracker, WilderRSI, squeeze_features
 
 @dataclass
 class TradeSignal:
@@ -15,7 +17,101 @@ class TradeSignal:
     stop_loss: float
     take_profit: float
 
-class ScalpStrategy:
+class Strategy:
+    """Common interface for strategies evaluated in batch (backtest) or streaming (live) mode.
+
+    `precompute` returns per-bar signal arrays aligned with the input bars:
+    'direction' (1 long, -1 short, 0 flat), 'price', 'stop_loss',
+    'take_profit' and 'confidence', plus optionally 'volatility' for
+    risk-based sizing. `on_bar` feeds one bar at a time and
+    returns a TradeSignal for the latest bar, if any.
+
+    Strategies built on the streaming indicators can also declare them in
+    `indicator_specs` and implement `evaluate`; the live runner then updates
+    one indicator instance per symbol and parameter set and shares its
+    values between every strategy that declares it.
+    """
+    name: str = 'base'
+    symbol: str = 'SPY'
+    # Exit at the stop/target level when the bar's range touches it, instead of on the close
+    intrabar_exits: bool = False
+    # Maximum holding time in minutes, or None for no limit
+    max_holding_time: Optional[int] = None
+    # Number of trailing bars kept for the streaming path
+    warmup_bars: int = 100
+
+    def precompute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Compute signal arrays for every bar at once."""
+        raise NotImplementedError
+
+    def on_bar(self, bar: pd.Series) -> Optional[TradeSignal]:
+        """Append a new bar and evaluate the signal on it."""
+        buffer = self._get_buffer()
+        buffer.append(bar)
+        window = pd.DataFrame(list(buffer))
+        signals = self.precompute(window)
+        return self._signal_at(signals, window, -1)
+
+    def indicator_specs(self) -> Dict[str, Tuple[type, tuple]]:
+        """Streaming indicators used by `evaluate`, as name -> (class, constructor args)."""
+        return {}
+
+    def evaluate(self, bar: pd.Series, values: Dict[str, Any]) -> Optional[TradeSignal]:
+        """Evaluate a bar given the latest value of each declared indicator."""
+        raise NotImplementedError
+
+    def reset(self):
+        """Clear any streaming state."""
+        self._buffer = deque(maxlen=self.warmup_bars)
+
+    def get_state(self) -> Dict:
+        """Streaming state for checkpoints; restored with set_state."""
+        return {'buffer': list(self._get_buffer())}
+
+    def set_state(self, state: Dict):
+        self.reset()
+        self._buffer.extend(state['buffer'])
+
+    def _get_buffer(self) -> Deque[pd.Series]:
+        if getattr(self, '_buffer', None) is None:
+            self.reset()
+        return self._buffer
+
+    def _signal_at(self, signals: Dict[str, np.ndarray], df: pd.DataFrame, i: int) -> Optional[TradeSignal]:
+        """Build a TradeSignal from row i of precomputed signal arrays."""
+        if len(df) == 0 or signals['direction'][i] == 0:
+            return None
+        return TradeSignal(
+            timestamp=df.index[i],
+            symbol=self.symbol,
+            direction='LONG' if signals['direction'][i] > 0 else 'SHORT',
+            confidence=float(signals['confidence'][i]),
+            price=float(signals['price'][i]),
+            stop_loss=float(signals['stop_loss'][i]),
+            take_profit=float(signals['take_profit'][i])
+        )
+
+
+STRATEGY_REGISTRY: Dict[str, Type[Strategy]] = {}
+
+def register_strategy(*names: str) -> Callable[[Type[Strategy]], Type[Strategy]]:
+    """Class decorator registering a strategy under one or more names."""
+    def decorator(cls: Type[Strategy]) -> Type[Strategy]:
+        for name in names:
+            STRATEGY_REGISTRY[name] = cls
+        cls.name = names[0]
+        return cls
+    return decorator
+
+def get_strategy(name: str, **params) -> Strategy:
+    """Instantiate a registered strategy by name."""
+    if name not in STRATEGY_REGISTRY:
+        raise ValueError(f"Unknown strategy: {name}")
+    return STRATEGY_REGISTRY[name](**params)
+
+
+@register_strategy('bb_squeeze')
+class ScalpStrategy(Strategy):
     def __init__(
         self,
         bb_period: int = 10,  # Shorter period for Bollinger Bands
@@ -33,6 +129,7 @@ class ScalpStrategy:
         self.rsi_overbought = rsi_overbought
         self.min_volatility = min_volatility
         self.max_holding_time = max_holding_time
+        self.warmup_bars = max(3 * bb_period, 10 * rsi_period)
         self.logger = logging.getLogger(__name__)
         
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -55,6 +152,9 @@ class ScalpStrategy:
         df['returns'] = df['close'].pct_change()
         df['volatility'] = df['returns'].rolling(window=self.bb_period).std()
         
+        # Squeeze width, average width, flag, duration and intensity
+        df = squeeze_features(df, self.bb_period)
+        
         self.logger.info(f"Calculated indicators for {len(df)} data points")
         self.logger.info(f"Latest RSI: {df['rsi'].iloc[-1]:.2f}")
         self.logger.info(f"Latest volatility: {df['volatility'].iloc[-1]:.6f}")
@@ -67,15 +167,121 @@ class ScalpStrategy:
         if len(df) < self.bb_period:
             return False
             
-        bb_width = (df['bb_upper'].iloc[-1] - df['bb_lower'].iloc[-1]) / df['bb_middle'].iloc[-1]
-        avg_bb_width = (df['bb_upper'].rolling(window=self.bb_period).mean() - 
-                       df['bb_lower'].rolling(window=self.bb_period).mean()) / df['bb_middle'].rolling(window=self.bb_period).mean()
+        # Squeeze columns are precomputed by calculate_indicators; only the last row is read
+        if 'squeeze' not in df.columns:
+            df = squeeze_features(df.copy(), self.bb_period)
         
         # Consider it a squeeze if the current width is less than 98% of the average width
-        is_squeeze = bb_width < avg_bb_width.iloc[-1] * 0.98
-        self.logger.info(f"BB squeeze check: {is_squeeze} (current: {bb_width:.4f}, avg: {avg_bb_width.iloc[-1]:.4f})")
+        is_squeeze = bool(df['squeeze'].iloc[-1])
+        self.logger.info(f"BB squeeze check: {is_squeeze} (current: {df['bb_width'].iloc[-1]:.4f}, avg: {df['bb_width_ma'].iloc[-1]:.4f})")
         return is_squeeze
     
+    def precompute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Compute signal arrays for every bar, mirroring generate_signals."""
+        n = len(df)
+        if n < self.bb_period:
+            return {
+                'direction': np.zeros(n, dtype=np.int8),
+                'price': df['close'].to_numpy(dtype=float),
+                'stop_loss': np.full(n, np.nan),
+                'take_profit': np.full(n, np.nan),
+                'confidence': np.zeros(n),
+                'volatility': np.full(n, np.nan)
+            }
+            
+        df = self.calculate_indicators(df)
+        
+        close = df['close'].to_numpy(dtype=float)
+        rsi = df['rsi'].to_numpy(dtype=float)
+        volatility_ok = ~(df['volatility'].to_numpy(dtype=float) < self.min_volatility)
+        squeeze = df['squeeze'].to_numpy(dtype=bool)
+        
+        tradable = volatility_ok & squeeze
+        long_mask = tradable & (rsi < self.rsi_oversold)
+        short_mask = tradable & ~long_mask & (rsi > self.rsi_overbought)
+        
+        direction = np.zeros(n, dtype=np.int8)
+        direction[long_mask] = 1
+        direction[short_mask] = -1
+        
+        # 0.5% stop loss and 1% take profit on either side
+        stop_loss = np.where(direction > 0, close * 0.995, close * 1.005)
+        take_profit = np.where(direction > 0, close * 1.01, close * 0.99)
+        
+        return {
+            'direction': direction,
+            'price': close,
+            'stop_loss': stop_loss,
+            'take_profit': take_profit,
+            'confidence': np.where(direction != 0, 0.8, 0.0),
+            'volatility': df['volatility'].to_numpy(dtype=float)
+        }
+    
+    def indicator_specs(self) -> Dict[str, Tuple[type, tuple]]:
+        return {
+            'squeeze': (SqueezeTracker, (self.bb_period, self.bb_std)),
+            'rsi': (WilderRSI, (self.rsi_period,)),
+            'volatility': (ReturnVolatility, (self.bb_period,))
+        }
+    
+    def reset(self):
+        """Start the O(1) streaming indicators from scratch."""
+        self._squeeze = SqueezeTracker(self.bb_period, self.bb_std)
+        self._rsi = WilderRSI(self.rsi_period)
+        self._volatility = ReturnVolatility(self.bb_period)
+        self.last_squeeze: Dict[str, float] = {}
+    
+    def get_state(self) -> Dict:
+        """The incremental indicators; a few dozen floats, independent of history length."""
+        if getattr(self, '_squeeze', None) is None:
+            self.reset()
+        return {'squeeze': self._squeeze, 'rsi': self._rsi, 'volatility': self._volatility}
+    
+    def set_state(self, state: Dict):
+        self.reset()
+        self._squeeze = state['squeeze']
+        self._rsi = state['rsi']
+        self._volatility = state['volatility']
+    
+    def on_bar(self, bar: pd.Series) -> Optional[TradeSignal]:
+        """Update squeeze, RSI and volatility incrementally and evaluate the latest bar."""
+        if getattr(self, '_squeeze', None) is None:
+            self.reset()
+            
+        close = float(bar['close'])
+        return self.evaluate(bar, {
+            'squeeze': self._squeeze.update(close),
+            'rsi': self._rsi.update(close),
+            'volatility': self._volatility.update(close)
+        })
+    
+    def evaluate(self, bar: pd.Series, values: Dict[str, Any]) -> Optional[TradeSignal]:
+        """Apply the entry rules to one bar's squeeze, RSI and volatility values."""
+        close = float(bar['close'])
+        self.last_squeeze = values['squeeze']
+        rsi = values['rsi']
+        volatility = values['volatility']
+        
+        if not self.last_squeeze['squeeze'] or volatility < self.min_volatility:
+            return None
+            
+        if rsi < self.rsi_oversold:
+            direction, stop_loss, take_profit = 'LONG', close * 0.995, close * 1.01
+        elif rsi > self.rsi_overbought:
+            direction, stop_loss, take_profit = 'SHORT', close * 1.005, close * 0.99
+        else:
+            return None
+            
+        return TradeSignal(
+            timestamp=bar.name,
+            symbol=self.symbol,
+            direction=direction,
+            confidence=0.8,
+            price=close,
+            stop_loss=stop_loss,
+            take_profit=take_profit
+        )
+    
     def generate_signals(self, df: pd.DataFrame) -> Optional[TradeSignal]:
         """Generate trading signals based on strategy rules."""
         if len(df) < self.bb_period:
@@ -133,4 +339,49 @@ class ScalpStrategy:
                 take_profit=take_profit
             )
             
-        return None 
\ No newline at end of file
+        return None
+
+
+@register_strategy('breakout', 'scalping')
+class BreakoutStrategy(Strategy):
+    """Previous-bar high/low breakout with volume confirmation, used by the dashboard."""
+    intrabar_exits = True
+    warmup_bars = 2
+    
+    def __init__(
+        self,
+        stop_loss_pct: float = 0.05,  # fraction of entry price
+        take_profit_pct: float = 0.10,  # higher than stop loss for better risk/reward
+        max_holding_time: Optional[int] = None
+    ):
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+        self.max_holding_time = max_holding_time
+        self.logger = logging.getLogger(__name__)
+    
+    def precompute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Compute breakout entries for every bar."""
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        volume = df['volume'].to_numpy(dtype=float)
+        entry_price = df['open'].to_numpy(dtype=float)
+        
+        n = len(df)
+        direction = np.zeros(n, dtype=np.int8)
+        if n > 1:
+            volume_up = volume[1:] > volume[:-1]
+            long_mask = (high[1:] > high[:-1]) & volume_up
+            short_mask = ~long_mask & (low[1:] < low[:-1]) & volume_up
+            direction[1:][long_mask] = 1
+            direction[1:][short_mask] = -1
+        
+        stop_loss = np.where(direction > 0, entry_price * (1 - self.stop_loss_pct), entry_price * (1 + self.stop_loss_pct))
+        take_profit = np.where(direction > 0, entry_price * (1 + self.take_profit_pct), entry_price * (1 - self.take_profit_pct))
+        
+        return {
+            'direction': direction,
+            'price': entry_price,
+            'stop_loss': stop_loss,
+            'take_profit': take_profit,
+            'confidence': np.where(direction != 0, 1.0, 0.0)
+        }
@@ -0,0 +1,359 @@
+import os
+import re
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+import logging
+from .ingestion import fake_day_levels, fake_symbol_seed
+from .market_calendar import default_calendar as market_calendar
+from .resampler import MARKET_TIMEZONE, OHLCV_COLUMNS
+
+# One fixed-size record per trade: epoch nanoseconds (UTC), price, size
+TICK_DTYPE = np.dtype([('ts', '<i8'), ('price', '<f8'), ('size', '<f8')])
+TICK_LOG_MAGIC = b'TICKLOG1'
+
+BAR_KINDS = {'s': 'time', 't': 'tick', 'v': 'volume'}
+
+# Shared by every emitted bar; building a Series on an existing Index is much cheaper
+_BAR_INDEX = pd.Index(OHLCV_COLUMNS)
+
+
+def parse_bar_spec(spec: str) -> Tuple[str, float]:
+    """'5s' -> ('time', 5), '100t' -> ('tick', 100), '5000v' -> ('volume', 5000)."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([stv])', spec)
+    if match is None:
+        raise ValueError(f"Invalid bar spec: {spec} (expected e.g. '5s', '100t' or '5000v')")
+    size = float(match.group(1))
+    if size <= 0:
+        raise ValueError(f"Invalid bar spec: {spec}")
+    return BAR_KINDS[match.group(2)], size
+
+
+def tick_log_path(symbol: str, day, root: str = 'data/ticks') -> str:
+    return os.path.join(root, symbol, f"{pd.Timestamp(day).date()}.ticks")
+
+
+class TickLog:
+    """Append-only binary tick log: an 8-byte header followed by 24-byte records.
+
+    Appends are copied into a preallocated record buffer and written in one
+    call when it fills, so the per-tick cost is three array stores. A record
+    torn by a crash is ignored when the log is read back.
+    """
+    def __init__(self, path: str, buffer_size: int = 4096):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(TICK_LOG_MAGIC)
+        else:
+            # Drop a record torn by a crash so new appends stay aligned
+            torn = (self._file.tell() - len(TICK_LOG_MAGIC)) % TICK_DTYPE.itemsize
+            if torn:
+                self._file.truncate(self._file.tell() - torn)
+                self._file.seek(0, os.SEEK_END)
+        self._buffer = np.empty(buffer_size, dtype=TICK_DTYPE)
+        self._ts = self._buffer['ts']
+        self._price = self._buffer['price']
+        self._size = self._buffer['size']
+        self._pending = 0
+        self.records = 0
+
+    def append(self, ts_ns: int, price: float, size: float):
+        i = self._pending
+        self._ts[i] = ts_ns
+        self._price[i] = price
+        self._size[i] = size
+        self._pending = i + 1
+        if self._pending == len(self._buffer):
+            self.flush()
+
+    def extend(self, ticks: np.ndarray):
+        """Append a whole TICK_DTYPE array at once."""
+        self.flush()
+        self._file.write(np.ascontiguousarray(ticks, dtype=TICK_DTYPE).tobytes())
+        self.records += len(ticks)
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self.records += self._pending
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def read(path: str) -> np.ndarray:
+        """Memory-mapped view of every complete record in a log."""
+        with open(path, 'rb') as f:
+            if f.read(len(TICK_LOG_MAGIC)) != TICK_LOG_MAGIC:
+                raise ValueError(f"Not a tick log: {path}")
+        records = (os.path.getsize(path) - len(TICK_LOG_MAGIC)) // TICK_DTYPE.itemsize
+        if records == 0:
+            return np.empty(0, dtype=TICK_DTYPE)
+        return np.memmap(path, dtype=TICK_DTYPE, mode='r', offset=len(TICK_LOG_MAGIC), shape=(records,))
+
+
+class BarBuilder:
+    """Incremental OHLCV aggregation of a tick stream.
+
+    The bar being built is a handful of scalar attributes, so a tick that
+    doesn't complete a bar allocates nothing. Each finished bar is returned
+    from `on_tick` and passed to `on_bar` as a pd.Series named by its start
+    time, the shape `Strategy.on_bar` takes.
+    """
+    kind: str = ''
+
+    def __init__(self, size: float, on_bar: Optional[Callable[[pd.Series], Any]] = None):
+        self.size = size
+        self.on_bar = on_bar
+        self.bars_built = 0
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self.start_ns = 0
+        self.open = self.high = self.low = self.close = np.nan
+        self.volume = 0.0
+
+    def _add(self, ts_ns: int, price: float, size: float):
+        if self.count == 0:
+            self.start_ns = ts_ns
+            self.open = self.high = self.low = price
+        elif price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += size
+        self.count += 1
+
+    def _emit(self) -> pd.Series:
+        bar = pd.Series(
+            [self.open, self.high, self.low, self.close, self.volume],
+            index=_BAR_INDEX,
+            name=pd.Timestamp(self.start_ns, tz=MARKET_TIMEZONE)
+        )
+        self._reset()
+        self.bars_built += 1
+        if self.on_bar is not None:
+            self.on_bar(bar)
+        return bar
+
+    def on_tick(self, ts_ns: int, price: float, size: float = 0.0) -> Optional[pd.Series]:
+        """Add a trade; returns the bar it completed, if any."""
+        raise NotImplementedError
+
+    def on_quote(self, ts_ns: int, bid: float, ask: float) -> Optional[pd.Series]:
+        """Add a quote as a zero-size tick at the mid; suits time and tick bars."""
+        return self.on_tick(ts_ns, (bid + ask) / 2, 0.0)
+
+    def flush(self) -> Optional[pd.Series]:
+        """Finish the partial bar, e.g. at the end of a session."""
+        return self._emit() if self.count else None
+
+    def group_ids(self, ticks: np.ndarray) -> np.ndarray:
+        """Bar number of each tick, non-decreasing; used by `bars_from_ticks`."""
+        raise NotImplementedError
+
+
+class TimeBarBuilder(BarBuilder):
+    """Bars covering fixed clock intervals of `size` seconds, labelled by interval start.
+
+    A bar completes on the first tick of a later interval, or on `on_time`
+    once the clock has passed its end. Intervals without ticks produce no bar.
+    """
+    kind = 'time'
+
+    def __init__(self, size: float, on_bar: Optional[Callable[[pd.Series], Any]] = None):
+        super().__init__(size, on_bar)
+        self.interval_ns = int(size * 1e9)
+        self.bucket = None
+
+    def on_tick(self, ts_ns: int, price: float, size: float = 0.0) -> Optional[pd.Series]:
+        bucket = ts_ns // self.interval_ns
+        bar = self._emit() if self.count and bucket != self.bucket else None
+        self._add(ts_ns, price, size)
+        self.bucket = bucket
+        self.start_ns = bucket * self.interval_ns
+        return bar
+
+    def on_time(self, now_ns: int) -> Optional[pd.Series]:
+        """Close the current bar if its interval has ended without a newer tick."""
+        if self.count and now_ns // self.interval_ns != self.bucket:
+            return self._emit()
+        return None
+
+    def group_ids(self, ticks: np.ndarray) -> np.ndarray:
+        return ticks['ts'] // self.interval_ns
+
+
+class TickBarBuilder(BarBuilder):
+    """Bars of `size` ticks each."""
+    kind = 'tick'
+
+    def __init__(self, size: float, on_bar: Optional[Callable[[pd.Series], Any]] = None):
+        super().__init__(size, on_bar)
+        self.ticks_per_bar = int(size)
+
+    def on_tick(self, ts_ns: int, price: float, size: float = 0.0) -> Optional[pd.Series]:
+        self._add(ts_ns, price, size)
+        return self._emit() if self.count >= self.ticks_per_bar else None
+
+    def group_ids(self, ticks: np.ndarray) -> np.ndarray:
+        return np.arange(len(ticks)) // self.ticks_per_bar
+
+
+class VolumeBarBuilder(BarBuilder):
+    """Bars closing when cumulative volume crosses each multiple of `size`.
+
+    Ticks aren't split, so a bar can overshoot `size`; the overshoot counts
+    towards the next boundary rather than the next bar.
+    """
+    kind = 'volume'
+
+    def __init__(self, size: float, on_bar: Optional[Callable[[pd.Series], Any]] = None):
+        super().__init__(size, on_bar)
+        self.total_volume = 0.0
+        self.boundary = size
+
+    def on_tick(self, ts_ns: int, price: float, size: float = 0.0) -> Optional[pd.Series]:
+        if self.count == 0:
+            self.boundary = (self.total_volume // self.size + 1) * self.size
+        self._add(ts_ns, price, size)
+        self.total_volume += size
+        return self._emit() if self.total_volume >= self.boundary else None
+
+    def group_ids(self, ticks: np.ndarray) -> np.ndarray:
+        volume = np.asarray(ticks['size'], dtype=float)
+        before = np.concatenate(([0.0], np.cumsum(volume)[:-1]))
+        return (before // self.size).astype(np.int64)
+
+
+BAR_BUILDERS = {cls.kind: cls for cls in (TimeBarBuilder, TickBarBuilder, VolumeBarBuilder)}
+
+
+def make_bar_builder(spec: str, on_bar: Optional[Callable[[pd.Series], Any]] = None) -> BarBuilder:
+    kind, size = parse_bar_spec(spec)
+    return BAR_BUILDERS[kind](size, on_bar)
+
+
+def bars_from_ticks(ticks: np.ndarray, spec: str) -> pd.DataFrame:
+    """Vectorized equivalent of streaming `ticks` through a builder and flushing, for backtests on a log."""
+    builder = make_bar_builder(spec)
+    if len(ticks) == 0:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, dtype=float)
+
+    price = np.asarray(ticks['price'], dtype=float)
+    groups = builder.group_ids(ticks)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(groups)) + 1))
+    ends = np.append(starts[1:], len(ticks))
+    if builder.kind == 'time':
+        labels = groups[starts] * builder.interval_ns
+    else:
+        labels = np.asarray(ticks['ts'])[starts]
+
+    return pd.DataFrame({
+        'open': price[starts],
+        'high': np.maximum.reduceat(price, starts),
+        'low': np.minimum.reduceat(price, starts),
+        'close': price[ends - 1],
+        'volume': np.add.reduceat(np.asarray(ticks['size'], dtype=float), starts)
+    }, index=pd.DatetimeIndex(pd.to_datetime(labels, unit='ns', utc=True)).tz_convert(MARKET_TIMEZONE))
+
+
+class TickStream:
+    """Routes each tick to an optional TickLog and to any number of bar builders."""
+    def __init__(self, builders: List[BarBuilder], log: Optional[TickLog] = None):
+        self.builders = builders
+        self.log = log
+        self.ticks = 0
+        self.logger = logging.getLogger(__name__)
+
+    def on_tick(self, ts_ns: int, price: float, size: float = 0.0):
+        if self.log is not None:
+            self.log.append(ts_ns, price, size)
+        for builder in self.builders:
+            builder.on_tick(ts_ns, price, size)
+        self.ticks += 1
+
+    def on_quote(self, ts_ns: int, bid: float, ask: float):
+        self.on_tick(ts_ns, (bid + ask) / 2, 0.0)
+
+    def replay(self, ticks: Union[np.ndarray, str]) -> int:
+        """Feed a TICK_DTYPE array, or the path of a tick log, through the builders."""
+        if isinstance(ticks, str):
+            ticks = TickLog.read(ticks)
+        # Plain Python scalars are several times cheaper per tick than numpy ones
+        for ts_ns, price, size in zip(ticks['ts'].tolist(), ticks['price'].tolist(), ticks['size'].tolist()):
+            self.on_tick(ts_ns, price, size)
+        return len(ticks)
+
+    def close(self):
+        """Finish partial bars and flush the log."""
+        for builder in self.builders:
+            builder.flush()
+        if self.log is not None:
+            self.log.flush()
+
+
+class FakeTickFeed:
+    """Seeded random-walk trades during regular sessions, standing in for a live trade stream."""
+    def __init__(self, ticks_per_second: float = 5.0, volatility: float = 2e-5, seed: int = 0):
+        self.ticks_per_second = ticks_per_second
+        self.volatility = volatility
+        self.seed = seed
+
+    def ticks(self, symbol: str, start: datetime, end: datetime) -> np.ndarray:
+        """Trades between start and end (naive times are market time), as a TICK_DTYPE array.
+
+        Each session day is generated whole from a seed of symbol and date,
+        starting at the same anchored level as FakeBarProvider, so overlapping
+        windows return the same trades.
+        """
+        start_ts = pd.Timestamp(start)
+        end_ts = pd.Timestamp(end)
+        start_ts = start_ts.tz_localize(MARKET_TIMEZONE) if start_ts.tz is None else start_ts.tz_convert(MARKET_TIMEZONE)
+        end_ts = end_ts.tz_localize(MARKET_TIMEZONE) if end_ts.tz is None else end_ts.tz_convert(MARKET_TIMEZONE)
+        days = pd.date_range(start_ts.normalize().tz_localize(None), end_ts.tz_localize(None), freq='D')
+        if len(days) == 0:
+            return np.empty(0, dtype=TICK_DTYPE)
+
+        levels = fake_day_levels(self.seed, symbol, np.array([d.toordinal() for d in days]))
+        chunks = []
+        for day, level in zip(days, levels):
+            index = pd.date_range(day, day + pd.Timedelta(days=1), freq='1min', tz=MARKET_TIMEZONE, inclusive='left')
+            minutes = index[market_calendar.session_mask(index)].values.astype('datetime64[ns]').astype(np.int64)
+            if len(minutes) == 0:
+                continue
+            rng = np.random.default_rng([self.seed, fake_symbol_seed(symbol), day.toordinal()])
+
+            # Poisson arrivals within each session minute
+            per_minute = rng.poisson(self.ticks_per_second * 60, len(minutes))
+            ts = np.repeat(minutes, per_minute) + rng.integers(0, 60_000_000_000, per_minute.sum())
+            ts.sort()
+
+            ticks = np.empty(len(ts), dtype=TICK_DTYPE)
+            ticks['ts'] = ts
+            ticks['price'] = np.round(level * np.exp(np.cumsum(rng.normal(0, self.volatility, len(ts)))), 2)
+            ticks['size'] = rng.choice([1, 10, 50, 100, 100, 100, 200, 500], len(ts))
+            chunks.append(ticks)
+        if not chunks:
+            return np.empty(0, dtype=TICK_DTYPE)
+
+        ticks = np.concatenate(chunks)
+        window = (ticks['ts'] >= start_ts.value) & (ticks['ts'] < end_ts.value)
+        return ticks[window]
@@ -1,11 +1,56 @@
 import pandas as pd
 import numpy as np
+import signal as signals
+import threading
+import time
 from datetime import datetime, timedelta
 import logging
 from typing import Optional
 from .strategy import ScalpStrategy
 from .data_handler import DataHandler
 from .backtest import BacktestEngine
+from .risk import RiskManager
+from .results_store import ResultsStore, data_fingerprint, init_params
+from .orders import OrderManager, make_client_order_id
+from .metrics import MetricsRegistry, StageTimer, default_registry
+from .profiler import SamplingProfiler
+from .shared_cache import SharedCache
+from .checkpoint import CheckpointStore
+from .market_calendar import default_calendar as market_calendar
+from .resampler import TIMEFRAME_MINUTES
+
+# Spans of the live decision loop recorded as latency histograms:
+# poll start -> bar received -> signal generated -> order submitted
+DECISION_SPANS = [
+    ('start', 'bar'),
+    ('bar', 'signal'),
+    ('signal', 'order'),
+    ('bar', 'order'),
+    ('bar', 'done')
+]
+
+def _naive(timestamp: pd.Timestamp) -> datetime:
+    """Wall-clock time of a bar timestamp, without its timezone."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_localize(None)
+    return timestamp.to_pydatetime()
+
+
+def exit_reason(position: dict, price: float, now: datetime, max_holding_time: Optional[int]) -> Optional[str]:
+    """Why an open position should be closed at this price, or None to keep it."""
+    if position['direction'] == 'LONG':
+        if price <= position['stop_loss']:
+            return 'Stop loss triggered'
+        if price >= position['take_profit']:
+            return 'Take profit triggered'
+    else:
+        if price >= position['stop_loss']:
+            return 'Stop loss triggered'
+        if price <= position['take_profit']:
+            return 'Take profit triggered'
+    if max_holding_time is not None and now - position['entry_time'] >= timedelta(minutes=max_holding_time):
+        return 'Max holding time reached'
+    return None
 
 class TradingBot:
     def __init__(
@@ -14,12 +59,32 @@ class TradingBot:
         data_source: str = 'yfinance',
         api_key: Optional[str] = None,
         api_secret: Optional[str] = None,
-        paper_trading: bool = True
+        paper_trading: bool = True,
+        initial_capital: float = 100000.0,
+        risk_manager: Optional[RiskManager] = None,
+        results_store: Optional[ResultsStore] = None,
+        order_manager: Optional[OrderManager] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        metrics_cache: Optional[SharedCache] = None,
+        profile_path: Optional[str] = None,
+        checkpoint: Optional[CheckpointStore] = None,
+        checkpoint_interval: float = 60.0
     ):
         # Initialize components
         self.data_handler = DataHandler(symbol, data_source, api_key, api_secret)
         self.strategy = ScalpStrategy()
-        self.backtest_engine = BacktestEngine(self.strategy)
+        self.risk_manager = risk_manager or RiskManager()
+        self.backtest_engine = BacktestEngine(self.strategy, initial_capital=initial_capital, risk_manager=self.risk_manager)
+        self.results_store = results_store
+        self.order_manager = order_manager
+        self.symbol = symbol
+        
+        # Latency instrumentation; metrics_cache publishes them to the dashboard's /metrics
+        self.metrics = metrics or default_registry
+        self.metrics_cache = metrics_cache
+        self.stage_timer = StageTimer(self.metrics, DECISION_SPANS, labels={'symbol': symbol})
+        self.profiler = SamplingProfiler()
+        self.profile_path = profile_path
         
         # Setup logging
         self.setup_logging()
@@ -28,6 +93,15 @@ class TradingBot:
         self.paper_trading = paper_trading
         self.current_position = None
         self.last_signal_time = None
+        self.equity = initial_capital
+        self.cash = initial_capital
+        
+        # Live state is checkpointed so a restart only fetches the bars it missed
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.last_bar_time = None
+        self.bars = pd.DataFrame()
+        self._last_checkpoint = 0.0
         
     def setup_logging(self):
         """Configure logging for the trading bot."""
@@ -53,9 +127,28 @@ class TradingBot:
         # Get historical data
         data = self.data_handler.get_historical_data(start_date, end_date, timeframe)
         
+        # Reuse a stored run when the same configuration has seen the same data
+        if self.results_store is not None:
+            config = dict(self.backtest_engine.get_config(), symbol=self.symbol, timeframe=timeframe)
+            fingerprint = data_fingerprint(data)
+            cached = self.results_store.get(self.results_store.run_id(config, fingerprint), include_trades=False)
+            if cached is not None:
+                self.logger.info(f"Using stored results for run {cached['run_id']}")
+                return cached['metrics']
+        
         # Run backtest
         results = self.backtest_engine.run(data)
         
+        if self.results_store is not None:
+            self.results_store.save(
+                config,
+                fingerprint,
+                results,
+                self.backtest_engine.trades,
+                self.backtest_engine.equity_curve,
+                data
+            )
+        
         self.logger.info("Backtest completed")
         self.logger.info(f"Results: {results}")
         
@@ -64,59 +157,201 @@ class TradingBot:
     def run_live(self):
         """Run the trading bot in live mode."""
         self.logger.info("Starting live trading bot")
+        if self.checkpoint is None:
+            self.checkpoint = CheckpointStore(f"data/checkpoints/{self.symbol}.ckpt")
+        self.warm_start()
+        
+        # Profile the thread running this loop, whichever thread toggles it
+        self.profiler.thread_id = threading.get_ident()
+        if self.profile_path:
+            self.profiler.start()
+        # `kill -USR1 <pid>` toggles the profiler while the bot runs
+        if hasattr(signals, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            signals.signal(signals.SIGUSR1, lambda signum, frame: self.toggle_profiling())
         
-        while True:
-            try:
-                # Get latest data
-                data = self.data_handler.get_latest_data(lookback=100)
-                
-                # Check for exit conditions if in position
-                if self.current_position:
-                    if self._should_exit_position(data):
-                        self._close_position(data)
-                
-                # Generate new signals if not in position
-                if not self.current_position:
-                    signal = self.strategy.generate_signals(data)
-                    if signal and self._is_valid_signal(signal):
-                        self._open_position(signal, data)
-                
-                # Sleep for a short period before next iteration
-                time.sleep(60)  # Check every minute
-                
-            except Exception as e:
-                self.logger.error(f"Error in live trading: {str(e)}")
-                time.sleep(300)  # Wait 5 minutes before retrying
+        try:
+            while True:
+                try:
+                    self.stage_timer.begin()
+                    
+                    # Only bars completed since the last poll are fetched
+                    new_bars = self._fetch_new_bars()
+                    self.stage_timer.mark('bar')
+                    
+                    if not new_bars.empty:
+                        # Every bar updates the indicators; only the newest one can trigger a trade
+                        for _, bar in new_bars.iloc[:-1].iterrows():
+                            self.strategy.on_bar(bar)
+                        signal = self.strategy.on_bar(new_bars.iloc[-1])
+                        self.stage_timer.mark('signal')
+                        self._append_bars(new_bars)
+                        data = self.bars
+                        self.risk_manager.start_bar(datetime.now().date(), self.equity)
+                        position = self.current_position
+                        
+                        # Check for exit conditions if in position
+                        if self.current_position:
+                            if self._should_exit_position(data):
+                                self._close_position(data)
+                        
+                        # Act on the new signal if not in position
+                        if not self.current_position and signal and self._is_valid_signal(signal):
+                            self._open_position(signal, data)
+                        
+                        self.stage_timer.mark('done')
+                        self.stage_timer.end()
+                        
+                        # Position changes are checkpointed at once, everything else periodically
+                        if self.current_position is not position or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                            self.save_checkpoint()
+                    
+                    if self.metrics_cache is not None:
+                        self.metrics.publish(self.metrics_cache, instance=f"bot-{self.symbol}")
+                    
+                    # Sleep for a short period before next iteration
+                    time.sleep(60)  # Check every minute
+                    
+                except Exception as e:
+                    self.logger.error(f"Error in live trading: {str(e)}")
+                    time.sleep(300)  # Wait 5 minutes before retrying
+        finally:
+            self.save_checkpoint()
+    
+    def warm_start(self) -> int:
+        """Restore the last checkpoint and replay only the bars completed since it was taken.
+        
+        Without a usable checkpoint the strategy is warmed up from the last
+        sessions covering its warmup_bars. Signals on replayed bars are stale
+        and not traded. Returns the number of bars replayed.
+        """
+        started = time.perf_counter()
+        state = self.checkpoint.load() if self.checkpoint is not None else None
+        restored = state is not None and self._restore_state(state)
+        if not restored:
+            self.strategy.reset()
+            self.last_bar_time = None
+            self.bars = pd.DataFrame()
+        
+        new_bars = self._fetch_new_bars()
+        for _, bar in new_bars.iterrows():
+            self.strategy.on_bar(bar)
+        self._append_bars(new_bars)
+        
+        self.logger.info(
+            f"Ready in {time.perf_counter() - started:.2f}s: "
+            f"{'restored checkpoint, ' if restored else 'cold start, '}replayed {len(new_bars)} bars"
+        )
+        return len(new_bars)
+    
+    def save_checkpoint(self):
+        """Atomically write strategy state, position and last bar time."""
+        if self.checkpoint is None:
+            return
+        size = self.checkpoint.save({
+            'symbol': self.symbol,
+            'strategy': self.strategy.name,
+            'strategy_params': init_params(self.strategy),
+            'strategy_state': self.strategy.get_state(),
+            'risk_state': self.risk_manager.get_state(),
+            'current_position': self.current_position,
+            'last_signal_time': self.last_signal_time,
+            'last_bar_time': self.last_bar_time,
+            'bars': self.bars,
+            'equity': self.equity,
+            'cash': self.cash
+        })
+        self._last_checkpoint = time.monotonic()
+        self.logger.debug(f"Checkpoint written ({size} bytes)")
+    
+    def _restore_state(self, state: dict) -> bool:
+        """Apply a checkpoint; returns False if its indicator state can't be reused."""
+        if state.get('symbol') != self.symbol:
+            if state.get('current_position'):
+                # Starting fresh would orphan a position the broker still holds
+                raise RuntimeError(
+                    f"Checkpoint {self.checkpoint.path} holds an open {state['current_position']['direction']} "
+                    f"{state.get('symbol')} position but this bot trades {self.symbol}; close it or remove the checkpoint"
+                )
+            self.logger.warning(f"Checkpoint is for {state.get('symbol')}, not {self.symbol}; ignoring it")
+            return False
+        
+        # Account state is restored even when the strategy changed, so an open position isn't forgotten
+        self.current_position = state['current_position']
+        self.last_signal_time = state['last_signal_time']
+        self.equity = state['equity']
+        self.cash = state['cash']
+        self.risk_manager.set_state(state['risk_state'])
+        
+        if state['strategy'] != self.strategy.name or state['strategy_params'] != init_params(self.strategy):
+            self.logger.warning("Strategy configuration changed since the checkpoint; rebuilding indicators")
+            return False
+        self.strategy.set_state(state['strategy_state'])
+        self.last_bar_time = state['last_bar_time']
+        self.bars = state['bars']
+        return True
+    
+    def _fetch_new_bars(self) -> pd.DataFrame:
+        """Completed 1-minute bars after the last processed one, or enough to warm up from scratch.
+        
+        Falls back to a cold start when the bars since the last processed one
+        can't all be fetched, rather than resuming indicators across a gap.
+        """
+        now = datetime.now()
+        history = self.data_handler.history_limit('1m')
+        if self.last_bar_time is not None and history is not None and now - _naive(self.last_bar_time) > history:
+            self._cold_start(f"last bar {self.last_bar_time} is older than the {history.days}-day 1-minute history")
+        if self.last_bar_time is None:
+            sessions = self.strategy.warmup_bars // TIMEFRAME_MINUTES['1d'] + 1
+            start = market_calendar.session_open(market_calendar.sessions_back(now, sessions))
+        else:
+            start = self.last_bar_time.to_pydatetime()
+        
+        df = self.data_handler.get_historical_data(start, now, '1m')
+        if df.empty:
+            return df
+        if self.last_bar_time is not None:
+            # The request starts at the last processed bar, so a later first bar means bars are missing
+            if df.index[0] > self.last_bar_time:
+                self._cold_start(f"bars after {self.last_bar_time} are missing from the provider (first is {df.index[0]})")
+                return self._fetch_new_bars()
+            df = df[df.index > self.last_bar_time]
+        # The current minute's bar is still forming
+        current = pd.Timestamp.now(tz=df.index.tz).floor('min')
+        return df[df.index < current]
+    
+    def _cold_start(self, reason: str):
+        """Drop indicator state so the next fetch warms up from scratch; positions and account state are kept."""
+        self.logger.warning(f"{reason}; rebuilding indicators from a cold start")
+        self.strategy.reset()
+        self.last_bar_time = None
+        self.bars = pd.DataFrame()
+    
+    def _append_bars(self, new_bars: pd.DataFrame):
+        """Keep the most recent warmup_bars bars for exit checks and sizing."""
+        if new_bars.empty:
+            return
+        bars = new_bars if self.bars.empty else pd.concat([self.bars, new_bars])
+        self.bars = bars.iloc[-self.strategy.warmup_bars:]
+        self.last_bar_time = new_bars.index[-1]
+    
+    def toggle_profiling(self, path: Optional[str] = None) -> bool:
+        """Start the sampling profiler, or stop it and write folded stacks for a flamegraph."""
+        if self.profiler.running:
+            self.profiler.stop()
+            self.profiler.write(path or self.profile_path or 'logs/profile.folded')
+            return False
+        self.profiler.start()
+        return True
     
     def _should_exit_position(self, data: pd.DataFrame) -> bool:
         """Check if current position should be closed."""
         if not self.current_position:
             return False
             
-        current_price = data['close'].iloc[-1]
-        
-        # Check stop loss
-        if self.current_position['direction'] == 'LONG' and current_price <= self.current_position['stop_loss']:
-            self.logger.info("Stop loss triggered for long position")
-            return True
-        elif self.current_position['direction'] == 'SHORT' and current_price >= self.current_position['stop_loss']:
-            self.logger.info("Stop loss triggered for short position")
-            return True
-            
-        # Check take profit
-        if self.current_position['direction'] == 'LONG' and current_price >= self.current_position['take_profit']:
-            self.logger.info("Take profit triggered for long position")
-            return True
-        elif self.current_position['direction'] == 'SHORT' and current_price <= self.current_position['take_profit']:
-            self.logger.info("Take profit triggered for short position")
-            return True
-            
-        # Check max holding time
-        holding_time = datetime.now() - self.current_position['entry_time']
-        if holding_time >= timedelta(minutes=self.strategy.max_holding_time):
-            self.logger.info("Max holding time reached")
+        reason = exit_reason(self.current_position, data['close'].iloc[-1], datetime.now(), self.strategy.max_holding_time)
+        if reason is not None:
+            self.logger.info(f"{reason} for {self.current_position['direction'].lower()} position")
             return True
-            
         return False
     
     def _is_valid_signal(self, signal) -> bool:
@@ -125,16 +360,40 @@ class TradingBot:
         if self.last_signal_time and (datetime.now() - self.last_signal_time) < timedelta(minutes=5):
             return False
             
-        # Additional validation logic can be added here
+        # Daily trade count and loss limits
+        if not self.risk_manager.can_open():
+            self.logger.info("Risk limits reached for today")
+            return False
+            
         return True
     
     def _open_position(self, signal, data: pd.DataFrame):
         """Open a new trading position."""
+        # Size with the same volatility-targeted rules as the backtest
+        volatility = self.strategy.calculate_indicators(data)['volatility'].to_numpy()[-1:]
+        fraction = self.risk_manager.position_fractions(volatility)[0]
+        size = self.risk_manager.size_position(self.equity, self.cash, signal.price, fraction, signal.direction)
+        if size < 1:
+            self.logger.info("Position size below one share, skipping signal")
+            return
+            
         if self.paper_trading:
             self.logger.info(f"Paper trading: Opening {signal.direction} position at {signal.price}")
         else:
             self.logger.info(f"Live trading: Opening {signal.direction} position at {signal.price}")
-            # Implement actual order execution here
+            if self.order_manager is None:
+                self.logger.warning("No order manager configured; order not sent")
+            else:
+                # Non-blocking: the broker ack is handled on the order manager's workers
+                self.order_manager.submit_bracket(
+                    self.symbol,
+                    signal.direction,
+                    size,
+                    signal.stop_loss,
+                    signal.take_profit,
+                    signal.timestamp
+                )
+        self.stage_timer.mark('order')
         
         self.current_position = {
             'entry_time': datetime.now(),
@@ -142,9 +401,13 @@ class TradingBot:
             'entry_price': signal.price,
             'stop_loss': signal.stop_loss,
             'take_profit': signal.take_profit,
-            'size': 1  # Adjust based on position sizing logic
+            'size': size,
+            'margin': self.risk_manager.margin_required(signal.direction, signal.price * size),
+            'order_id': make_client_order_id(self.symbol, signal.direction, signal.timestamp)
         }
         
+        self.cash -= self.current_position['margin']
+        self.risk_manager.record_open()
         self.last_signal_time = datetime.now()
     
     def _close_position(self, data: pd.DataFrame):
@@ -161,6 +424,18 @@ class TradingBot:
             self.logger.info(f"Paper trading: Closing position at {current_price}, PnL: {pnl}")
         else:
             self.logger.info(f"Live trading: Closing position at {current_price}, PnL: {pnl}")
-            # Implement actual order execution here
+            if self.order_manager is None:
+                self.logger.warning("No order manager configured; order not sent")
+            else:
+                self.order_manager.submit_close(
+                    self.symbol,
+                    self.current_position['direction'],
+                    self.current_position['size'],
+                    self.current_position['entry_time'],
+                    bracket_id=self.current_position.get('order_id')
+                )
         
+        self.cash += self.current_position['margin'] + pnl
+        self.equity += pnl
+        self.risk_manager.record_close(pnl)
         self.current_position = None 
\ No newline at end of file
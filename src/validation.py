@@ -0,0 +1,183 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import logging
+from .market_calendar import default_calendar as market_calendar
+from .resampler import MARKET_TIMEZONE, OHLCV_COLUMNS, TIMEFRAME_MINUTES
+
+# Checks run in this order, so bars dropped by an earlier check show up as gaps
+CHECKS = ['order', 'duplicates', 'ohlc', 'spikes', 'gaps']
+
+# Allowed repair actions per check; 'flag' only reports and 'raise' rejects the data
+ACTIONS = {
+    'order': ['sort', 'flag', 'raise'],
+    'duplicates': ['keep_last', 'keep_first', 'flag', 'raise'],
+    'ohlc': ['clip', 'drop', 'flag', 'raise'],
+    'spikes': ['flag', 'drop', 'raise'],
+    'gaps': ['fill', 'flag', 'raise']
+}
+
+DEFAULT_ACTIONS = {
+    'order': 'sort',
+    'duplicates': 'keep_last',
+    'ohlc': 'clip',
+    # A large move that reverses can be real, so spikes are only reported unless dropping is chosen
+    'spikes': 'flag',
+    'gaps': 'flag'
+}
+
+
+def drop_zero_volume(df: pd.DataFrame, validator: Optional['DataValidator'] = None) -> pd.DataFrame:
+    """Drop bars without trades; call after validating, so the gap check counts them as present.
+
+    A validator that fills gaps keeps them, since its output is meant to stay
+    on the session grid.
+    """
+    if validator is not None and validator.actions['gaps'] == 'fill':
+        return df
+    return df[df['volume'] > 0]
+
+
+@dataclass
+class ValidationReport:
+    rows_in: int
+    rows_out: int
+    issues: Dict[str, int] = field(default_factory=dict)
+    actions: Dict[str, str] = field(default_factory=dict)
+    # First few offending timestamps per check, for logs and the bar store
+    examples: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not any(self.issues.values())
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class DataValidator:
+    """Vectorized data quality checks with configurable repairs.
+
+    Checks: monotonic index, duplicate timestamps, OHLC consistency, isolated
+    price spikes (a return beyond `spike_zscore` rolling standard deviations
+    that immediately reverses) and missing bars against the session calendar.
+    Bars are validated once, when they are ingested: the bar store and the
+    dashboard's SharedCache hold validated bars, so their readers don't
+    re-check them.
+    """
+    def __init__(
+        self,
+        actions: Optional[Dict[str, str]] = None,
+        spike_zscore: float = 8.0,
+        spike_window: int = 100,
+        max_examples: int = 5
+    ):
+        self.actions = dict(DEFAULT_ACTIONS, **(actions or {}))
+        for check, action in self.actions.items():
+            if check not in ACTIONS:
+                raise ValueError(f"Unknown check: {check}")
+            if action not in ACTIONS[check]:
+                raise ValueError(f"Invalid action for {check}: {action} (expected one of {ACTIONS[check]})")
+
+        self.spike_zscore = spike_zscore
+        self.spike_window = spike_window
+        self.max_examples = max_examples
+        self.logger = logging.getLogger(__name__)
+
+    def validate(self, df: pd.DataFrame, timeframe: str = '1m') -> Tuple[pd.DataFrame, ValidationReport]:
+        """Check and repair OHLCV bars; returns the cleaned frame and a report."""
+        report = ValidationReport(rows_in=len(df), rows_out=len(df), actions=dict(self.actions))
+        clean = df
+        for check in CHECKS:
+            clean = getattr(self, f"_check_{check}")(clean, report, timeframe)
+        report.rows_out = len(clean)
+
+        if not report.ok:
+            found = ', '.join(f"{check}={count}" for check, count in report.issues.items() if count)
+            self.logger.warning(f"Data quality issues in {len(df)} {timeframe} bars: {found}")
+        return clean, report
+
+    def _record(self, report: ValidationReport, check: str, index: pd.Index) -> bool:
+        """Count the offending bars; raises if the check is configured to reject."""
+        report.issues[check] = len(index)
+        if len(index) == 0:
+            return False
+        report.examples[check] = [str(ts) for ts in index[:self.max_examples]]
+        if self.actions[check] == 'raise':
+            raise ValueError(f"Data validation failed: {len(index)} {check} issues, e.g. {report.examples[check]}")
+        return self.actions[check] != 'flag'
+
+    def _check_order(self, df: pd.DataFrame, report: ValidationReport, timeframe: str) -> pd.DataFrame:
+        values = df.index.values
+        backwards = np.flatnonzero(values[1:] < values[:-1]) + 1
+        if self._record(report, 'order', df.index[backwards]):
+            df = df.sort_index(kind='stable')
+        return df
+
+    def _check_duplicates(self, df: pd.DataFrame, report: ValidationReport, timeframe: str) -> pd.DataFrame:
+        keep = 'first' if self.actions['duplicates'] == 'keep_first' else 'last'
+        duplicated = df.index.duplicated(keep=keep)
+        if self._record(report, 'duplicates', df.index[duplicated]):
+            df = df[~duplicated]
+        return df
+
+    def _check_ohlc(self, df: pd.DataFrame, report: ValidationReport, timeframe: str) -> pd.DataFrame:
+        o, h, l, c, v = (df[col].to_numpy(dtype=float) for col in OHLCV_COLUMNS)
+        body_high = np.maximum(o, c)
+        body_low = np.minimum(o, c)
+        inconsistent = (h < body_high) | (l > body_low) | (l > h)
+        # Non-positive prices or negative volume cannot be repaired by clipping
+        invalid = (np.minimum(body_low, np.minimum(h, l)) <= 0) | (v < 0)
+
+        if not self._record(report, 'ohlc', df.index[inconsistent | invalid]):
+            return df
+        if self.actions['ohlc'] == 'drop':
+            return df[~(inconsistent | invalid)]
+
+        df = df[~invalid].copy()
+        keep = ~invalid
+        df['high'] = np.maximum.reduce([h[keep], l[keep], body_high[keep]])
+        df['low'] = np.minimum.reduce([h[keep], l[keep], body_low[keep]])
+        return df
+
+    def _check_spikes(self, df: pd.DataFrame, report: ValidationReport, timeframe: str) -> pd.DataFrame:
+        returns = np.log(df['close']).diff()
+        # Volatility up to the previous bar, so the spike doesn't inflate its own yardstick
+        sigma = returns.rolling(self.spike_window, min_periods=self.spike_window // 2).std().shift(1)
+        z = (returns / sigma).to_numpy()
+        z_next = (returns.shift(-1) / sigma).to_numpy()
+
+        with np.errstate(invalid='ignore'):
+            spikes = (np.abs(z) > self.spike_zscore) & (np.abs(z_next) > self.spike_zscore) & (np.sign(z) != np.sign(z_next))
+        if self._record(report, 'spikes', df.index[spikes]):
+            df = df[~spikes]
+        return df
+
+    def _check_gaps(self, df: pd.DataFrame, report: ValidationReport, timeframe: str) -> pd.DataFrame:
+        if df.empty or timeframe not in TIMEFRAME_MINUTES:
+            report.issues['gaps'] = 0
+            return df
+
+        index = pd.DatetimeIndex(df.index)
+        local = index.tz_convert(MARKET_TIMEZONE).tz_localize(None) if index.tz is not None else index
+        if timeframe == '1d':
+            local = local.normalize()
+
+        first, last = local.min(), local.max()
+        expected = market_calendar.bar_starts(first, last, timeframe)
+        expected = expected[(expected >= first) & (expected <= last)]
+        missing = expected[~expected.isin(local)]
+        if index.tz is not None:
+            missing = missing.tz_localize(MARKET_TIMEZONE).tz_convert(index.tz)
+
+        if not self._record(report, 'gaps', missing) or len(missing) == 0:
+            return df
+
+        # Flat, zero-volume bars at the previous close keep the series on the session grid
+        filled = df.reindex(df.index.append(missing).sort_values())
+        close = filled['close'].ffill()
+        for col in ['open', 'high', 'low', 'close']:
+            filled[col] = filled[col].fillna(close)
+        filled['volume'] = filled['volume'].fillna(0.0)
+        return filled.ffill()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.costs import CostModel
+
+
+def quoted_bars(n, spread, drift=0.0, seed=0):
+    """Bars whose high and low are trades at the ask and bid around a mid price."""
+    rng = np.random.default_rng(seed)
+    mid = 100 * np.exp(np.cumsum(rng.normal(0, drift, n))) if drift else np.full(n, 100.0)
+    return mid * (1 + spread / 2), mid * (1 - spread / 2)
+
+
+def corwin_schultz(high, low, window, floor):
+    """Per-bar Corwin-Schultz estimate, clipped at zero and averaged over a trailing window."""
+    estimates = []
+    for t in range(len(high)):
+        p = max(t - 1, 0)
+        beta = np.log(high[t] / low[t]) ** 2 + np.log(high[p] / low[p]) ** 2
+        gamma = np.log(max(high[t], high[p]) / min(low[t], low[p])) ** 2
+        k = 3 - 2 * np.sqrt(2)
+        alpha = (np.sqrt(2 * beta) - np.sqrt(beta)) / k - np.sqrt(gamma / k)
+        estimates.append(max(2 * (np.exp(alpha) - 1) / (1 + np.exp(alpha)), 0.0))
+    smoothed = pd.Series(estimates).rolling(window, min_periods=1).mean().to_numpy()
+    return np.maximum(smoothed, floor)
+
+
+def test_spread_matches_reference_estimator():
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, 500)))
+    high = close * np.exp(np.abs(rng.normal(0, 0.0008, 500)))
+    low = close * np.exp(-np.abs(rng.normal(0, 0.0008, 500)))
+    model = CostModel(spread_window=20)
+
+    expected = corwin_schultz(high, low, 20, model.min_spread_bps / 10000)
+    np.testing.assert_allclose(model.estimate_spread(high, low), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_spread_recovers_quoted_spread_without_price_moves():
+    high, low = quoted_bars(100, 0.001)
+    np.testing.assert_allclose(CostModel().estimate_spread(high, low), 0.001, rtol=1e-9)
+
+
+def test_spread_is_close_to_quoted_spread_with_small_moves():
+    high, low = quoted_bars(2000, 0.002, drift=0.0001)
+    assert CostModel(spread_window=2000).estimate_spread(high, low)[-1] == pytest.approx(0.002, rel=0.15)
+
+
+def test_spread_is_floored_on_flat_bars():
+    high = low = np.full(10, 50.0)
+    np.testing.assert_allclose(CostModel(min_spread_bps=2.0).estimate_spread(high, low), 0.0002)
+
+
+def test_costs_always_move_fills_against_the_trader():
+    n = 50
+    bars = {'open': np.full(n, 100.0), 'high': np.full(n, 100.5), 'low': np.full(n, 99.5),
+            'close': np.full(n, 100.0), 'volume': np.full(n, 10000.0)}
+    trades = {
+        'entry_index': np.array([5, 10]), 'exit_index': np.array([8, 20]),
+        'entry_price': np.array([100.0, 100.0]), 'exit_price': np.array([100.0, 100.0]),
+        'size': np.array([100.0, 100.0]), 'direction': np.array([1, -1])
+    }
+
+    result = CostModel(per_order_fee=1.0).apply(trades, bars)
+
+    assert result['entry_price'][0] > 100 > result['exit_price'][0]
+    assert result['entry_price'][1] < 100 < result['exit_price'][1]
+    np.testing.assert_allclose(result['fees'], 2.0)
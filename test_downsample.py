@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.downsample import DOWNSAMPLE_MIN_POINTS, downsample_indices, downsample_series, lttb_indices, minmax_indices
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype=float), 100 + np.cumsum(rng.normal(0, 1, n))
+
+
+@pytest.mark.parametrize('n,n_out', [(10, 3), (1000, 3), (1000, 50), (1001, 999), (5000, 700)])
+def test_lttb_returns_exactly_n_out_sorted_points(n, n_out):
+    x, y = random_walk(n)
+    indices = lttb_indices(x, y, n_out)
+    assert len(indices) == n_out
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_keeps_an_isolated_spike():
+    x, y = random_walk(2000)
+    y[1234] += 500
+    assert 1234 in lttb_indices(x, y, 100)
+
+
+@pytest.mark.parametrize('n,n_out', [(10, 4), (1000, 4), (1000, 51), (1001, 999), (5000, 700)])
+def test_minmax_stays_within_budget_and_keeps_extremes(n, n_out):
+    _, y = random_walk(n)
+    indices = minmax_indices(y, n_out)
+    assert len(indices) <= n_out
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert np.argmin(y) in indices and np.argmax(y) in indices
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+@pytest.mark.parametrize('n_keep', [0, 5, 60, 500])
+def test_downsample_indices_never_exceed_max_points(method, n_keep):
+    x, y = random_walk(3000)
+    keep = np.random.default_rng(1).choice(3000, n_keep, replace=False)
+    indices = downsample_indices(x, y, 64, method, keep=keep)
+    assert len(indices) <= 64
+    assert np.all(np.diff(indices) > 0)
+    if n_keep <= 64 - DOWNSAMPLE_MIN_POINTS[method]:
+        assert np.isin(keep, indices).all()
+
+
+def test_downsample_indices_reject_budget_below_method_minimum():
+    x, y = random_walk(100)
+    with pytest.raises(ValueError):
+        downsample_indices(x, y, 3, 'minmax')
+    with pytest.raises(ValueError):
+        downsample_indices(x, y, 10, 'bogus')
+
+
+def test_downsample_series_places_markers_on_kept_bars():
+    _, closes = random_walk(2000)
+    dates = pd.date_range('2024-03-05 09:30', periods=2000, freq='1min', tz='UTC')
+    records = [{'date': d.isoformat(), 'close': c} for d, c in zip(dates, closes)]
+    trades = [
+        {'entry_time': dates[i].isoformat(), 'exit_time': dates[i + 7].isoformat(),
+         'entry_price': 1.0, 'exit_price': 2.0, 'direction': 'LONG', 'pnl': 1.0}
+        for i in range(100, 1900, 300)
+    ]
+
+    sampled, markers = downsample_series(records, 100, trades=trades)
+
+    assert len(sampled) <= 100
+    assert len(markers) == 2 * len(trades)
+    for marker in markers:
+        assert sampled[marker['index']]['date'] == marker['date']
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from src.indicators import SQUEEZE_THRESHOLD, RollingWindow, SqueezeTracker
+from src.strategy import ScalpStrategy
+
+
+def test_rolling_window_matches_numpy_at_high_price_levels():
+    rng = np.random.default_rng(0)
+    closes = 1e6 + np.cumsum(rng.normal(0, 1e-4, 20000))
+    window = RollingWindow(20)
+    for i, close in enumerate(closes):
+        window.push(close)
+        if window.full:
+            recent = closes[i - 19:i + 1]
+            assert np.isclose(window.mean(), recent.mean(), rtol=1e-12)
+            assert np.isclose(window.std(ddof=1), recent.std(ddof=1), rtol=1e-4)
+
+
+def test_rolling_window_constant_values_have_zero_std():
+    window = RollingWindow(5)
+    for _ in range(50):
+        window.push(0.1)
+    assert window.std() == 0.0
+    assert window.std(ddof=1) == 0.0
+
+
+def squeeze_bars(n=400, seed=1):
+    """Random-walk closes whose volatility alternates, so squeezes start and end."""
+    rng = np.random.default_rng(seed)
+    scale = np.where((np.arange(n) // 50) % 2 == 0, 0.002, 0.0004)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, scale)))
+    index = pd.date_range('2024-03-05 09:30', periods=n, freq='1min')
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1000.0}, index=index)
+
+
+def test_squeeze_features_match_is_bb_squeeze():
+    strategy = ScalpStrategy()
+    df = strategy.calculate_indicators(squeeze_bars())
+    period = strategy.bb_period
+    bands = df[['bb_upper', 'bb_middle', 'bb_lower']]
+    assert df['squeeze'].any() and not df['squeeze'].all()
+
+    for end in range(period, len(df) + 1):
+        window = bands.iloc[:end]
+        # The per-call definition squeeze_features replaced
+        width = (window['bb_upper'].iloc[-1] - window['bb_lower'].iloc[-1]) / window['bb_middle'].iloc[-1]
+        average = (
+            window['bb_upper'].rolling(period).mean() - window['bb_lower'].rolling(period).mean()
+        ) / window['bb_middle'].rolling(period).mean()
+        expected = bool(width < average.iloc[-1] * SQUEEZE_THRESHOLD)
+
+        assert strategy.is_bb_squeeze(window) == expected
+        assert bool(df['squeeze'].iloc[end - 1]) == expected
+
+
+def test_squeeze_tracker_streams_squeeze_features():
+    strategy = ScalpStrategy()
+    bars = squeeze_bars()
+    df = strategy.calculate_indicators(bars)
+    tracker = SqueezeTracker(strategy.bb_period, strategy.bb_std)
+
+    for i, close in enumerate(bars['close']):
+        values = tracker.update(close)
+        row = df.iloc[i]
+        if np.isnan(row['bb_width_ma']):
+            assert not values['squeeze']
+            continue
+        assert np.isclose(values['bb_width'], row['bb_width'], rtol=1e-8)
+        assert np.isclose(values['bb_width_ma'], row['bb_width_ma'], rtol=1e-8)
+        assert values['squeeze'] == bool(row['squeeze'])
+        assert values['squeeze_duration'] == row['squeeze_duration']
@@ -0,0 +1,75 @@
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+import pytest
+from src.market_calendar import MarketCalendar
+
+# Published NYSE full-day closures and 13:00 early closes
+HOLIDAYS = {
+    2024: ['2024-01-01', '2024-01-15', '2024-02-19', '2024-03-29', '2024-05-27',
+           '2024-06-19', '2024-07-04', '2024-09-02', '2024-11-28', '2024-12-25'],
+    2025: ['2025-01-01', '2025-01-09', '2025-01-20', '2025-02-17', '2025-04-18', '2025-05-26',
+           '2025-06-19', '2025-07-04', '2025-09-01', '2025-11-27', '2025-12-25'],
+    2026: ['2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25',
+           '2026-06-19', '2026-07-03', '2026-09-07', '2026-11-26', '2026-12-25']
+}
+EARLY_CLOSES = {
+    2024: ['2024-07-03', '2024-11-29', '2024-12-24'],
+    2025: ['2025-07-03', '2025-11-28', '2025-12-24'],
+    2026: ['2026-11-27', '2026-12-24']
+}
+
+
+@pytest.fixture(scope='module')
+def calendar():
+    return MarketCalendar(2020, 2030)
+
+
+@pytest.mark.parametrize('year', sorted(HOLIDAYS))
+def test_weekday_closures_match_published_holidays(calendar, year):
+    weekdays = pd.bdate_range(f"{year}-01-01", f"{year}-12-31")
+    closed = [str(day.date()) for day in weekdays if not calendar.is_session(day)]
+    assert closed == HOLIDAYS[year]
+
+
+@pytest.mark.parametrize('year', sorted(EARLY_CLOSES))
+def test_early_closes_match_published_schedule(calendar, year):
+    sessions = pd.DatetimeIndex(calendar.sessions.astype('datetime64[ns]'))
+    early = [str(day.date()) for day in sessions[sessions.year == year] if calendar.session_close(day).hour == 13]
+    assert early == EARLY_CLOSES[year]
+
+
+def test_weekend_holidays_are_observed_only_where_the_exchange_does(calendar):
+    # New Year's Day 2022 fell on a Saturday; the prior Friday still traded
+    assert calendar.is_session(date(2021, 12, 31))
+    # Sunday holidays move to Monday
+    assert not calendar.is_session(date(2022, 6, 20))
+    assert not calendar.is_session(date(2023, 1, 2))
+
+
+def test_session_mask_honours_early_close(calendar):
+    index = pd.DatetimeIndex(['2024-11-29 09:29', '2024-11-29 09:30', '2024-11-29 12:59',
+                              '2024-11-29 13:00', '2024-11-28 10:00', '2024-12-02 15:59'])
+    assert calendar.session_mask(index).tolist() == [False, True, True, False, False, True]
+    tz_index = index.tz_localize('America/New_York').tz_convert('UTC')
+    assert calendar.session_mask(tz_index).tolist() == calendar.session_mask(index).tolist()
+
+
+def test_bar_starts_stop_at_early_close(calendar):
+    starts = calendar.bar_starts(date(2024, 11, 27), date(2024, 12, 2), '1m')
+    per_day = pd.Series(1, index=starts).groupby(starts.date).sum()
+    assert per_day.to_dict() == {date(2024, 11, 27): 390, date(2024, 11, 29): 210, date(2024, 12, 2): 390}
+    assert len(calendar.bar_starts(date(2024, 11, 29), date(2024, 11, 29), '5m')) == 42
+
+
+def test_sessions_back_skips_holidays(calendar):
+    assert calendar.sessions_back(date(2024, 12, 26), 1) == date(2024, 12, 24)
+    assert calendar.sessions_back(date(2024, 12, 25), 0) == date(2024, 12, 24)
+    assert calendar.session_open(date(2024, 3, 30)) == datetime(2024, 3, 28, 9, 30)
+
+
+def test_session_window_before_open_uses_previous_close(calendar):
+    start, end, period = calendar.session_window(datetime(2024, 12, 26, 8, 0), '1m', 30)
+    assert period == 7
+    assert end == datetime(2024, 12, 24, 13, 0)
+    assert start == datetime(2024, 12, 13, 9, 30)
@@ -0,0 +1,114 @@
+import pytest
+from src.mock_broker import MockBroker
+from src.orders import (
+    CANCELLED, FILLED, NEW, PARTIALLY_FILLED, REJECTED,
+    BrokerClient, Order, OrderManager, make_client_order_id
+)
+
+
+@pytest.fixture
+def broker():
+    broker = MockBroker(fill_price=100.0)
+    broker.start()
+    yield broker
+    broker.stop()
+
+
+@pytest.fixture
+def manager(broker):
+    manager = OrderManager(BrokerClient(broker.base_url), cancel_timeout=0.5)
+    yield manager
+    manager.shutdown()
+
+
+def limit_bracket(manager, symbol='SPY', qty=10):
+    """A resting limit entry, so the test controls how much of it fills."""
+    order = Order(
+        client_order_id=make_client_order_id(symbol, 'LONG', '2024-01-02 10:00'),
+        symbol=symbol,
+        side='buy',
+        qty=qty,
+        order_type='limit',
+        limit_price=100.0,
+        take_profit=101.0,
+        stop_loss=99.0
+    )
+    manager.submit(order).result()
+    return order
+
+
+def close(manager, symbol='SPY', qty=10, bracket_id=None):
+    return manager.submit_close(symbol, 'LONG', qty, '2024-01-02 10:05', bracket_id=bracket_id).result()
+
+
+def test_transitions_follow_lifecycle():
+    order = Order(client_order_id='x', symbol='SPY', side='buy', qty=10)
+    order.transition(PARTIALLY_FILLED)
+    order.transition(FILLED)
+    assert order.history == [PARTIALLY_FILLED, FILLED]
+    with pytest.raises(ValueError):
+        order.transition(CANCELLED)
+    with pytest.raises(ValueError):
+        Order(client_order_id='y', symbol='SPY', side='buy', qty=1, status=PARTIALLY_FILLED).transition(NEW)
+
+
+def test_late_update_does_not_regress_terminal_order(manager):
+    order = Order(client_order_id='z', symbol='SPY', side='buy', qty=10, status=REJECTED)
+    manager.apply_update(order, {'id': 'b1', 'status': 'filled', 'filled_qty': '10'})
+    assert order.status == REJECTED
+
+
+def test_close_cancels_partially_filled_entry(broker, manager):
+    entry = limit_bracket(manager)
+    broker.fill(entry.broker_order_id, qty=4)
+
+    closing = close(manager, bracket_id=entry.client_order_id)
+
+    assert broker.orders[entry.broker_order_id]['status'] == 'canceled'
+    assert entry.status == CANCELLED and entry.filled_qty == 4
+    assert closing.status == FILLED and closing.qty == 4
+    assert broker.positions['SPY'] == 0
+    assert all(broker.orders[leg]['status'] == 'canceled' for leg in entry.legs)
+
+
+def test_close_of_unfilled_entry_sends_no_order(broker, manager):
+    entry = limit_bracket(manager)
+
+    closing = close(manager, bracket_id=entry.client_order_id)
+
+    assert closing.status == CANCELLED and closing.broker_order_id is None
+    assert broker.orders[entry.broker_order_id]['status'] == 'canceled'
+    assert all(broker.orders[leg]['status'] == 'canceled' for leg in entry.legs)
+    assert broker.positions.get('SPY', 0) == 0
+
+
+def test_close_after_take_profit_fill_sends_no_order(broker, manager):
+    entry = manager.submit_bracket('SPY', 'LONG', 10, 99.0, 101.0, '2024-01-02 10:00').result()
+    take_profit, stop = entry.legs
+    broker.fill(take_profit)
+
+    closing = close(manager, bracket_id=entry.client_order_id)
+
+    assert closing.status == CANCELLED
+    assert broker.orders[stop]['status'] == 'canceled'
+    assert broker.positions['SPY'] == 0
+
+
+def test_close_after_partial_leg_fill_covers_remainder(broker, manager):
+    entry = manager.submit_bracket('SPY', 'LONG', 10, 99.0, 101.0, '2024-01-02 10:00').result()
+    broker.fill(entry.legs[1], qty=3)
+
+    closing = close(manager, bracket_id=entry.client_order_id)
+
+    assert closing.status == FILLED and closing.qty == 7
+    assert broker.positions['SPY'] == 0
+
+
+def test_close_leaves_other_brackets_working(broker, manager):
+    entry = manager.submit_bracket('SPY', 'LONG', 10, 99.0, 101.0, '2024-01-02 10:00').result()
+    other = manager.submit_bracket('QQQ', 'LONG', 5, 99.0, 101.0, '2024-01-02 10:00').result()
+
+    close(manager, bracket_id=entry.client_order_id)
+
+    assert all(broker.orders[leg]['status'] == 'new' for leg in other.legs)
+    assert broker.positions['QQQ'] == 5
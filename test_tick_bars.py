@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.tick_bars import (
+    TICK_DTYPE, FakeTickFeed, TickLog, TickStream, TimeBarBuilder, bars_from_ticks, make_bar_builder, parse_bar_spec
+)
+
+
+@pytest.fixture(scope='module')
+def ticks():
+    return FakeTickFeed(ticks_per_second=2.0).ticks('SPY', pd.Timestamp('2024-03-05 09:30'), pd.Timestamp('2024-03-05 10:30'))
+
+
+def streamed(ticks, spec):
+    bars = []
+    builder = make_bar_builder(spec, on_bar=bars.append)
+    TickStream([builder]).replay(ticks)
+    builder.flush()
+    return pd.DataFrame(bars)
+
+
+@pytest.mark.parametrize('spec', ['1s', '5s', '60s', '1t', '7t', '100t', '250v', '5000v'])
+def test_bars_from_ticks_matches_streaming_builder(ticks, spec):
+    expected = streamed(ticks, spec)
+    bars = bars_from_ticks(ticks, spec)
+    assert len(bars) > 1
+    pd.testing.assert_index_equal(bars.index, pd.DatetimeIndex(expected.index), check_names=False)
+    np.testing.assert_allclose(bars.to_numpy(), expected.to_numpy())
+
+
+def test_volume_bars_carry_overshoot_to_the_next_boundary():
+    ticks = np.zeros(4, dtype=TICK_DTYPE)
+    ticks['ts'] = np.arange(4) * 1_000_000_000
+    ticks['price'] = [10.0, 11.0, 12.0, 13.0]
+    ticks['size'] = [60, 60, 100, 30]
+    expected = streamed(ticks, '100v')
+    bars = bars_from_ticks(ticks, '100v')
+    # 60 | 60 crosses 100 | 100 crosses 200 | 30 left over
+    assert bars['volume'].tolist() == expected['volume'].tolist() == [120.0, 100.0, 30.0]
+
+
+def test_time_bar_closes_on_clock_without_a_new_tick():
+    bars = []
+    builder = TimeBarBuilder(5, on_bar=bars.append)
+    builder.on_tick(1_000_000_000, 10.0, 1.0)
+    assert builder.on_time(4_000_000_000) is None
+    bar = builder.on_time(5_000_000_000)
+    assert bar is not None and bars == [bar]
+    assert bar.name == pd.Timestamp(0, tz='UTC')
+
+
+def test_tick_log_round_trip_ignores_torn_record(tmp_path, ticks):
+    path = str(tmp_path / 'SPY.ticks')
+    with TickLog(path, buffer_size=64) as log:
+        for ts, price, size in ticks[:100]:
+            log.append(int(ts), float(price), float(size))
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 5)
+
+    with TickLog(path) as log:
+        log.extend(ticks[100:150])
+    assert np.array_equal(TickLog.read(path), ticks[:150])
+
+
+@pytest.mark.parametrize('spec', ['0s', '5x', 't'])
+def test_parse_bar_spec_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_bar_spec(spec)
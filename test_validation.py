@@ -0,0 +1,34 @@
+import pandas as pd
+from src.validation import DataValidator, drop_zero_volume
+
+
+def minute_bars(n=30):
+    index = pd.date_range('2024-03-05 09:30', periods=n, freq='1min', tz='America/New_York')
+    return pd.DataFrame(
+        {'open': 100.0, 'high': 101.0, 'low': 99.0, 'close': 100.0, 'volume': 1000.0}, index=index
+    )
+
+
+def test_zero_volume_bars_are_not_gaps():
+    df = minute_bars()
+    df.iloc[[5, 6, 20], df.columns.get_loc('volume')] = 0.0
+    validator = DataValidator()
+
+    clean, report = validator.validate(df, '1m')
+
+    assert report.issues['gaps'] == 0
+    assert len(drop_zero_volume(clean, validator)) == 27
+
+
+def test_gap_fill_keeps_zero_volume_bars():
+    df = minute_bars()
+    df.iloc[5, df.columns.get_loc('volume')] = 0.0
+    df = df.drop(df.index[10:12])
+    validator = DataValidator(actions={'gaps': 'fill'})
+
+    clean, report = validator.validate(df, '1m')
+    clean = drop_zero_volume(clean, validator)
+
+    assert report.issues['gaps'] == 2
+    assert clean.index.equals(minute_bars().index)
+    assert clean['volume'].iloc[5] == 0.0